@@ -0,0 +1,161 @@
+"""Typed Industry Fundamentals
+
+Revision ID: 5b1e7c3a9d42
+Revises: 7902dd54a020
+Create Date: 2026-10-18 21:04:12.530117
+
+"""
+
+import os
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "5b1e7c3a9d42"
+down_revision: Union[str, None] = "7902dd54a020"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Back to the source format, e.g. 268670000 -> "$268.67M"
+MARKET_CAP_DOWNGRADE_USING = """
+    CASE WHEN market_cap >= 1000000000
+         THEN '$' || round(market_cap / 1000000000.0, 2)::text || 'B'
+         WHEN market_cap >= 1000000
+         THEN '$' || round(market_cap / 1000000.0, 2)::text || 'M'
+         ELSE '$' || market_cap::text END
+"""
+
+TYPED_COLUMNS = (
+    ("last_sale", sa.Float(), "double precision"),
+    ("market_cap", sa.BigInteger(), "bigint"),
+    ("ipo_year", sa.SmallInteger(), "smallint"),
+)
+
+UPDATE_FUNDAMENTALS_SQL = sa.text(
+    """
+    UPDATE industry_data
+    SET last_sale = :last_sale, market_cap = :market_cap, ipo_year = :ipo_year
+    WHERE id = :id
+    """
+)
+
+
+def typed_fundamentals(connection) -> list:
+    """
+    Parses the source strings of every row with the db.ingest parsers, the only
+    place that knows the "$268.67M" format. Rows loaded before the
+    industry_data hook kept the strings have none; they are looked up in the
+    bootstrap file by (symbol, name).
+    """
+    from db.ingest import (
+        parse_ipo_year,
+        parse_last_sale,
+        parse_market_cap,
+        read_industry_csv,
+    )
+
+    csv_file_path = os.path.join(
+        os.path.dirname(__file__), "../../db/bootstrap/industries.csv"
+    )
+    bootstrap = {
+        (row["symbol"], row["name"]): row for row in read_industry_csv(csv_file_path)
+    }
+
+    rows, unmatched = [], 0
+    for id, symbol, name, last_sale, market_cap, ipo_year in connection.execute(
+        sa.text(
+            """
+            SELECT id, symbol, name, last_sale, market_cap, ipo_year
+            FROM industry_data
+            """
+        )
+    ):
+        if last_sale is None and market_cap is None and ipo_year is None:
+            source = bootstrap.get((symbol, name))
+            if source is None:
+                unmatched += 1
+                continue
+            typed = source["last_sale"], source["market_cap"], source["ipo_year"]
+        else:
+            typed = (
+                parse_last_sale(last_sale),
+                parse_market_cap(market_cap),
+                parse_ipo_year(ipo_year),
+            )
+        if any(value is not None for value in typed):
+            rows.append(
+                dict(zip(("last_sale", "market_cap", "ipo_year"), typed), id=id)
+            )
+
+    if unmatched:
+        print(
+            f"industry_data: {unmatched} rows without fundamentals have no "
+            "(symbol, name) match in industries.csv and are left NULL"
+        )
+    return rows
+
+
+def upgrade() -> None:
+    connection = op.get_bind()
+    # Parsed before the columns change type, written back afterwards
+    rows = typed_fundamentals(connection)
+    for column, type_, sql_type in TYPED_COLUMNS:
+        op.alter_column(
+            "industry_data",
+            column,
+            existing_type=sa.String(length=10),
+            type_=type_,
+            existing_nullable=True,
+            postgresql_using=f"NULL::{sql_type}",
+        )
+    if rows:
+        connection.execute(UPDATE_FUNDAMENTALS_SQL, rows)
+
+    op.create_index(
+        op.f("ix_industry_data_market_cap"),
+        "industry_data",
+        ["market_cap"],
+        unique=False,
+    )
+    op.create_index(
+        op.f("ix_industry_data_ipo_year"), "industry_data", ["ipo_year"], unique=False
+    )
+    op.create_index(
+        "ix_industry_data_sector_id_market_cap",
+        "industry_data",
+        ["sector_id", "market_cap"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_industry_data_sector_id_market_cap", table_name="industry_data")
+    op.drop_index(op.f("ix_industry_data_ipo_year"), table_name="industry_data")
+    op.drop_index(op.f("ix_industry_data_market_cap"), table_name="industry_data")
+    op.alter_column(
+        "industry_data",
+        "ipo_year",
+        existing_type=sa.SmallInteger(),
+        type_=sa.String(length=10),
+        existing_nullable=True,
+        postgresql_using="ipo_year::text",
+    )
+    op.alter_column(
+        "industry_data",
+        "market_cap",
+        existing_type=sa.BigInteger(),
+        type_=sa.String(length=10),
+        existing_nullable=True,
+        postgresql_using=MARKET_CAP_DOWNGRADE_USING,
+    )
+    op.alter_column(
+        "industry_data",
+        "last_sale",
+        existing_type=sa.Float(),
+        type_=sa.String(length=10),
+        existing_nullable=True,
+        postgresql_using="round(last_sale::numeric, 4)::text",
+    )
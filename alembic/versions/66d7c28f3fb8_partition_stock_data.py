@@ -0,0 +1,154 @@
+"""Partition Stock Data
+
+Revision ID: 66d7c28f3fb8
+Revises: 77ce89e00dfe
+Create Date: 2026-10-18 15:02:17.304862
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "66d7c28f3fb8"
+down_revision: Union[str, None] = "77ce89e00dfe"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+COLUMNS = "id, date, price, ticker, daily_pct_change"
+
+
+def _create_stock_data(partition_by: str = "") -> None:
+    primary_key = "id, date" if partition_by else "id"
+    op.execute(
+        f"""
+        CREATE TABLE stock_data (
+            id integer NOT NULL DEFAULT nextval('stock_data_id_seq'),
+            date date{' NOT NULL' if partition_by else ''},
+            price double precision,
+            ticker varchar(10),
+            daily_pct_change double precision,
+            CONSTRAINT stock_data_pkey PRIMARY KEY ({primary_key}),
+            CONSTRAINT uq_ticker_date UNIQUE (ticker, date)
+        ) {partition_by}
+        """
+    )
+    op.create_index(op.f("ix_stock_data_date"), "stock_data", ["date"], unique=False)
+    op.create_index(
+        "ix_stock_data_ticker_date",
+        "stock_data",
+        ["ticker", "date"],
+        unique=False,
+        postgresql_include=["price"],
+    )
+
+
+def _rename_old_stock_data() -> None:
+    op.rename_table("stock_data", "stock_data_old")
+    op.execute("ALTER INDEX ix_stock_data_date RENAME TO ix_stock_data_old_date")
+    op.execute(
+        "ALTER INDEX ix_stock_data_ticker_date RENAME TO ix_stock_data_old_ticker_date"
+    )
+    op.execute(
+        "ALTER TABLE stock_data_old RENAME CONSTRAINT uq_ticker_date TO uq_old_ticker_date"
+    )
+    op.execute(
+        "ALTER TABLE stock_data_old RENAME CONSTRAINT stock_data_pkey TO stock_data_old_pkey"
+    )
+
+
+def _replace_old_stock_data() -> None:
+    op.execute(
+        f"INSERT INTO stock_data ({COLUMNS}) SELECT {COLUMNS} FROM stock_data_old"
+    )
+    # Keep the id sequence alive when the old table goes away
+    op.execute("ALTER SEQUENCE stock_data_id_seq OWNED BY stock_data.id")
+    # Also drops the materialized views built on the old table
+    op.execute("DROP TABLE stock_data_old CASCADE")
+
+
+def _create_views() -> None:
+    op.execute(
+        """
+        CREATE MATERIALIZED VIEW stock_tickers AS
+        SELECT DISTINCT ticker FROM stock_data WHERE ticker IS NOT NULL
+        """
+    )
+    op.create_index("ix_stock_tickers_ticker", "stock_tickers", ["ticker"], unique=True)
+    op.execute(
+        """
+        CREATE MATERIALIZED VIEW ticker_return_summary AS
+        WITH returns AS (
+            SELECT
+                ticker,
+                date,
+                price,
+                price / NULLIF(lag(price) OVER w, 0) - 1 AS daily_return,
+                first_value(price) OVER w AS first_price,
+                row_number() OVER (PARTITION BY ticker ORDER BY date DESC) AS rank_desc
+            FROM stock_data
+            WINDOW w AS (PARTITION BY ticker ORDER BY date)
+        )
+        SELECT
+            ticker,
+            min(date) AS first_date,
+            max(date) AS last_date,
+            max(first_price) AS first_price,
+            max(price) FILTER (WHERE rank_desc = 1) AS last_price,
+            avg(daily_return) AS mean_return,
+            exp(sum(ln(NULLIF(1 + daily_return, 0)))) - 1 AS cum_return
+        FROM returns
+        GROUP BY ticker
+        """
+    )
+    op.create_index(
+        "ix_ticker_return_summary_ticker",
+        "ticker_return_summary",
+        ["ticker"],
+        unique=True,
+    )
+
+
+def upgrade() -> None:
+    from db.partitions import DEFAULT_PARTITION, ensure_year_partitions
+
+    # The partition key is NOT NULL. Rows without a date are not deleted here,
+    # they have to be fixed or removed before migrating.
+    connection = op.get_bind()
+    undated = connection.execute(
+        sa.text("SELECT count(*) FROM stock_data WHERE date IS NULL")
+    ).scalar()
+    if undated:
+        raise RuntimeError(
+            f"stock_data has {undated} rows without a date, which a table "
+            "partitioned by date cannot hold. Fix or delete them (DELETE FROM "
+            "stock_data WHERE date IS NULL) and run the migration again."
+        )
+
+    _rename_old_stock_data()
+    _create_stock_data(partition_by="PARTITION BY RANGE (date)")
+
+    # One partition per year of existing data, plus a default partition as a
+    # safety net for rows inserted without db.ingest
+    first_year, last_year = connection.execute(
+        sa.text(
+            "SELECT extract(year FROM min(date))::int, extract(year FROM max(date))::int "
+            "FROM stock_data_old"
+        )
+    ).first()
+    if first_year is not None:
+        ensure_year_partitions(connection, first_year, last_year)
+    op.execute(f"CREATE TABLE {DEFAULT_PARTITION} PARTITION OF stock_data DEFAULT")
+
+    _replace_old_stock_data()
+    _create_views()
+
+
+def downgrade() -> None:
+    _rename_old_stock_data()
+    _create_stock_data()
+    _replace_old_stock_data()
+    _create_views()
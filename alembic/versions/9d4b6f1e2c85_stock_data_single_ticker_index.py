@@ -0,0 +1,54 @@
+"""Stock Data Single Ticker Index
+
+Revision ID: 9d4b6f1e2c85
+Revises: 3f9c2d8e6a17
+Create Date: 2026-10-19 14:26:08.417390
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "9d4b6f1e2c85"
+down_revision: Union[str, None] = "3f9c2d8e6a17"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Distinct tickers are read from stock_data with a skip scan, nothing reads
+    # the view any more and every import refreshed it
+    op.execute("DROP MATERIALIZED VIEW stock_tickers")
+
+    # The unique constraint's index covers price, replacing the second btree on
+    # the same (ticker, date) key
+    op.execute("ALTER TABLE stock_data DROP CONSTRAINT uq_ticker_date")
+    op.execute(
+        "ALTER TABLE stock_data "
+        "ADD CONSTRAINT uq_ticker_date UNIQUE (ticker, date) INCLUDE (price)"
+    )
+    op.drop_index("ix_stock_data_ticker_date", table_name="stock_data")
+
+
+def downgrade() -> None:
+    op.create_index(
+        "ix_stock_data_ticker_date",
+        "stock_data",
+        ["ticker", "date"],
+        unique=False,
+        postgresql_include=["price"],
+    )
+    op.execute("ALTER TABLE stock_data DROP CONSTRAINT uq_ticker_date")
+    op.execute(
+        "ALTER TABLE stock_data ADD CONSTRAINT uq_ticker_date UNIQUE (ticker, date)"
+    )
+
+    op.execute(
+        """
+        CREATE MATERIALIZED VIEW stock_tickers AS
+        SELECT DISTINCT ticker FROM stock_data WHERE ticker IS NOT NULL
+        """
+    )
+    op.create_index("ix_stock_tickers_ticker", "stock_tickers", ["ticker"], unique=True)
@@ -0,0 +1,84 @@
+"""Stock Data Access Paths
+
+Revision ID: b8eda3652abe
+Revises: 2366aebbf8a8
+Create Date: 2026-10-18 10:12:41.518204
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "b8eda3652abe"
+down_revision: Union[str, None] = "2366aebbf8a8"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Covering index for the (ticker, date) -> price access pattern, which also
+    # makes the single column ticker index and the extra primary key index redundant
+    op.create_index(
+        "ix_stock_data_ticker_date",
+        "stock_data",
+        ["ticker", "date"],
+        unique=False,
+        postgresql_include=["price"],
+    )
+    op.drop_index(op.f("ix_stock_data_ticker"), table_name="stock_data")
+    op.drop_index(op.f("ix_stock_data_id"), table_name="stock_data")
+
+    # Ticker dimension, replaces DISTINCT scans over stock_data
+    op.execute(
+        """
+        CREATE MATERIALIZED VIEW stock_tickers AS
+        SELECT DISTINCT ticker FROM stock_data WHERE ticker IS NOT NULL
+        """
+    )
+    op.create_index("ix_stock_tickers_ticker", "stock_tickers", ["ticker"], unique=True)
+
+    # Per-ticker return summary
+    op.execute(
+        """
+        CREATE MATERIALIZED VIEW ticker_return_summary AS
+        WITH returns AS (
+            SELECT
+                ticker,
+                date,
+                price,
+                price / NULLIF(lag(price) OVER w, 0) - 1 AS daily_return,
+                first_value(price) OVER w AS first_price,
+                row_number() OVER (PARTITION BY ticker ORDER BY date DESC) AS rank_desc
+            FROM stock_data
+            WINDOW w AS (PARTITION BY ticker ORDER BY date)
+        )
+        SELECT
+            ticker,
+            min(date) AS first_date,
+            max(date) AS last_date,
+            max(first_price) AS first_price,
+            max(price) FILTER (WHERE rank_desc = 1) AS last_price,
+            avg(daily_return) AS mean_return,
+            exp(sum(ln(NULLIF(1 + daily_return, 0)))) - 1 AS cum_return
+        FROM returns
+        GROUP BY ticker
+        """
+    )
+    op.create_index(
+        "ix_ticker_return_summary_ticker",
+        "ticker_return_summary",
+        ["ticker"],
+        unique=True,
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP MATERIALIZED VIEW ticker_return_summary")
+    op.execute("DROP MATERIALIZED VIEW stock_tickers")
+    op.create_index(op.f("ix_stock_data_id"), "stock_data", ["id"], unique=False)
+    op.create_index(
+        op.f("ix_stock_data_ticker"), "stock_data", ["ticker"], unique=False
+    )
+    op.drop_index("ix_stock_data_ticker_date", table_name="stock_data")
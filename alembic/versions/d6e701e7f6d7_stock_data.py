@@ -39,7 +39,7 @@ def upgrade() -> None:
     # ### end Alembic commands ###
     from sqlalchemy.orm import Session
 
-    from db import stock_data_hook
+    from db.migration_hooks import stock_data_hook
 
     connection = op.get_bind()
     session = Session(bind=connection)
@@ -38,7 +38,7 @@ def upgrade() -> None:
     # ### end Alembic commands ###
     from sqlalchemy.orm import Session
 
-    from db import industry_data_hook
+    from db.migration_hooks import industry_data_hook
 
     connection = op.get_bind()
     session = Session(bind=connection)
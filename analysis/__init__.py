@@ -0,0 +1,21 @@
+from .parallel import ReturnStats, run_parallel
+from .paths import PathGenerator, PathSummary
+from .risk import RiskMetrics, correlation_matrix, return_matrix
+from .series import TickerSeries
+from .simulation import Simulation, SimulationResult
+from .windows import WindowReturns, WindowStats
+
+__all__ = [
+    Simulation,
+    SimulationResult,
+    ReturnStats,
+    run_parallel,
+    TickerSeries,
+    RiskMetrics,
+    correlation_matrix,
+    return_matrix,
+    PathGenerator,
+    PathSummary,
+    WindowReturns,
+    WindowStats,
+]
@@ -0,0 +1,164 @@
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from .simulation import Simulation, batch_plan
+
+DEFAULT_BINS = np.linspace(-1.0, 5.0, 601)
+
+# Per-process simulation attached to the memory-mapped price arrays
+_worker_simulation = None
+
+
+class ReturnStats:
+    """
+    Mergeable summary of a return distribution.
+
+    Keeps count, sum, sum of squares, min, max and a fixed-bin histogram so that
+    chunks can be reduced as they arrive instead of collecting every path.
+    """
+
+    def __init__(self, bins: np.ndarray = DEFAULT_BINS):
+        self.bins = np.asarray(bins, dtype=np.float64)
+        self.count = 0
+        self.nan_count = 0
+        self.total = 0.0
+        self.total_sq = 0.0
+        self.min = np.inf
+        self.max = -np.inf
+        # Two extra buckets for values below the first and above the last edge
+        self.histogram = np.zeros(len(self.bins) + 1, dtype=np.int64)
+
+    @classmethod
+    def from_returns(cls, returns: np.ndarray, bins: np.ndarray = DEFAULT_BINS):
+        stats = cls(bins)
+        valid = returns[~np.isnan(returns)]
+        stats.nan_count = len(returns) - len(valid)
+        if len(valid):
+            stats.count = len(valid)
+            stats.total = float(valid.sum())
+            stats.total_sq = float(np.square(valid).sum())
+            stats.min = float(valid.min())
+            stats.max = float(valid.max())
+            stats.histogram = np.bincount(
+                np.searchsorted(stats.bins, valid, side="right"),
+                minlength=len(stats.histogram),
+            )
+        return stats
+
+    def merge(self, other: "ReturnStats") -> "ReturnStats":
+        self.count += other.count
+        self.nan_count += other.nan_count
+        self.total += other.total
+        self.total_sq += other.total_sq
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self.histogram += other.histogram
+        return self
+
+    @property
+    def mean(self) -> float:
+        """
+        Mean return, NaN when no path had a return.
+        """
+        if not self.count:
+            return np.nan
+        return self.total / self.count
+
+    @property
+    def std(self) -> float:
+        """
+        Population standard deviation, NaN when no path had a return.
+        """
+        if not self.count:
+            return np.nan
+        return float(np.sqrt(max(self.total_sq / self.count - self.mean**2, 0.0)))
+
+    def quantile(self, q: float) -> float:
+        """
+        Approximates a quantile to the resolution of the histogram bins, NaN
+        when no path had a return.
+        """
+        if not self.count:
+            return np.nan
+        position = np.searchsorted(np.cumsum(self.histogram), q * self.count)
+        if position == 0:
+            return self.min
+        if position > len(self.bins) - 1:
+            return self.max
+        return float((self.bins[position - 1] + self.bins[position]) / 2)
+
+
+def _init_worker(entry_path, exit_path, portfolio_size, holding_period, weighting):
+    global _worker_simulation
+    _worker_simulation = Simulation.from_filled_prices(
+        np.load(entry_path, mmap_mode="r"),
+        np.load(exit_path, mmap_mode="r"),
+        portfolio_size,
+        holding_period,
+        weighting,
+    )
+
+
+def _run_chunk(args) -> ReturnStats:
+    n_paths, seed_seq, bins = args
+    result = _worker_simulation.run_batch(n_paths, np.random.default_rng(seed_seq))
+    return ReturnStats.from_returns(result.returns, bins)
+
+
+def run_parallel(
+    simulation: Simulation,
+    n_paths: int,
+    seed=None,
+    batch_size: int = 100_000,
+    max_workers: int = None,
+    bins: np.ndarray = DEFAULT_BINS,
+) -> ReturnStats:
+    """
+    Runs a Simulation across a process pool and reduces the returns to a
+    ReturnStats summary.
+
+    The filled price arrays are written once to memory-mapped .npy files that
+    every worker maps read-only, so they are never pickled. Chunks use the same
+    SeedSequence spawning as Simulation.run and are merged in chunk order, so the
+    result is bit-identical for any number of workers.
+
+    Args:
+        simulation (Simulation): The configured simulation.
+        n_paths (int): Total number of portfolios.
+        seed: Entropy for np.random.SeedSequence.
+        batch_size (int): Paths per chunk.
+        max_workers (int, optional): Pool size, defaults to os.cpu_count().
+        bins (np.ndarray): Histogram bin edges for the return distribution.
+
+    Returns:
+        ReturnStats: Summary of all path returns.
+    """
+    plan = batch_plan(n_paths, batch_size, seed)
+    stats = ReturnStats(bins)
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        entry_path = os.path.join(tmpdir, "entry_prices.npy")
+        exit_path = os.path.join(tmpdir, "exit_prices.npy")
+        np.save(entry_path, simulation.entry_prices)
+        np.save(exit_path, simulation.exit_prices)
+
+        with ProcessPoolExecutor(
+            max_workers=max_workers,
+            initializer=_init_worker,
+            initargs=(
+                entry_path,
+                exit_path,
+                simulation.portfolio_size,
+                simulation.holding_period,
+                simulation.weighting,
+            ),
+        ) as executor:
+            chunks = ((size, seed_seq, bins) for size, seed_seq in plan)
+            # map yields in submission order, which keeps the reduction deterministic
+            for chunk_stats in executor.map(_run_chunk, chunks):
+                stats.merge(chunk_stats)
+
+    return stats
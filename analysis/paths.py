@@ -0,0 +1,386 @@
+import hashlib
+import os
+import tempfile
+from typing import NamedTuple
+
+import numpy as np
+
+from db import PriceMatrix
+from db.price_cache import CACHE_ROOT
+
+from .risk import correlation_matrix
+from .simulation import batch_plan
+
+DEFAULT_PATH_CACHE_DIR = os.path.join(CACHE_ROOT, "paths")
+
+METHODS = ("bootstrap", "block", "gbm")
+
+# Memory budget of one chunk, and the bytes held per simulated (path, day,
+# ticker) value while a chunk is generated: the returns plus the random draws
+# and indices they are built from.
+DEFAULT_MAX_BYTES = 256 * 2**20
+BYTES_PER_VALUE = 64
+
+# Bump it when the GBM parameter estimation changes, it is part of the cache key
+FACTOR_VERSION = "1"
+
+
+class PathSummary(NamedTuple):
+    """
+    Per-path statistics of simulated price paths, one row per path and one
+    column per ticker.
+
+    Attributes:
+        terminal_return (np.ndarray): (n_paths, n_tickers) return over the horizon.
+        max_drawdown (np.ndarray): (n_paths, n_tickers) largest peak-to-trough
+            decline along the path, the start price included, as a negative return.
+    """
+
+    terminal_return: np.ndarray
+    max_drawdown: np.ndarray
+
+    @staticmethod
+    def concatenate(summaries) -> "PathSummary":
+        return PathSummary(*(np.concatenate(arrays) for arrays in zip(*summaries)))
+
+
+class PathGenerator:
+    """
+    Generates future daily returns and price paths of a ticker universe from
+    its historical daily changes.
+
+    Methods:
+        "bootstrap": every day of a path is an independent draw from the
+            ticker's own history.
+        "block": stationary block bootstrap (Politis & Romano); paths are
+            runs of consecutive historical days with geometric lengths of mean
+            `block_length`, which keeps the autocorrelation within a run.
+        "gbm": correlated geometric Brownian motion with the mean and the
+            cross-ticker covariance of the historical log returns, sampled
+            through a cached Cholesky factor.
+
+    The bootstraps resample each ticker independently; "gbm" is the method that
+    keeps the correlation between tickers. Paths are generated in chunks of
+    (n_paths, horizon, n_tickers) arrays whose size is bounded by `max_bytes`.
+    """
+
+    def __init__(
+        self,
+        returns: np.ndarray,
+        start_prices: np.ndarray,
+        tickers=None,
+        min_overlap: int = 63,
+        cache_dir: str = DEFAULT_PATH_CACHE_DIR,
+    ):
+        """
+        Args:
+            returns (np.ndarray): (n_dates, n_tickers) historical daily returns as
+                fractions, NaN where a ticker has no return.
+            start_prices (np.ndarray): (n_tickers,) price every path starts from.
+            tickers: Ticker symbols of the columns, optional.
+            min_overlap (int): Common returns a pair of tickers needs for its
+                correlation to enter the GBM covariance, uncorrelated otherwise.
+            cache_dir (str): Directory of the Cholesky factor cache, None to
+                only keep it in memory.
+        """
+        self.returns = np.asarray(returns, dtype=np.float64)
+        valid = ~np.isnan(self.returns)
+        self.counts = valid.sum(axis=0)
+        # Each ticker's returns moved to the top of its column, in date order,
+        # so a bootstrap draw is an index below the ticker's count
+        order = np.argsort(~valid, axis=0, kind="stable")
+        self.history = np.take_along_axis(self.returns, order, axis=0)[
+            : max(self.counts.max(initial=0), 1)
+        ]
+        self.start_prices = np.asarray(start_prices, dtype=np.float64)
+        self.tickers = None if tickers is None else np.asarray(tickers, dtype=object)
+        self.min_overlap = min_overlap
+        self.cache_dir = cache_dir
+        self._gbm_parameters = None
+
+    @classmethod
+    def from_matrices(
+        cls,
+        pct_changes: PriceMatrix,
+        prices: PriceMatrix,
+        tickers=None,
+        lookback: int = None,
+        **kwargs,
+    ) -> "PathGenerator":
+        """
+        Builds a generator from the stored daily changes, e.g. of
+        StockData.get_pct_change_matrix, starting every path at the last price.
+
+        Args:
+            pct_changes (PriceMatrix): Daily changes of the universe.
+            prices (PriceMatrix): Prices of the same universe.
+            tickers: Tickers to simulate, all tickers of `pct_changes` if omitted.
+            lookback (int, optional): Only use the last `lookback` dates.
+            **kwargs: Passed to PathGenerator.
+
+        Returns:
+            PathGenerator: The generator, columns in the order of `tickers`.
+        """
+        tickers = pct_changes.tickers if tickers is None else np.asarray(tickers)
+        columns = pct_changes.ticker_indices(tickers)
+        price_columns = prices.ticker_indices(tickers)
+        missing = (columns < 0) | (price_columns < 0)
+        if missing.any():
+            raise ValueError(f"Unknown tickers: {list(tickers[missing])}")
+
+        returns = pct_changes.prices[:, columns]
+        # The first row of a ticker has no previous price to change from
+        first_idx = np.argmax(~np.isnan(returns), axis=0)
+        returns[first_idx, np.arange(returns.shape[1])] = np.nan
+        if lookback is not None:
+            returns = returns[-lookback:]
+
+        start_prices = prices.last_valid_prices()[price_columns]
+        return cls(returns, start_prices, tickers, **kwargs)
+
+    @property
+    def n_tickers(self) -> int:
+        return self.history.shape[1]
+
+    def chunk_size(self, horizon: int, max_bytes: int = DEFAULT_MAX_BYTES) -> int:
+        """
+        Number of paths per chunk that keeps a chunk within `max_bytes`.
+        """
+        return max(1, max_bytes // (horizon * max(self.n_tickers, 1) * BYTES_PER_VALUE))
+
+    def _fingerprint(self) -> str:
+        digest = hashlib.sha256()
+        digest.update(repr((FACTOR_VERSION, self.min_overlap)).encode() + b"\0")
+        digest.update(repr(self.returns.shape).encode() + b"\0")
+        digest.update(np.ascontiguousarray(self.returns).tobytes())
+        return digest.hexdigest()
+
+    def _estimate_gbm_parameters(self):
+        # Dates stay aligned across tickers here, unlike in `history`
+        log_returns = np.log1p(self.returns)
+        usable = self.counts >= 2
+        drift = np.full(self.n_tickers, np.nan)
+        factor = np.zeros((self.n_tickers, self.n_tickers))
+        if not usable.any():
+            return drift, factor
+
+        log_returns = log_returns[:, usable]
+        drift[usable] = np.nanmean(log_returns, axis=0)
+        std = np.nanstd(log_returns, axis=0, ddof=1)
+        correlation = correlation_matrix(log_returns, self.min_overlap)
+        correlation[np.isnan(correlation)] = 0.0
+        np.fill_diagonal(correlation, 1.0)
+
+        try:
+            lower = np.linalg.cholesky(correlation)
+        except np.linalg.LinAlgError:
+            # Pairwise estimates need not be positive definite; raise the
+            # eigenvalues to a small floor and rescale to a unit diagonal
+            eigenvalues, eigenvectors = np.linalg.eigh(correlation)
+            correlation = (
+                eigenvectors * np.maximum(eigenvalues, 1e-8)
+            ) @ eigenvectors.T
+            scale = np.sqrt(np.diag(correlation))
+            lower = np.linalg.cholesky(correlation / np.outer(scale, scale))
+        # Cholesky factor of the covariance diag(std) C diag(std)
+        factor[np.ix_(usable, usable)] = lower * std[:, None]
+        return drift, factor
+
+    def gbm_parameters(self):
+        """
+        Daily drift of the log returns and the lower Cholesky factor of their
+        covariance. Estimated once, kept on the instance and in `cache_dir`
+        under a hash of the history.
+
+        Returns:
+            tuple[np.ndarray, np.ndarray]: (n_tickers,) drift and
+            (n_tickers, n_tickers) factor; tickers with fewer than two returns
+            have a NaN drift and a zero row.
+        """
+        if self._gbm_parameters is not None:
+            return self._gbm_parameters
+
+        path = None
+        if self.cache_dir is not None:
+            path = os.path.join(self.cache_dir, f"gbm-{self._fingerprint()}.npz")
+            if os.path.exists(path):
+                with np.load(path) as data:
+                    self._gbm_parameters = data["drift"], data["factor"]
+                return self._gbm_parameters
+
+        drift, factor = self._estimate_gbm_parameters()
+        if path is not None:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            # Written to a temporary file first so a crash never leaves a partial entry
+            fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir)
+            with os.fdopen(fd, "wb") as tmp:
+                np.savez(tmp, drift=drift, factor=factor)
+            os.replace(tmp_path, path)
+        self._gbm_parameters = drift, factor
+        return self._gbm_parameters
+
+    def _bootstrap_indices(self, shape, rng: np.random.Generator) -> np.ndarray:
+        draws = rng.random(shape)
+        draws *= self.counts
+        return draws.astype(np.intp)
+
+    def _block_indices(
+        self, shape, rng: np.random.Generator, block_length: float
+    ) -> np.ndarray:
+        if block_length < 1:
+            raise ValueError(f"block_length must be at least 1, got {block_length}")
+        # A block starts on the first day and then with probability 1/L per day
+        new_block = rng.random(shape) < 1.0 / block_length
+        new_block[:, 0] = True
+        starts = self._bootstrap_indices(shape, rng)
+
+        steps = np.arange(shape[1])[None, :, None]
+        block_start = np.maximum.accumulate(np.where(new_block, steps, 0), axis=1)
+        idx = np.take_along_axis(starts, block_start, axis=1)
+        idx += steps - block_start
+        # Blocks running past the end of a history wrap to its beginning
+        idx %= np.maximum(self.counts, 1)
+        return idx
+
+    def sample_returns(
+        self,
+        n_paths: int,
+        horizon: int,
+        rng: np.random.Generator,
+        method: str = "bootstrap",
+        block_length: float = 20.0,
+    ) -> np.ndarray:
+        """
+        Simulates one chunk of daily returns.
+
+        Args:
+            n_paths (int): Number of paths in the chunk.
+            horizon (int): Number of days per path.
+            rng (np.random.Generator): Source of randomness.
+            method (str): One of METHODS.
+            block_length (float): Mean block length of the "block" method.
+
+        Returns:
+            np.ndarray: (n_paths, horizon, n_tickers) daily returns, NaN for
+            tickers without history.
+        """
+        shape = (n_paths, horizon, self.n_tickers)
+        if method == "gbm":
+            drift, factor = self.gbm_parameters()
+            # One matrix product for the whole chunk
+            shocks = rng.standard_normal((n_paths * horizon, self.n_tickers))
+            returns = shocks @ factor.T
+            returns += drift
+            return np.expm1(returns, out=returns).reshape(shape)
+
+        if method == "bootstrap":
+            idx = self._bootstrap_indices(shape, rng)
+        elif method == "block":
+            idx = self._block_indices(shape, rng, block_length)
+        else:
+            raise ValueError(f"Unknown method: {method}")
+        # Flat positions in the C-ordered history, one gather for the chunk
+        idx *= self.n_tickers
+        idx += np.arange(self.n_tickers)
+        return self.history.ravel().take(idx)
+
+    def iter_returns(
+        self,
+        n_paths: int,
+        horizon: int,
+        method: str = "bootstrap",
+        seed=None,
+        block_length: float = 20.0,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+    ):
+        """
+        Simulates `n_paths` paths in memory-bounded chunks.
+
+        Every chunk draws from its own stream spawned from `seed`, like
+        Simulation.run, so the paths only depend on the arguments.
+
+        Yields:
+            np.ndarray: (chunk_size, horizon, n_tickers) daily returns.
+        """
+        chunk_size = self.chunk_size(horizon, max_bytes)
+        for size, seed_seq in batch_plan(n_paths, chunk_size, seed):
+            yield self.sample_returns(
+                size, horizon, np.random.default_rng(seed_seq), method, block_length
+            )
+
+    def iter_prices(self, n_paths: int, horizon: int, **kwargs):
+        """
+        Price paths of iter_returns, starting from `start_prices` (excluded).
+
+        Yields:
+            np.ndarray: (chunk_size, horizon, n_tickers) prices.
+        """
+        for returns in self.iter_returns(n_paths, horizon, **kwargs):
+            returns += 1
+            np.cumprod(returns, axis=1, out=returns)
+            returns *= self.start_prices
+            yield returns
+
+    def summarize(self, n_paths: int, horizon: int, **kwargs) -> PathSummary:
+        """
+        Terminal return and maximum drawdown of every simulated path, reduced
+        chunk by chunk so only the (n_paths, n_tickers) results are kept.
+
+        Args:
+            n_paths (int): Number of paths per ticker.
+            horizon (int): Number of days per path.
+            **kwargs: method, seed, block_length and max_bytes of iter_returns.
+
+        Returns:
+            PathSummary: The per-path statistics.
+        """
+        summaries = []
+        for growth in self.iter_returns(n_paths, horizon, **kwargs):
+            growth += 1
+            np.cumprod(growth, axis=1, out=growth)
+            peak = np.maximum.accumulate(growth, axis=1)
+            np.maximum(peak, 1.0, out=peak)
+            drawdown = np.divide(growth, peak, out=peak).min(axis=1)
+            summaries.append(PathSummary(growth[:, -1] - 1, drawdown - 1))
+        return PathSummary.concatenate(summaries)
+
+    def terminal_returns(
+        self,
+        n_paths: int,
+        horizon: int,
+        method: str = "bootstrap",
+        seed=None,
+        block_length: float = 20.0,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+    ) -> np.ndarray:
+        """
+        Return over `horizon` days of every path.
+
+        For "gbm" the sum of `horizon` daily log returns is drawn directly, as
+        one normal draw with `horizon` times the daily mean and covariance,
+        which gives the same distribution without simulating the days.
+
+        Returns:
+            np.ndarray: (n_paths, n_tickers) terminal returns.
+        """
+        if method != "gbm":
+            return self.summarize(
+                n_paths,
+                horizon,
+                method=method,
+                seed=seed,
+                block_length=block_length,
+                max_bytes=max_bytes,
+            ).terminal_return
+
+        drift, factor = self.gbm_parameters()
+        chunks = []
+        for size, seed_seq in batch_plan(n_paths, self.chunk_size(1, max_bytes), seed):
+            shocks = np.random.default_rng(seed_seq).standard_normal(
+                (size, self.n_tickers)
+            )
+            log_returns = shocks @ factor.T
+            log_returns *= np.sqrt(horizon)
+            log_returns += horizon * drift
+            chunks.append(np.expm1(log_returns, out=log_returns))
+        return np.concatenate(chunks)
@@ -0,0 +1,301 @@
+from typing import NamedTuple
+
+import numpy as np
+
+from db import PriceMatrix
+
+TRADING_DAYS = 252
+
+
+def return_matrix(matrix: PriceMatrix) -> np.ndarray:
+    """
+    Daily returns of every ticker as a (n_dates, n_tickers) array aligned with
+    the matrix dates. Returns are NaN on the first date, before a ticker's first
+    price and after its last one; a missing day inside a series carries the last
+    price forward, so the move is booked on the next available day.
+    """
+    prices = matrix.forward_filled()
+    n_dates = len(prices)
+    returns = np.full_like(prices, np.nan)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        np.divide(prices[1:], prices[:-1], out=returns[1:])
+    returns[1:] -= 1
+
+    # Forward filling past the last price would add zero returns
+    last_idx = n_dates - 1 - np.argmax(~np.isnan(matrix.prices[::-1]), axis=0)
+    returns[np.arange(n_dates)[:, None] > last_idx] = np.nan
+    return returns
+
+
+def _last_valid(values: np.ndarray) -> np.ndarray:
+    # Last non-NaN value of every column, NaN for all-NaN columns
+    last_idx = len(values) - 1 - np.argmax(~np.isnan(values[::-1]), axis=0)
+    return values[last_idx, np.arange(values.shape[1])]
+
+
+def _moments(returns: np.ndarray):
+    # Count, mean and sample variance of every column, skipping NaNs
+    valid = ~np.isnan(returns)
+    counts = valid.sum(axis=0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        means = np.where(valid, returns, 0.0).sum(axis=0) / counts
+        deviations = np.where(valid, returns - means, 0.0)
+        variances = (deviations * deviations).sum(axis=0) / (counts - 1)
+    variances[counts < 2] = np.nan
+    return counts, means, variances
+
+
+def _rolling_sum(values: np.ndarray, window: int) -> np.ndarray:
+    # Trailing window sums from one cumulative sum; the first window - 1 rows
+    # sum the rows available so far
+    cumulative = np.zeros((len(values) + 1,) + values.shape[1:])
+    np.cumsum(values, axis=0, out=cumulative[1:])
+    sums = cumulative[1:].copy()
+    sums[window:] -= cumulative[1:-window]
+    return sums
+
+
+def _rolling_moments(returns: np.ndarray, window: int, min_periods: int = None):
+    """
+    Count, mean and sample variance over trailing windows of `window` rows.
+
+    Uses cumulative sums of the values and their squares, so the cost does not
+    depend on the window length. Columns are centered on their mean first,
+    which leaves the variance unchanged and keeps the running sums small.
+    """
+    if window < 1:
+        raise ValueError(f"window must be positive, got {window}")
+    min_periods = max(window if min_periods is None else min_periods, 2)
+    valid = ~np.isnan(returns)
+    # All-NaN columns are offset by 0 instead of warning about an empty mean
+    offsets = np.nanmean(np.where(valid.any(axis=0), returns, 0.0), axis=0)
+    centered = np.where(valid, returns - offsets, 0.0)
+
+    counts = _rolling_sum(valid.astype(np.float64), window)
+    sums = _rolling_sum(centered, window)
+    squares = _rolling_sum(centered * centered, window)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        means = sums / counts + offsets
+        variances = np.maximum(squares - sums * sums / counts, 0.0) / (counts - 1)
+    too_short = ~(counts >= min_periods)
+    means[too_short] = np.nan
+    variances[too_short] = np.nan
+    return counts, means, variances
+
+
+def volatility(returns: np.ndarray, periods_per_year: int = TRADING_DAYS) -> np.ndarray:
+    """
+    Annualized standard deviation of each column of daily returns.
+    """
+    _, _, variances = _moments(returns)
+    return np.sqrt(variances * periods_per_year)
+
+
+def rolling_volatility(
+    returns: np.ndarray,
+    window: int,
+    min_periods: int = None,
+    periods_per_year: int = TRADING_DAYS,
+) -> np.ndarray:
+    """
+    Annualized volatility over the trailing `window` rows at every date.
+
+    Args:
+        returns (np.ndarray): (n_dates, n_tickers) daily returns, NaN if missing.
+        window (int): Number of rows per window.
+        min_periods (int, optional): Returns needed in a window, defaults to
+            `window`.
+        periods_per_year (int): Used to annualize.
+
+    Returns:
+        np.ndarray: Same shape as `returns`, NaN where the window is too short.
+    """
+    _, _, variances = _rolling_moments(returns, window, min_periods)
+    return np.sqrt(variances * periods_per_year)
+
+
+def rolling_sharpe_ratio(
+    returns: np.ndarray,
+    window: int,
+    risk_free: float = 0.0,
+    min_periods: int = None,
+    periods_per_year: int = TRADING_DAYS,
+) -> np.ndarray:
+    """
+    Annualized Sharpe ratio over the trailing `window` rows at every date.
+    `risk_free` is the annual rate.
+    """
+    _, means, variances = _rolling_moments(returns, window, min_periods)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return (
+            (means - risk_free / periods_per_year)
+            / np.sqrt(variances)
+            * np.sqrt(periods_per_year)
+        )
+
+
+def max_drawdown(prices: np.ndarray) -> np.ndarray:
+    """
+    Largest peak-to-trough decline of each price column, as a negative return.
+    NaNs are ignored.
+    """
+    running_max = np.fmax.accumulate(prices, axis=0)
+    return np.fmin.reduce(prices / running_max - 1, axis=0)
+
+
+def sharpe_ratio(
+    returns: np.ndarray,
+    risk_free: float = 0.0,
+    periods_per_year: int = TRADING_DAYS,
+) -> np.ndarray:
+    """
+    Annualized Sharpe ratio of each column of daily returns. `risk_free` is the
+    annual rate.
+    """
+    _, means, variances = _moments(returns)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return (
+            (means - risk_free / periods_per_year)
+            / np.sqrt(variances)
+            * np.sqrt(periods_per_year)
+        )
+
+
+def sortino_ratio(
+    returns: np.ndarray,
+    risk_free: float = 0.0,
+    periods_per_year: int = TRADING_DAYS,
+) -> np.ndarray:
+    """
+    Annualized Sortino ratio of each column of daily returns: the mean excess
+    return over the downside deviation below the risk-free rate.
+    """
+    excess = returns - risk_free / periods_per_year
+    valid = ~np.isnan(excess)
+    counts = valid.sum(axis=0)
+    downside = np.minimum(np.where(valid, excess, 0.0), 0.0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        means = np.where(valid, excess, 0.0).sum(axis=0) / counts
+        downside_deviation = np.sqrt((downside * downside).sum(axis=0) / counts)
+        return means / downside_deviation * np.sqrt(periods_per_year)
+
+
+def market_returns(returns: np.ndarray) -> np.ndarray:
+    """
+    Equal-weighted average return of all tickers with a return on each date.
+    """
+    valid = ~np.isnan(returns)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(valid, returns, 0.0).sum(axis=1) / valid.sum(axis=1)
+
+
+def beta(returns: np.ndarray, market: np.ndarray = None) -> np.ndarray:
+    """
+    Beta of each column against `market`, over the dates where both have a
+    return.
+
+    Args:
+        returns (np.ndarray): (n_dates, n_tickers) daily returns.
+        market (np.ndarray, optional): (n_dates,) market returns, defaults to
+            market_returns(returns).
+
+    Returns:
+        np.ndarray: Covariance with the market over the market variance.
+    """
+    if market is None:
+        market = market_returns(returns)
+    valid = ~np.isnan(returns) & ~np.isnan(market)[:, None]
+    counts = valid.sum(axis=0)
+    x = np.where(valid, returns, 0.0)
+    m = np.where(valid, market[:, None], 0.0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        x -= x.sum(axis=0) / counts
+        m -= m.sum(axis=0) / counts
+        # Centering added the mean back to the missing entries
+        x[~valid] = 0.0
+        m[~valid] = 0.0
+        return (x * m).sum(axis=0) / (m * m).sum(axis=0)
+
+
+def correlation_matrix(returns: np.ndarray, min_periods: int = 2) -> np.ndarray:
+    """
+    Pairwise Pearson correlation of all columns, each pair over the dates where
+    both have a return (like DataFrame.corr), computed with matrix products
+    instead of a loop over pairs.
+
+    Memory is a few (n_tickers, n_tickers) float64 arrays.
+
+    Args:
+        returns (np.ndarray): (n_dates, n_tickers) daily returns.
+        min_periods (int): Overlapping returns needed, NaN otherwise.
+
+    Returns:
+        np.ndarray: (n_tickers, n_tickers) correlation matrix.
+    """
+    valid = ~np.isnan(returns)
+    weights = valid.astype(np.float64)
+    offsets = np.nanmean(np.where(valid.any(axis=0), returns, 0.0), axis=0)
+    x = np.where(valid, returns - offsets, 0.0)
+
+    # [i, j] entries are sums over the dates where both i and j are valid
+    counts = weights.T @ weights
+    sums = x.T @ weights
+    squares = (x * x).T @ weights
+    products = x.T @ x
+    with np.errstate(divide="ignore", invalid="ignore"):
+        covariance = products - sums * sums.T / counts
+        variance = squares - sums * sums / counts
+        correlation = covariance / np.sqrt(variance * variance.T)
+    correlation = np.clip(correlation, -1.0, 1.0)
+    correlation[counts < max(min_periods, 2)] = np.nan
+    return correlation
+
+
+class RiskMetrics(NamedTuple):
+    """
+    Per-ticker risk metrics, aligned with the tickers of a PriceMatrix.
+
+    Attributes:
+        volatility (np.ndarray): Annualized volatility over the full history.
+        rolling_volatility (np.ndarray): Annualized volatility of the last
+            `window` returns of each ticker.
+        max_drawdown (np.ndarray): Largest peak-to-trough decline.
+        sharpe_ratio (np.ndarray): Annualized Sharpe ratio.
+        sortino_ratio (np.ndarray): Annualized Sortino ratio.
+        beta (np.ndarray): Beta against the equal-weighted market.
+    """
+
+    volatility: np.ndarray
+    rolling_volatility: np.ndarray
+    max_drawdown: np.ndarray
+    sharpe_ratio: np.ndarray
+    sortino_ratio: np.ndarray
+    beta: np.ndarray
+
+    @staticmethod
+    def from_matrix(
+        matrix: PriceMatrix,
+        window: int = 63,
+        risk_free: float = 0.0,
+        periods_per_year: int = TRADING_DAYS,
+    ) -> "RiskMetrics":
+        """
+        Computes every metric for all tickers at once from one return matrix.
+
+        Args:
+            matrix (PriceMatrix): Prices of the ticker universe.
+            window (int): Rows per window of the rolling volatility.
+            risk_free (float): Annual risk-free rate.
+            periods_per_year (int): Used to annualize.
+        """
+        returns = return_matrix(matrix)
+        return RiskMetrics(
+            volatility=volatility(returns, periods_per_year),
+            rolling_volatility=_last_valid(
+                rolling_volatility(returns, window, periods_per_year=periods_per_year)
+            ),
+            max_drawdown=max_drawdown(matrix.prices),
+            sharpe_ratio=sharpe_ratio(returns, risk_free, periods_per_year),
+            sortino_ratio=sortino_ratio(returns, risk_free, periods_per_year),
+            beta=beta(returns),
+        )
@@ -0,0 +1,116 @@
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+from db import PriceMatrix
+
+from . import risk
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+# Shared epoch for the int32 day offsets of every series
+EPOCH = np.datetime64("1970-01-01", "D")
+
+
+class TickerSeries:
+    """
+    Compact price history of one ticker.
+
+    Dates are int32 day offsets from EPOCH and prices a contiguous float64
+    array. Daily and cumulative returns are computed on first access and the
+    DataFrame view is only built when asked for.
+    """
+
+    __slots__ = ("ticker", "days", "prices", "_returns", "_cum_returns")
+
+    def __init__(self, ticker: str, days: np.ndarray, prices: np.ndarray):
+        """
+        Args:
+            ticker (str): The stock ticker symbol.
+            days (np.ndarray): Sorted day offsets from EPOCH.
+            prices (np.ndarray): Price on each day.
+        """
+        self.ticker = ticker
+        self.days = np.ascontiguousarray(days, dtype=np.int32)
+        self.prices = np.ascontiguousarray(prices, dtype=np.float64)
+        self._returns = None
+        self._cum_returns = None
+
+    @staticmethod
+    def to_days(dates) -> np.ndarray:
+        return (np.asarray(dates, dtype="datetime64[D]") - EPOCH).astype(np.int32)
+
+    @staticmethod
+    def from_dates(ticker: str, dates, prices) -> "TickerSeries":
+        return TickerSeries(ticker, TickerSeries.to_days(dates), prices)
+
+    @staticmethod
+    def from_matrix(matrix: PriceMatrix, ticker: str) -> "TickerSeries":
+        column = matrix.column(ticker)
+        mask = ~np.isnan(column)
+        return TickerSeries.from_dates(ticker, matrix.dates[mask], column[mask])
+
+    def __len__(self) -> int:
+        return len(self.prices)
+
+    @property
+    def dates(self) -> np.ndarray:
+        return EPOCH + self.days
+
+    @property
+    def returns(self) -> np.ndarray:
+        """
+        Daily returns, NaN on the first day.
+        """
+        if self._returns is None:
+            returns = np.empty_like(self.prices)
+            returns[:1] = np.nan
+            np.divide(self.prices[1:], self.prices[:-1], out=returns[1:])
+            returns[1:] -= 1
+            self._returns = returns
+        return self._returns
+
+    @property
+    def cum_returns(self) -> np.ndarray:
+        """
+        Cumulative return since the first day.
+        """
+        if self._cum_returns is None:
+            self._cum_returns = self.prices / self.prices[0] - 1
+        return self._cum_returns
+
+    @property
+    def avg_return(self) -> float:
+        return float(np.nanmean(self.returns)) if len(self) > 1 else np.nan
+
+    @property
+    def last_cum_return(self) -> float:
+        return float(self.prices[-1] / self.prices[0] - 1)
+
+    @property
+    def volatility(self) -> float:
+        """
+        Annualized volatility of the daily returns.
+        """
+        return float(risk.volatility(self.returns[:, None])[0])
+
+    @property
+    def max_drawdown(self) -> float:
+        return float(risk.max_drawdown(self.prices[:, None])[0])
+
+    @property
+    def sharpe_ratio(self) -> float:
+        return float(risk.sharpe_ratio(self.returns[:, None])[0])
+
+    def to_df(self) -> "pd.DataFrame":
+        import pandas as pd
+
+        return pd.DataFrame(
+            {
+                "Date": pd.DatetimeIndex(self.dates),
+                "Price": self.prices,
+                "Return": self.returns,
+                "Cumulative Return": self.cum_returns,
+            }
+        )
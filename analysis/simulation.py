@@ -0,0 +1,210 @@
+from typing import NamedTuple
+
+import numpy as np
+
+from db import PriceMatrix, draw_distinct
+
+
+class SimulationResult(NamedTuple):
+    """
+    Outcome of a batch of random portfolios, one row per path. Paths only hold
+    tickers priced at both their entry and exit date, so every return is finite.
+
+    Attributes:
+        ticker_idx (np.ndarray): (n_paths, portfolio_size) column indices into the matrix.
+        weights (np.ndarray): (n_paths, portfolio_size) portfolio weights summing to 1.
+        entry_idx (np.ndarray): (n_paths,) row index of the entry date.
+        returns (np.ndarray): (n_paths,) portfolio return over the holding period.
+    """
+
+    ticker_idx: np.ndarray
+    weights: np.ndarray
+    entry_idx: np.ndarray
+    returns: np.ndarray
+
+    @staticmethod
+    def concatenate(results) -> "SimulationResult":
+        return SimulationResult(*(np.concatenate(arrays) for arrays in zip(*results)))
+
+
+class Simulation:
+    """
+    Vectorized random-portfolio Monte Carlo over a preloaded PriceMatrix.
+
+    Each path draws an entry date, `portfolio_size` distinct tickers among the
+    ones priced over its holding period and a weight vector, holds for
+    `holding_period` rows of the matrix and records the portfolio return. Paths
+    are evaluated in batches as array operations.
+    """
+
+    def __init__(
+        self,
+        matrix: PriceMatrix,
+        portfolio_size: int,
+        holding_period: int,
+        weighting: str = "equal",
+    ):
+        """
+        Args:
+            matrix (PriceMatrix): Prices of the ticker universe.
+            portfolio_size (int): Number of distinct tickers per portfolio.
+            holding_period (int): Number of matrix rows between entry and exit.
+            weighting (str): "equal" for 1/n weights or "random" for uniform
+                Dirichlet weights.
+        """
+        # Entry prices are the price on or after a date, exit prices the price
+        # on or before it, so gaps never produce a lookup miss inside a series.
+        self._configure(
+            matrix.backfilled(),
+            matrix.forward_filled(),
+            portfolio_size,
+            holding_period,
+            weighting,
+        )
+        self.matrix = matrix
+
+    @classmethod
+    def from_filled_prices(
+        cls,
+        entry_prices: np.ndarray,
+        exit_prices: np.ndarray,
+        portfolio_size: int,
+        holding_period: int,
+        weighting: str = "equal",
+    ) -> "Simulation":
+        """
+        Builds a Simulation from already back/forward filled price arrays, e.g.
+        memory-mapped copies of another Simulation's arrays in a worker process.
+        """
+        simulation = cls.__new__(cls)
+        simulation._configure(
+            entry_prices, exit_prices, portfolio_size, holding_period, weighting
+        )
+        simulation.matrix = None
+        return simulation
+
+    def _configure(
+        self, entry_prices, exit_prices, portfolio_size, holding_period, weighting
+    ):
+        n_dates, n_tickers = entry_prices.shape
+        if not 0 < portfolio_size <= n_tickers:
+            raise ValueError(
+                f"portfolio_size must be between 1 and {n_tickers}, got {portfolio_size}"
+            )
+        if not 0 < holding_period < n_dates:
+            raise ValueError(
+                f"holding_period must be between 1 and {n_dates - 1}, got {holding_period}"
+            )
+        if weighting not in ("equal", "random"):
+            raise ValueError(f"Unknown weighting: {weighting}")
+
+        self.entry_prices = entry_prices
+        self.exit_prices = exit_prices
+        self.portfolio_size = portfolio_size
+        self.holding_period = holding_period
+        self.weighting = weighting
+
+        # Tickers listed late or delisted early have no price at one end of
+        # some holding periods. Entry rows are grouped by the set of tickers
+        # priced at both ends, which only changes when a ticker lists or
+        # delists, and rows with fewer than portfolio_size of them are skipped.
+        n_entry_dates = n_dates - holding_period
+        priced = ~np.isnan(entry_prices[:n_entry_dates]) & ~np.isnan(
+            exit_prices[holding_period:]
+        )
+        self.entry_rows = np.flatnonzero(priced.sum(axis=1) >= portfolio_size)
+        if not len(self.entry_rows):
+            raise ValueError(
+                f"No entry date has {portfolio_size} tickers priced over a "
+                f"{holding_period} row holding period"
+            )
+        masks, groups = np.unique(
+            np.packbits(priced[self.entry_rows], axis=1),
+            axis=0,
+            return_inverse=True,
+        )
+        self.entry_groups = groups.ravel()
+        self.group_tickers = [
+            np.flatnonzero(np.unpackbits(mask)[:n_tickers]) for mask in masks
+        ]
+
+    @property
+    def n_entry_dates(self) -> int:
+        return len(self.entry_rows)
+
+    def run_batch(self, n_paths: int, rng: np.random.Generator) -> SimulationResult:
+        """
+        Simulates one batch of paths.
+
+        Args:
+            n_paths (int): Number of portfolios in the batch.
+            rng (np.random.Generator): Source of randomness.
+
+        Returns:
+            SimulationResult: The batch outcome.
+        """
+        k = self.portfolio_size
+
+        entry_pos = rng.integers(0, self.n_entry_dates, size=n_paths)
+        entry_idx = self.entry_rows[entry_pos]
+        exit_idx = entry_idx + self.holding_period
+
+        # k distinct tickers per row in O(k) draws, not one key per ticker,
+        # among the tickers priced over each path's holding period
+        groups = self.entry_groups[entry_pos]
+        order = np.argsort(groups, kind="stable")
+        group_ids, starts = np.unique(groups[order], return_index=True)
+        ticker_idx = np.empty((n_paths, k), dtype=np.int64)
+        for group, paths in zip(group_ids, np.split(order, starts[1:])):
+            tickers = self.group_tickers[group]
+            ticker_idx[paths] = tickers[draw_distinct(rng, len(tickers), k, len(paths))]
+
+        if self.weighting == "equal":
+            weights = np.full((n_paths, k), 1.0 / k)
+        else:
+            weights = rng.dirichlet(np.ones(k), size=n_paths)
+
+        entry = self.entry_prices[entry_idx[:, None], ticker_idx]
+        exit_ = self.exit_prices[exit_idx[:, None], ticker_idx]
+        returns = np.einsum("ij,ij->i", weights, exit_ / entry) - 1
+
+        return SimulationResult(ticker_idx, weights, entry_idx, returns)
+
+    def run(
+        self, n_paths: int, seed=None, batch_size: int = 100_000
+    ) -> SimulationResult:
+        """
+        Simulates `n_paths` portfolios in batches of at most `batch_size`.
+
+        Every batch draws from its own stream spawned from `seed`, so the
+        result only depends on (seed, n_paths, batch_size) and matches
+        analysis.parallel.run_parallel for the same arguments.
+
+        Args:
+            n_paths (int): Total number of portfolios.
+            seed: Entropy for np.random.SeedSequence.
+            batch_size (int): Maximum number of paths evaluated at once.
+
+        Returns:
+            SimulationResult: The outcome of all paths.
+        """
+        results = [
+            self.run_batch(size, np.random.default_rng(seed_seq))
+            for size, seed_seq in batch_plan(n_paths, batch_size, seed)
+        ]
+        return SimulationResult.concatenate(results)
+
+
+def batch_plan(n_paths: int, batch_size: int, seed=None):
+    """
+    Splits `n_paths` into batches and pairs each with an independent child
+    SeedSequence of `seed`.
+
+    Returns:
+        list[tuple[int, np.random.SeedSequence]]: (batch size, seed) per batch.
+    """
+    sizes = [
+        min(batch_size, n_paths - start) for start in range(0, n_paths, batch_size)
+    ]
+    seed_seqs = np.random.SeedSequence(seed).spawn(len(sizes))
+    return list(zip(sizes, seed_seqs))
@@ -0,0 +1,223 @@
+from typing import TYPE_CHECKING, NamedTuple
+
+import numpy as np
+
+from db import PriceMatrix
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+# Windows evaluated at once by WindowReturns.stats, bounds the
+# (windows, tickers) block held in memory
+DEFAULT_WINDOW_CHUNK = 1024
+
+
+class WindowStats(NamedTuple):
+    """
+    Cross-sectional statistics of the ticker returns of each window, the
+    per-window counterpart of the AllTickers summary. Tickers without a price
+    inside a window are left out of it.
+
+    Attributes:
+        start (np.ndarray): First trading day of each window.
+        end (np.ndarray): Last trading day of each window.
+        count (np.ndarray): Tickers with a return over the window.
+        avg_return (np.ndarray): Mean return.
+        median_return (np.ndarray): Median return.
+        above_avg (np.ndarray): Tickers beating the mean.
+        share_above_avg (np.ndarray): above_avg over count.
+    """
+
+    start: np.ndarray
+    end: np.ndarray
+    count: np.ndarray
+    avg_return: np.ndarray
+    median_return: np.ndarray
+    above_avg: np.ndarray
+    share_above_avg: np.ndarray
+
+    @staticmethod
+    def from_returns(start, end, returns: np.ndarray) -> "WindowStats":
+        """
+        Args:
+            start: (n_windows,) first day of each window.
+            end: (n_windows,) last day of each window.
+            returns (np.ndarray): (n_windows, n_tickers) returns, NaN if missing.
+        """
+        valid = ~np.isnan(returns)
+        count = valid.sum(axis=1)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            avg_return = np.where(valid, returns, 0.0).sum(axis=1) / count
+            above_avg = (returns > avg_return[:, None]).sum(axis=1)
+            share_above_avg = above_avg / count
+
+        # Medians from the middle elements of each row, NaNs sort last
+        ordered = np.sort(returns, axis=1)
+        lower = np.maximum(count - 1, 0) // 2
+        upper = count // 2
+        rows = np.arange(len(ordered))
+        if ordered.shape[1]:
+            median_return = (ordered[rows, lower] + ordered[rows, upper]) / 2
+        else:
+            median_return = np.full(len(ordered), np.nan)
+        median_return[count == 0] = np.nan
+        return WindowStats(
+            np.asarray(start),
+            np.asarray(end),
+            count,
+            avg_return,
+            median_return,
+            above_avg,
+            share_above_avg,
+        )
+
+    @staticmethod
+    def concatenate(stats) -> "WindowStats":
+        return WindowStats(*(np.concatenate(arrays) for arrays in zip(*stats)))
+
+    def to_df(self) -> "pd.DataFrame":
+        import pandas as pd
+
+        return pd.DataFrame(
+            {
+                name.replace("_", " ").title(): values
+                for name, values in zip(self._fields, self)
+            }
+        )
+
+
+class WindowReturns:
+    """
+    Returns of every ticker over arbitrary date windows of a PriceMatrix.
+
+    Log prices are the prefix sums of the daily log returns, so the return over
+    a window is the exponential of the difference of two prefix entries. They
+    are computed once; each window then costs one lookup per ticker. Like
+    AllTickers.window_chart, a window runs from the price on or after its start
+    date to the price on or before its end date. A ticker without a price inside
+    the window has a NaN return, which a prefix count of prices detects.
+    """
+
+    def __init__(self, matrix: PriceMatrix):
+        """
+        Args:
+            matrix (PriceMatrix): Prices of the ticker universe.
+        """
+        self.dates = matrix.dates
+        self.tickers = matrix.tickers
+        with np.errstate(divide="ignore", invalid="ignore"):
+            # Entry at the price on or after a row, exit on or before it
+            self.log_entry = np.log(matrix.backfilled())
+            self.log_exit = np.log(matrix.forward_filled())
+        # prices[:i].count() of every column at row i
+        self.price_counts = np.zeros((len(self.dates) + 1, len(self.tickers)), np.int32)
+        np.cumsum(~np.isnan(matrix.prices), axis=0, out=self.price_counts[1:])
+
+    def rows(self, start_dates, end_dates):
+        """
+        Row of the first trading day on or after each start date and of the
+        last one on or before each end date.
+        """
+        start_rows = np.searchsorted(
+            self.dates, np.asarray(start_dates, dtype="datetime64[D]"), side="left"
+        )
+        end_rows = (
+            np.searchsorted(
+                self.dates, np.asarray(end_dates, dtype="datetime64[D]"), side="right"
+            )
+            - 1
+        )
+        return start_rows, end_rows
+
+    def returns_between_rows(self, start_rows, end_rows) -> np.ndarray:
+        """
+        Returns of every ticker over the windows [start_rows[i], end_rows[i]].
+
+        Returns:
+            np.ndarray: (n_windows, n_tickers) returns, NaN for windows without
+            trading days and tickers without a price inside the window.
+        """
+        start_rows = np.asarray(start_rows, dtype=np.intp)
+        end_rows = np.asarray(end_rows, dtype=np.intp)
+        valid = (
+            (start_rows <= end_rows) & (start_rows < len(self.dates)) & (end_rows >= 0)
+        )
+        start_rows = np.where(valid, start_rows, 0)
+        end_rows = np.where(valid, end_rows, 0)
+
+        returns = self.log_exit[end_rows] - self.log_entry[start_rows]
+        np.expm1(returns, out=returns)
+        traded = self.price_counts[end_rows + 1] > self.price_counts[start_rows]
+        returns[~(traded & valid[:, None])] = np.nan
+        return returns
+
+    def returns(self, start_dates, end_dates) -> np.ndarray:
+        """
+        Same as returns_between_rows for windows given as date arrays.
+        """
+        return self.returns_between_rows(*self.rows(start_dates, end_dates))
+
+    def month_rows(self):
+        """
+        Rows of the first and of the last trading day of every month in the
+        matrix; the last month ends on the last date of the matrix.
+        """
+        months = self.dates.astype("datetime64[M]")
+        changes = np.flatnonzero(months[1:] != months[:-1]) + 1
+        first_rows = np.concatenate(([0], changes))[: len(months)]
+        last_rows = np.append(changes - 1, len(months) - 1)[: len(months)]
+        return first_rows, last_rows
+
+    def month_grid(self, min_months: int = 1, max_months: int = None):
+        """
+        Windows from every month start to every month end at least
+        `min_months` and at most `max_months` calendar months later, counting
+        the start month; month_grid(12, 12) gives rolling 12-month windows.
+
+        Returns:
+            tuple[np.ndarray, np.ndarray]: Start and end rows of the windows,
+            ordered by start and then end.
+        """
+        first_rows, last_rows = self.month_rows()
+        start_idx, end_idx = np.triu_indices(len(first_rows))
+        # Calendar months, also across months without trading days
+        month_numbers = self.dates[first_rows].astype("datetime64[M]").astype(np.int64)
+        months = month_numbers[end_idx] - month_numbers[start_idx] + 1
+        keep = months >= min_months
+        if max_months is not None:
+            keep &= months <= max_months
+        return first_rows[start_idx[keep]], last_rows[end_idx[keep]]
+
+    def stats(
+        self, start_rows, end_rows, chunk_size: int = DEFAULT_WINDOW_CHUNK
+    ) -> WindowStats:
+        """
+        Average, median and above-average statistics of every window, computed
+        `chunk_size` windows at a time so only the statistics are kept.
+
+        Args:
+            start_rows: (n_windows,) first row of each window.
+            end_rows: (n_windows,) last row of each window.
+            chunk_size (int): Windows evaluated at once.
+
+        Returns:
+            WindowStats: One entry per window.
+        """
+        start_rows = np.asarray(start_rows, dtype=np.intp)
+        end_rows = np.asarray(end_rows, dtype=np.intp)
+        chunks = []
+        for offset in range(0, len(start_rows), chunk_size):
+            starts = start_rows[offset : offset + chunk_size]  # noqa: E203
+            ends = end_rows[offset : offset + chunk_size]  # noqa: E203
+            chunks.append(
+                WindowStats.from_returns(
+                    self.dates[np.minimum(starts, len(self.dates) - 1)],
+                    self.dates[np.maximum(ends, 0)],
+                    self.returns_between_rows(starts, ends),
+                )
+            )
+        if not chunks:
+            return WindowStats.from_returns(
+                self.dates[:0], self.dates[:0], np.empty((0, len(self.tickers)))
+            )
+        return WindowStats.concatenate(chunks)
@@ -0,0 +1,4 @@
+from .harness import Benchmark, QueryCounter
+from .synthetic import generate_price_chunks, load_synthetic_data
+
+__all__ = [Benchmark, QueryCounter, generate_price_chunks, load_synthetic_data]
@@ -0,0 +1,227 @@
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+from sqlalchemy import create_engine, inspect
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import text
+
+from analysis import (
+    PathGenerator,
+    RiskMetrics,
+    WindowReturns,
+    correlation_matrix,
+    return_matrix,
+)
+from db import Base, Industry, PriceCache, ReturnState, StockData, TickerSampler
+
+from .harness import Benchmark
+from .synthetic import load_synthetic_data
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Loads the per-ticker returns like `python run.py` does, from a fresh interpreter
+COLD_START_SCRIPT = """
+import json, sys, time
+start = time.perf_counter()
+from run import AllTickers
+imported = time.perf_counter()
+AllTickers().avg_last_cum_return
+print(json.dumps({
+    "import_s": imported - start,
+    "load_s": time.perf_counter() - imported,
+    "heavy_modules": [m for m in ("pandas", "plotly", "alembic") if m in sys.modules],
+}))
+"""
+
+
+def cold_start(url: str, cache_dir: str) -> dict:
+    """
+    Runs COLD_START_SCRIPT in a new process against `url`, with the price cache
+    in `cache_dir`, and returns its timings plus the total process time.
+    """
+    env = dict(os.environ, DATABASE_URL=url, MONTE_CARLO_CACHE_DIR=cache_dir)
+    start = time.perf_counter()
+    completed = subprocess.run(
+        [sys.executable, "-c", COLD_START_SCRIPT],
+        cwd=REPO_ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return {"process_s": time.perf_counter() - start, **json.loads(completed.stdout)}
+
+
+def run_benchmarks(
+    url: str, n_tickers: int, years: int, sample: int, seed: int, paths: int = 1000
+) -> dict:
+    engine = create_engine(url)
+    if inspect(engine).has_table(StockData.__tablename__):
+        raise SystemExit(
+            f"{url} already has a stock_data table, use a throwaway database"
+        )
+
+    benchmark = Benchmark(engine)
+    session = Session(bind=engine)
+    workdir = tempfile.mkdtemp(prefix="monte-carlo-bench-")
+
+    try:
+        with benchmark.stage("load_synthetic_data") as info:
+            info["rows"] = load_synthetic_data(engine, n_tickers, years, seed)
+
+        with benchmark.stage("get_df_from_sql_full_table") as info:
+            df = StockData.get_df_from_sql(
+                session, text("SELECT date, ticker, price FROM stock_data")
+            )
+            info["rows"] = len(df)
+            del df
+
+        with benchmark.stage("get_price_matrix") as info:
+            matrix = StockData.get_price_matrix(session)
+            info["shape"] = list(matrix.shape)
+
+        cache = PriceCache(os.path.join(workdir, "prices"))
+        with benchmark.stage("price_cache_cold"):
+            cache.load(session)
+        with benchmark.stage("price_cache_warm"):
+            cache.load(session)
+
+        with benchmark.stage("matrix_last_cum_returns"):
+            last_cum_returns = matrix.last_cum_returns()
+
+        with benchmark.stage("risk_metrics"):
+            RiskMetrics.from_matrix(matrix)
+
+        with benchmark.stage("window_stats_month_grid") as info:
+            windows = WindowReturns(matrix)
+            info["windows"] = len(windows.stats(*windows.month_grid()).count)
+
+        with benchmark.stage("correlation_matrix") as info:
+            info["shape"] = list(correlation_matrix(return_matrix(matrix)).shape)
+
+        with benchmark.stage("get_pct_change_matrix"):
+            pct_changes = StockData.get_pct_change_matrix(session)
+        generator = PathGenerator.from_matrices(
+            pct_changes, matrix, cache_dir=os.path.join(workdir, "paths")
+        )
+        for method in ("bootstrap", "block", "gbm"):
+            with benchmark.stage(f"paths_{method}") as info:
+                summary = generator.summarize(paths, 252, method=method, seed=seed)
+                info["shape"] = list(summary.terminal_return.shape) + [252]
+        with benchmark.stage("paths_gbm_terminal") as info:
+            info["shape"] = list(
+                generator.terminal_returns(paths, 252, method="gbm", seed=seed).shape
+            )
+
+        with benchmark.stage("sector_breakdown") as info:
+            breakdown = Industry.get_sector_index(session).breakdown(
+                matrix.tickers, last_cum_returns, "industry"
+            )
+            info["groups"] = len(breakdown)
+
+        sampler = TickerSampler.from_sector_index(
+            matrix.tickers, Industry.get_sector_index(session), seed=seed
+        )
+        portfolio_size = min(10, len(sampler))
+        with benchmark.stage("ticker_sampler") as info:
+            for replace in (False, True):
+                sampler.sample_indices(portfolio_size, size=1_000_000, replace=replace)
+            sampler.stratified_indices(portfolio_size, size=1_000_000)
+            info["samples"] = 3_000_000
+
+        # The first run fills the cache, the second is the cached startup
+        cold_start(url, os.path.join(workdir, "cold_start"))
+        with benchmark.stage("cold_start_cached_run") as info:
+            info.update(cold_start(url, os.path.join(workdir, "cold_start")))
+
+        with benchmark.stage("return_state_full_recompute"):
+            ReturnState(os.path.join(workdir, "return_state.npz")).refresh(session)
+
+        tickers = matrix.tickers[:sample].tolist()
+        with benchmark.stage("per_ticker_queries") as info:
+            for ticker in tickers:
+                StockData.get_ordered_dates_and_prices(session, ticker)
+            info["tickers"] = len(tickers)
+
+        with benchmark.stage("ticker_calc_returns") as info:
+            from run import Ticker
+
+            for ticker in tickers:
+                Ticker(ticker, prices=matrix.series(ticker)).df
+            info["tickers"] = len(tickers)
+
+        with benchmark.stage("ticker_series_returns") as info:
+            from analysis import TickerSeries
+
+            for ticker in tickers:
+                series = TickerSeries.from_matrix(matrix, ticker)
+                series.avg_return, series.last_cum_return
+            info["tickers"] = len(tickers)
+    finally:
+        session.close()
+        Base.metadata.drop_all(engine)
+        engine.dispose()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    return {
+        "config": {
+            "dialect": engine.dialect.name,
+            "tickers": n_tickers,
+            "years": years,
+            "sample": sample,
+            "paths": paths,
+            "seed": seed,
+        },
+        "environment": Benchmark.environment(),
+        "stages": benchmark.stages,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark the data pipeline on synthetic data.",
+        prog="python -m benchmarks",
+    )
+    parser.add_argument("--tickers", type=int, default=500)
+    parser.add_argument("--years", type=int, default=5)
+    parser.add_argument(
+        "--url",
+        help="Throwaway database URL; tables are created and dropped. "
+        "Defaults to a temporary SQLite file.",
+    )
+    parser.add_argument(
+        "--sample", type=int, default=100, help="Tickers used by per-ticker stages."
+    )
+    parser.add_argument(
+        "--paths", type=int, default=1000, help="Future paths per ticker."
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--output", help="Write the JSON report here instead of stdout."
+    )
+    args = parser.parse_args()
+
+    url = args.url
+    if url is None:
+        url = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench.db')}"
+
+    report = run_benchmarks(
+        url, args.tickers, args.years, args.sample, args.seed, args.paths
+    )
+
+    if args.output:
+        with open(args.output, "w") as output:
+            json.dump(report, output, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+
+
+if __name__ == "__main__":
+    main()
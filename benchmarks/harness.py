@@ -0,0 +1,54 @@
+import os
+import sys
+import time
+from contextlib import contextmanager
+
+from sqlalchemy.engine import Engine
+
+from profiling import QueryCounter, peak_rss_mb, reset_peak_rss
+
+
+class Benchmark:
+    """
+    Collects per-stage wall time, peak RSS and query counts.
+    """
+
+    def __init__(self, engine: Engine):
+        self.counter = QueryCounter(engine)
+        self.stages = []
+
+    @contextmanager
+    def stage(self, name: str):
+        """
+        Measures the enclosed block. The yielded dict can be given a "rows" entry.
+        """
+        info = {}
+        per_stage_peak = reset_peak_rss()
+        queries, db_time = self.counter.queries, self.counter.db_time
+        start = time.perf_counter()
+        yield info
+        self.stages.append(
+            {
+                "name": name,
+                "wall_time_s": time.perf_counter() - start,
+                "db_time_s": self.counter.db_time - db_time,
+                "queries": self.counter.queries - queries,
+                "peak_rss_mb": peak_rss_mb(),
+                "peak_rss_scope": "stage" if per_stage_peak else "process",
+                **info,
+            }
+        )
+
+    @staticmethod
+    def environment() -> dict:
+        import numpy
+        import pandas
+        import sqlalchemy
+
+        return {
+            "python": sys.version.split()[0],
+            "numpy": numpy.__version__,
+            "pandas": pandas.__version__,
+            "sqlalchemy": sqlalchemy.__version__,
+            "cpu_count": os.cpu_count(),
+        }
@@ -0,0 +1,115 @@
+import numpy as np
+from sqlalchemy.engine import Engine
+
+from db import Industry, Sector, StockData
+
+SECTORS = (
+    "Technology",
+    "Finance",
+    "Consumer Services",
+    "Capital Goods",
+    "Health Care",
+    "Basic Industries",
+    "Energy",
+    "Public Utilities",
+)
+
+
+def synthetic_tickers(n_tickers: int) -> list:
+    return [f"S{i:05d}" for i in range(n_tickers)]
+
+
+def synthetic_dates(years: int, start: str = "2000-01-03") -> np.ndarray:
+    """
+    Returns `years` of business days starting at `start`.
+    """
+    start_date = np.datetime64(start, "D")
+    end_date = start_date + np.timedelta64(365 * years, "D")
+    days = np.arange(start_date, end_date, dtype="datetime64[D]")
+    return days[np.is_busday(days)]
+
+
+def generate_price_chunks(
+    n_tickers: int, years: int, seed: int = 0, tickers_per_chunk: int = 100
+):
+    """
+    Yields lists of (date, price, ticker, daily_pct_change) rows with geometric
+    Brownian motion prices, `tickers_per_chunk` tickers at a time so memory stays
+    bounded at any scale.
+    """
+    rng = np.random.default_rng(seed)
+    dates = synthetic_dates(years)
+    python_dates = dates.astype(object).tolist()
+    tickers = synthetic_tickers(n_tickers)
+
+    for start in range(0, n_tickers, tickers_per_chunk):
+        chunk_tickers = tickers[start : start + tickers_per_chunk]  # noqa: E203
+        returns = rng.normal(3e-4, 0.02, size=(len(dates), len(chunk_tickers)))
+        returns[0] = 0.0
+        prices = rng.uniform(5, 500, size=len(chunk_tickers)) * np.cumprod(
+            1 + returns, axis=0
+        )
+        yield [
+            (python_dates[d], float(prices[d, t]), ticker, float(returns[d, t]))
+            for t, ticker in enumerate(chunk_tickers)
+            for d in range(len(dates))
+        ]
+
+
+def generate_industry_rows(n_tickers: int, seed: int = 0) -> list:
+    rng = np.random.default_rng(seed)
+    sectors = rng.choice(len(SECTORS), size=n_tickers)
+    # Log-uniform market caps from $10M to $1T span every MARKET_CAP_BUCKETS size
+    market_caps = np.round(10 ** rng.uniform(7, 12, size=n_tickers)).astype(np.int64)
+    last_sales = np.round(rng.uniform(1, 500, size=n_tickers), 2)
+    ipo_years = rng.integers(1980, 2021, size=n_tickers)
+    return [
+        {
+            "symbol": ticker,
+            "name": f"Synthetic {ticker}",
+            "last_sale": float(last_sale),
+            "market_cap": int(market_cap),
+            "ipo_year": int(ipo_year),
+            "sector": SECTORS[sector],
+            "industry": f"{SECTORS[sector]} {sector % 3}",
+        }
+        for ticker, sector, last_sale, market_cap, ipo_year in zip(
+            synthetic_tickers(n_tickers), sectors, last_sales, market_caps, ipo_years
+        )
+    ]
+
+
+def load_synthetic_data(engine: Engine, n_tickers: int, years: int, seed: int = 0):
+    """
+    Creates the tables and fills stock_data and industry_data with synthetic
+    rows. Postgres is loaded through the COPY ingestion path, other databases
+    through executemany inserts with explicit ids, since the (id, date) primary
+    key is only auto-incremented by Postgres.
+
+    Returns:
+        int: Number of stock_data rows loaded.
+    """
+    from db.ingest import copy_rows
+
+    StockData.metadata.create_all(engine)
+    loaded = 0
+    with engine.begin() as connection:
+        for chunk in generate_price_chunks(n_tickers, years, seed):
+            if engine.dialect.name == "postgresql":
+                copy_rows(connection, chunk)
+            else:
+                connection.execute(
+                    StockData.__table__.insert(),
+                    [
+                        dict(
+                            id=loaded + i, date=d, price=p, ticker=t, daily_pct_change=r
+                        )
+                        for i, (d, p, t, r) in enumerate(chunk, start=1)
+                    ],
+                )
+            loaded += len(chunk)
+        connection.execute(
+            Industry.__table__.insert(), generate_industry_rows(n_tickers, seed)
+        )
+        Sector.sync_from_industry_data(connection)
+    return loaded
@@ -0,0 +1,192 @@
+import hashlib
+import os
+import shutil
+import tempfile
+from typing import NamedTuple
+
+import numpy as np
+
+from db.price_cache import CACHE_ROOT
+
+DEFAULT_CHART_CACHE_DIR = os.path.join(CACHE_ROOT, "charts")
+
+# Formats Kaleido renders; html and json are written by plotly itself
+IMAGE_FORMATS = ("png", "jpeg", "webp", "svg", "pdf")
+FORMATS = IMAGE_FORMATS + ("html", "json")
+
+# Part of every chart fingerprint, bump it when the figure styling changes
+RENDER_VERSION = "1"
+
+
+def bar_colors(values: np.ndarray, threshold: float) -> np.ndarray:
+    """
+    Green above the threshold, red below zero and yellow otherwise.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    with np.errstate(invalid="ignore"):
+        return np.select(
+            [values > threshold, values < 0], ["green", "red"], default="yellow"
+        )
+
+
+class BarChart(NamedTuple):
+    """
+    Summary data of one returns bar chart. The figure is only built when the
+    chart is not in the render cache.
+
+    Attributes:
+        name (str): Output file name without the extension.
+        title (str): Chart title.
+        labels (np.ndarray): Bar labels, e.g. tickers.
+        values (np.ndarray): Bar heights.
+        threshold (float): Bars above it are green.
+    """
+
+    name: str
+    title: str
+    labels: np.ndarray
+    values: np.ndarray
+    threshold: float
+
+    @staticmethod
+    def sorted(name: str, title: str, labels, values, threshold: float) -> "BarChart":
+        """
+        Builds a chart with the bars in ascending order of value, NaNs last.
+        """
+        values = np.asarray(values, dtype=np.float64)
+        order = np.argsort(values, kind="stable")
+        return BarChart(
+            name, title, np.asarray(labels).astype(str)[order], values[order], threshold
+        )
+
+    def fingerprint(self, fmt: str, width: int = None, height: int = None, scale=None):
+        """
+        Hash of everything that determines the rendered output, used as its
+        cache key.
+        """
+        digest = hashlib.sha256()
+        for part in (RENDER_VERSION, self.title, repr(float(self.threshold)), fmt):
+            digest.update(part.encode() + b"\0")
+        digest.update(repr((width, height, scale)).encode() + b"\0")
+        digest.update("\0".join(self.labels.tolist()).encode() + b"\0")
+        digest.update(np.ascontiguousarray(self.values, dtype=np.float64).tobytes())
+        return digest.hexdigest()
+
+    def figure(self):
+        import plotly.graph_objects as go
+
+        fig = go.Figure()
+        fig.add_trace(
+            go.Bar(
+                x=self.labels,
+                y=self.values,
+                name="Cumulative Returns",
+                marker_color=bar_colors(self.values, self.threshold),
+            )
+        )
+        fig.update_layout(
+            title=self.title,
+            xaxis_title="Ticker",
+            yaxis_title="Cumulative Return",
+            yaxis_tickformat=".0%",  # Format y-axis as percentage
+            template="plotly",
+        )
+        return fig
+
+
+class ChartRenderer:
+    """
+    Renders batches of charts to files, skipping charts whose data is unchanged.
+
+    Rendered files are stored under their content hash in `cache_dir` and copied
+    to `output_dir`. Only cache misses are rendered, all in one pass, so the
+    Kaleido subprocess plotly keeps for the process is started at most once per
+    batch instead of once per image.
+    """
+
+    def __init__(
+        self,
+        output_dir: str = ".",
+        formats=("png",),
+        width: int = None,
+        height: int = None,
+        scale: float = None,
+        cache_dir: str = DEFAULT_CHART_CACHE_DIR,
+    ):
+        """
+        Args:
+            output_dir (str): Directory the charts are written to.
+            formats: Output formats, any of FORMATS.
+            width (int, optional): Image width in pixels, plotly's default if omitted.
+            height (int, optional): Image height in pixels.
+            scale (float, optional): Image scale factor.
+            cache_dir (str): Directory of the content-addressed render cache.
+        """
+        unknown = set(formats) - set(FORMATS)
+        if unknown:
+            raise ValueError(f"Unknown chart formats: {sorted(unknown)}")
+        self.output_dir = output_dir
+        self.formats = tuple(formats)
+        self.width = width
+        self.height = height
+        self.scale = scale
+        self.cache_dir = cache_dir
+        self.rendered = 0
+        self.reused = 0
+
+    def _cache_path(self, chart: BarChart, fmt: str) -> str:
+        key = chart.fingerprint(fmt, self.width, self.height, self.scale)
+        return os.path.join(self.cache_dir, f"{key}.{fmt}")
+
+    def _to_bytes(self, fig, fmt: str) -> bytes:
+        if fmt == "html":
+            return fig.to_html(include_plotlyjs="cdn").encode()
+        if fmt == "json":
+            return fig.to_json().encode()
+        import plotly.io as pio
+
+        return pio.to_image(
+            fig,
+            format=fmt,
+            width=self.width,
+            height=self.height,
+            scale=self.scale,
+            engine="kaleido",
+        )
+
+    def _store(self, path: str, data: bytes):
+        # Written to a temporary file first so a crash never leaves a partial entry
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir)
+        with os.fdopen(fd, "wb") as tmp:
+            tmp.write(data)
+        os.replace(tmp_path, path)
+
+    def render(self, charts) -> list:
+        """
+        Writes every chart in every format to `output_dir`.
+
+        Args:
+            charts: Iterable of BarChart.
+
+        Returns:
+            list[str]: Paths of the written files.
+        """
+        os.makedirs(self.cache_dir, exist_ok=True)
+        os.makedirs(self.output_dir, exist_ok=True)
+
+        paths = []
+        for chart in charts:
+            fig = None
+            for fmt in self.formats:
+                cache_path = self._cache_path(chart, fmt)
+                if os.path.exists(cache_path):
+                    self.reused += 1
+                else:
+                    if fig is None:
+                        fig = chart.figure()
+                    self._store(cache_path, self._to_bytes(fig, fmt))
+                    self.rendered += 1
+                path = os.path.join(self.output_dir, f"{chart.name}.{fmt}")
+                shutil.copyfile(cache_path, path)
+                paths.append(path)
+        return paths
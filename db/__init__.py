@@ -1,7 +1,32 @@
-from .migration_hooks.industry_data_hook import industry_data_hook
-from .migration_hooks.stock_data_hook import stock_data_hook
+# Migration hooks live in db.migration_hooks so importing the models for
+# analysis does not pull in Alembic
 from .models.base import Base
 from .models.industry_data import Industry
+from .models.sector import Sector, SectorIndustry
 from .models.stock_data import StockData
+from .models.stock_data_change import StockDataChange
+from .models.trading_calendar import TradingCalendar
+from .price_cache import PriceCache
+from .price_matrix import PriceMatrix
+from .return_state import ReturnState
+from .sector_index import SectorIndex
+from .ticker_sampler import TickerSampler, draw_distinct
+from .universe import MARKET_CAP_BUCKETS, Universe
 
-__all__ = [Base, StockData, stock_data_hook, Industry, industry_data_hook]
+__all__ = [
+    Base,
+    StockData,
+    StockDataChange,
+    Industry,
+    PriceMatrix,
+    PriceCache,
+    ReturnState,
+    TradingCalendar,
+    Sector,
+    SectorIndustry,
+    SectorIndex,
+    TickerSampler,
+    draw_distinct,
+    Universe,
+    MARKET_CAP_BUCKETS,
+]
@@ -0,0 +1,143 @@
+import asyncio
+import os
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from .config import DATABASE_URL
+from .models.industry_data import Industry
+from .models.stock_data import StockData
+
+ASYNC_DATABASE_URL = os.environ.get(
+    "ASYNC_DATABASE_URL",
+    DATABASE_URL.replace("postgresql://", "postgresql+asyncpg://", 1),
+)
+POOL_SIZE = int(os.environ.get("DB_POOL_SIZE", 10))
+MAX_OVERFLOW = int(os.environ.get("DB_MAX_OVERFLOW", 10))
+
+
+def create_async_session_factory(
+    url: str = ASYNC_DATABASE_URL,
+    pool_size: int = POOL_SIZE,
+    max_overflow: int = MAX_OVERFLOW,
+) -> async_sessionmaker:
+    """
+    Creates an async engine with a connection pool and returns a factory for
+    sessions bound to it.
+
+    Args:
+        url (str): Async database URL, e.g. postgresql+asyncpg://...
+        pool_size (int): Connections kept open in the pool.
+        max_overflow (int): Extra connections allowed under load.
+
+    Returns:
+        async_sessionmaker: Factory for AsyncSession objects.
+    """
+    engine = create_async_engine(url, pool_size=pool_size, max_overflow=max_overflow)
+    return async_sessionmaker(engine, autoflush=False, expire_on_commit=False)
+
+
+async def gather_bounded(
+    session_factory: async_sessionmaker, query, items, concurrency: int
+):
+    """
+    Runs `query(session, item)` for every item, at most `concurrency` at a time,
+    each in its own session so the queries use separate pooled connections.
+
+    Args:
+        session_factory (async_sessionmaker): Factory for the sessions.
+        query: Coroutine function taking (AsyncSession, item).
+        items: Iterable of arguments.
+        concurrency (int): Maximum number of queries in flight.
+
+    Returns:
+        list: Results in the order of `items`.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def _run(item):
+        async with semaphore:
+            async with session_factory() as session:
+                return await query(session, item)
+
+    return await asyncio.gather(*(_run(item) for item in items))
+
+
+class AsyncStockData:
+    """
+    Async counterparts of the StockData query helpers.
+    """
+
+    @staticmethod
+    async def get_all_unique_tickers(session: AsyncSession):
+        """
+        Retrieve all unique tickers from the StockData table.
+
+        Returns:
+            list[str]: A list of unique ticker symbols.
+        """
+        result = await session.execute(StockData.UNIQUE_TICKERS_SQL)
+        return [ticker[0] for ticker in result]
+
+    @staticmethod
+    async def get_ordered_dates_and_prices(session: AsyncSession, ticker: str):
+        """
+        Returns an ordered list of dates and prices for a given ticker.
+
+        Returns:
+            list[tuple]: A list of (date, price) tuples, ordered by date.
+        """
+        result = await session.execute(
+            select(StockData.date, StockData.price)
+            .where(StockData.ticker == ticker)
+            .order_by(StockData.date)
+        )
+        return result.all()
+
+    @staticmethod
+    async def get_price_on_or_after(session: AsyncSession, ticker: str, target_date):
+        """
+        Returns the price of a given ticker on the target date or the next
+        available date, or None if no data is available.
+        """
+        result = await session.execute(
+            select(StockData.price)
+            .where(StockData.ticker == ticker, StockData.date >= target_date)
+            .order_by(StockData.date)
+            .limit(1)
+        )
+        return result.scalar()
+
+    @staticmethod
+    async def get_date_range(session: AsyncSession):
+        """
+        Returns the lowest and highest date in the stock_data table.
+
+        Returns:
+            tuple[Date, Date]: A tuple containing the lowest and highest date
+        """
+        result = await session.execute(
+            select(func.min(StockData.date), func.max(StockData.date))
+        )
+        return tuple(result.first())
+
+
+class AsyncIndustry:
+    """
+    Async lookups on industry_data.
+    """
+
+    @staticmethod
+    async def get_sectors(session: AsyncSession, symbols):
+        """
+        Returns the sector of each symbol that has one.
+
+        Returns:
+            list[tuple[str, str]]: (symbol, sector) pairs.
+        """
+        result = await session.execute(
+            select(Industry.symbol, Industry.sector).where(
+                Industry.symbol.in_(list(symbols))
+            )
+        )
+        return result.all()
@@ -0,0 +1,110 @@
+import argparse
+
+from sqlalchemy import create_engine
+from sqlalchemy.engine import Connection
+from sqlalchemy.sql import text
+
+from .config import DATABASE_URL
+from .ingest import refresh_materialized_views
+from .models.stock_data_change import StockDataChange
+
+# The old bootstrap hook repeated a ticker's first price before its first row
+# and its last price after its last row with a zero change, on every calendar
+# day. Keep the row next to the first (last) price change of each such constant
+# run and delete the zero-change rows beyond it. Padding on weekday holidays is
+# part of these runs, so it goes with them.
+DELETE_EDGE_PADDING_SQL = text(
+    """
+    WITH edges AS (
+        SELECT
+            ticker,
+            date,
+            price,
+            first_value(price) OVER (PARTITION BY ticker ORDER BY date) AS first_price,
+            first_value(price) OVER (PARTITION BY ticker ORDER BY date DESC) AS last_price
+        FROM stock_data
+    ),
+    moves AS (
+        SELECT
+            ticker,
+            min(date) FILTER (WHERE price <> first_price) AS first_move,
+            max(date) FILTER (WHERE price <> last_price) AS last_move
+        FROM edges
+        GROUP BY ticker
+    ),
+    kept AS (
+        SELECT
+            m.ticker,
+            (SELECT max(date) FROM stock_data s
+             WHERE s.ticker = m.ticker AND s.date < m.first_move) AS first_kept,
+            (SELECT min(date) FROM stock_data s
+             WHERE s.ticker = m.ticker AND s.date > m.last_move) AS last_kept
+        FROM moves m
+    ),
+    deleted AS (
+        DELETE FROM stock_data s
+        USING kept k
+        WHERE s.ticker = k.ticker
+          AND s.daily_pct_change = 0
+          AND (s.date < k.first_kept OR s.date > k.last_kept)
+        RETURNING s.date
+    )
+    SELECT count(*), min(date), max(date) FROM deleted
+    """
+)
+
+# Days left without any price are no longer trading days
+DELETE_EMPTY_TRADING_DAYS_SQL = text(
+    """
+    DELETE FROM trading_calendar c
+    WHERE NOT EXISTS (SELECT 1 FROM stock_data s WHERE s.date = c.date)
+    """
+)
+
+
+def remove_edge_padding(connection: Connection) -> tuple:
+    """
+    Deletes the edge padding rows of databases bootstrapped by the old padding
+    hook, then the trading days left without prices. A thinly traded ticker
+    whose real first or last rows repeat its price with a zero change loses
+    them too, which is why this is a one-off script and not a migration.
+
+    Args:
+        connection (Connection): A connection inside an open transaction.
+
+    Returns:
+        tuple[int, int]: Deleted stock_data rows and trading days.
+    """
+    rows, first_date, last_date = connection.execute(DELETE_EDGE_PADDING_SQL).one()
+    StockDataChange.record(connection, first_date, last_date, rows)
+    days = connection.execute(DELETE_EMPTY_TRADING_DAYS_SQL).rowcount
+    return rows, days
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Remove the edge padding rows of the old bootstrap hook."
+    )
+    parser.add_argument(
+        "--apply",
+        action="store_true",
+        help="Commit the deletion. By default the counts are reported and the "
+        "transaction is rolled back.",
+    )
+    args = parser.parse_args()
+
+    engine = create_engine(DATABASE_URL)
+    with engine.connect() as connection:
+        transaction = connection.begin()
+        rows, days = remove_edge_padding(connection)
+        print(f"Padding rows: {rows}, trading days without prices: {days}")
+        if args.apply:
+            refresh_materialized_views(connection)
+            transaction.commit()
+        else:
+            transaction.rollback()
+            print("Dry run, nothing deleted. Pass --apply to delete.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,253 @@
+import argparse
+import csv
+import io
+from decimal import Decimal, InvalidOperation
+from itertools import islice
+
+from sqlalchemy import create_engine
+from sqlalchemy.engine import Connection
+from sqlalchemy.sql import text
+
+from .config import DATABASE_URL
+from .models.stock_data_change import StockDataChange
+from .partitions import ensure_partitions_for_table, is_partitioned
+
+STAGING_TABLE = "stock_data_staging"
+MATERIALIZED_VIEWS = ("ticker_return_summary",)
+COLUMNS = ("date", "price", "ticker", "daily_pct_change")
+
+# Rows that would corrupt returns, counted in one pass over the staged file
+INVALID_STAGED_ROWS_SQL = text(
+    f"""
+    SELECT count(*) FROM {STAGING_TABLE}
+    WHERE date IS NULL OR ticker IS NULL OR price IS NULL OR price <= 0
+    """
+)
+
+# New trading days are the dates present in the staged file
+SYNC_TRADING_CALENDAR_SQL = text(
+    f"""
+    INSERT INTO trading_calendar (date)
+    SELECT DISTINCT date FROM {STAGING_TABLE}
+    ON CONFLICT (date) DO NOTHING
+    """
+)
+
+
+def read_price_csv(csv_file_path: str):
+    """
+    Streams (date, price, ticker, daily_pct_change) tuples from a price file
+    with Date, price, ticker and daily_pct_change columns.
+    """
+    with open(csv_file_path, "r") as csvfile:
+        for row in csv.DictReader(csvfile):
+            yield row["Date"], row["price"], row["ticker"], row["daily_pct_change"]
+
+
+# Suffixes of the MarketCap column of industry files, e.g. "$268.67M"
+MARKET_CAP_UNITS = {"M": 10**6, "B": 10**9}
+
+
+def parse_last_sale(value: str):
+    """
+    Parses a LastSale value like "10.68" to a float, None for "n/a" and blanks.
+    """
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def parse_market_cap(value: str):
+    """
+    Parses a MarketCap value like "$268.67M" or "$20.12B" to whole dollars,
+    None for "n/a" and blanks.
+    """
+    value = (value or "").strip().lstrip("$")
+    unit = MARKET_CAP_UNITS.get(value[-1:], 1)
+    if unit != 1:
+        value = value[:-1]
+    try:
+        return int(round(Decimal(value) * unit))
+    except (InvalidOperation, ValueError):
+        return None
+
+
+def parse_ipo_year(value: str):
+    """
+    Parses an IPOyear value like "2021" to an int, None for "n/a" and blanks.
+    """
+    value = (value or "").strip()
+    return int(value) if value.isdigit() else None
+
+
+def read_industry_csv(csv_file_path: str):
+    """
+    Streams industry_data rows as dicts from an industry file with Symbol,
+    Name, LastSale, MarketCap, IPOyear, Sector, industry and Summary Quote
+    columns, with the numeric columns parsed.
+    """
+    with open(csv_file_path, "r") as csvfile:
+        for row in csv.DictReader(csvfile):
+            yield {
+                "symbol": row["Symbol"],
+                "name": row["Name"],
+                "last_sale": parse_last_sale(row["LastSale"]),
+                "market_cap": parse_market_cap(row["MarketCap"]),
+                "ipo_year": parse_ipo_year(row["IPOyear"]),
+                "sector": row["Sector"],
+                "industry": row["industry"],
+                "summary_quote": row["Summary Quote"],
+            }
+
+
+def copy_rows(
+    connection: Connection, rows, chunk_size: int = 100_000, log_changes: bool = True
+) -> int:
+    """
+    Upserts rows into stock_data through a temporary staging table loaded with
+    COPY FROM STDIN in chunks of `chunk_size` rows. The staged rows are checked
+    in one aggregate query before anything is written, and stay available for
+    the rest of the transaction.
+
+    Rows already present for a (ticker, date) are overwritten, so a new price
+    file can correct earlier prices. Identical rows are left untouched, and the
+    dates of the rows actually written are logged in stock_data_changes.
+
+    Args:
+        connection (Connection): A connection inside an open transaction.
+        rows: Iterable of (date, price, ticker, daily_pct_change) tuples.
+        chunk_size (int): Number of rows sent per COPY.
+        log_changes (bool): Log the write in stock_data_changes. The bootstrap
+            migration runs before the table exists and disables this.
+
+    Returns:
+        int: Number of rows inserted or changed.
+    """
+    connection.execute(
+        text(
+            f"""
+            CREATE TEMP TABLE IF NOT EXISTS {STAGING_TABLE} (
+                date date, price double precision, ticker varchar(10),
+                daily_pct_change double precision
+            ) ON COMMIT DROP
+            """
+        )
+    )
+    connection.execute(text(f"TRUNCATE {STAGING_TABLE}"))
+
+    cursor = connection.connection.cursor()
+    copy_sql = (
+        f"COPY {STAGING_TABLE} ({', '.join(COLUMNS)}) FROM STDIN WITH (FORMAT csv)"
+    )
+    rows = iter(rows)
+    try:
+        while True:
+            chunk = list(islice(rows, chunk_size))
+            if not chunk:
+                break
+            buffer = io.StringIO()
+            csv.writer(buffer).writerows(chunk)
+            buffer.seek(0)
+            cursor.copy_expert(copy_sql, buffer)
+    finally:
+        cursor.close()
+
+    invalid = connection.execute(INVALID_STAGED_ROWS_SQL).scalar()
+    if invalid:
+        raise ValueError(f"{invalid} rows without date, ticker or a positive price")
+
+    if is_partitioned(connection):
+        ensure_partitions_for_table(connection, STAGING_TABLE)
+
+    count, first_date, last_date = connection.execute(
+        text(
+            f"""
+            WITH written AS (
+                INSERT INTO stock_data ({', '.join(COLUMNS)})
+                SELECT {', '.join(COLUMNS)} FROM {STAGING_TABLE}
+                ON CONFLICT (ticker, date) DO UPDATE
+                SET price = EXCLUDED.price,
+                    daily_pct_change = EXCLUDED.daily_pct_change
+                WHERE (stock_data.price, stock_data.daily_pct_change)
+                    IS DISTINCT FROM (EXCLUDED.price, EXCLUDED.daily_pct_change)
+                RETURNING date
+            )
+            SELECT count(*), min(date), max(date) FROM written
+            """
+        )
+    ).one()
+    if log_changes:
+        StockDataChange.record(connection, first_date, last_date, count)
+    return count
+
+
+def sync_trading_calendar(connection: Connection) -> int:
+    """
+    Adds the dates of the staged rows to trading_calendar.
+
+    Returns:
+        int: Number of new trading days.
+    """
+    return connection.execute(SYNC_TRADING_CALENDAR_SQL).rowcount
+
+
+def refresh_materialized_views(connection: Connection) -> None:
+    """
+    Refreshes the materialized views derived from stock_data. They have unique
+    indexes, so readers are not blocked while the refresh runs.
+    """
+    for view in MATERIALIZED_VIEWS:
+        connection.execute(text(f"REFRESH MATERIALIZED VIEW CONCURRENTLY {view}"))
+
+
+def import_price_file(
+    connection: Connection,
+    csv_file_path: str,
+    chunk_size: int = 100_000,
+    update_derived: bool = True,
+) -> int:
+    """
+    Loads a price file into stock_data after checking its rows, then updates
+    the trading calendar and refreshes the materialized views. Series are stored
+    on their own trading days only; alignment across tickers happens at query
+    time. Used both by the bootstrap migration and for incremental daily files.
+
+    Args:
+        connection (Connection): A connection inside an open transaction.
+        csv_file_path (str): Path of the price file.
+        chunk_size (int): Number of rows sent per COPY.
+        update_derived (bool): Update stock_data_changes, trading_calendar and
+            the materialized views. The bootstrap migration runs before they exist and disables
+            this; the trading calendar migration derives them from the data.
+
+    Returns:
+        int: Number of rows inserted or changed from the file.
+    """
+    imported = copy_rows(
+        connection, read_price_csv(csv_file_path), chunk_size, update_derived
+    )
+
+    if update_derived:
+        sync_trading_calendar(connection)
+        refresh_materialized_views(connection)
+
+    return imported
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Import a daily price file into stock_data."
+    )
+    parser.add_argument("csv_file_path")
+    parser.add_argument("--chunk-size", type=int, default=100_000)
+    args = parser.parse_args()
+
+    engine = create_engine(DATABASE_URL)
+    with engine.begin() as connection:
+        imported = import_price_file(connection, args.csv_file_path, args.chunk_size)
+    print(f"Imported {imported} rows from {args.csv_file_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,4 @@
+from .industry_data_hook import industry_data_hook
+from .stock_data_hook import stock_data_hook
+
+__all__ = [stock_data_hook, industry_data_hook]
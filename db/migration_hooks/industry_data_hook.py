@@ -20,9 +20,10 @@ def industry_data_hook(session: Session, industry_data_table) -> None:
             {
                 "symbol": row["Symbol"],
                 "name": row["Name"],
-                # "last_sale": row["LastSale"],
-                # "market_cap": row["MarketCap"],
-                # "ipo_year": row["IPOyear"],
+                # Source strings like "$268.67M", typed by the 5b1e7c3a9d42 migration
+                "last_sale": row["LastSale"],
+                "market_cap": row["MarketCap"],
+                "ipo_year": row["IPOyear"],
                 "sector": row["Sector"],
                 "industry": row["industry"],
                 "summary_quote": row["Summary Quote"],
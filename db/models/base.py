@@ -1,14 +1,37 @@
-import pandas as pd
+from typing import TYPE_CHECKING
+
+import numpy as np
 from sqlalchemy.orm import Session, declarative_base
 
+if TYPE_CHECKING:
+    import pandas as pd
+
 # Define the declarative base
 Base = declarative_base()
 
 
+def _to_array(values, dtype=None) -> np.ndarray:
+    # Categoricals are built at the DataFrame level, keep raw values until then
+    if dtype is None or dtype == "category":
+        return np.array(values, dtype=object)
+    return np.array(values, dtype=dtype)
+
+
+def _columns_to_df(columns: dict, dtypes: dict) -> "pd.DataFrame":
+    import pandas as pd
+
+    # Columns without a dtype are inferred like pd.DataFrame would
+    df = pd.DataFrame(columns, copy=False).infer_objects()
+    for name, dtype in dtypes.items():
+        if dtype == "category" and name in df:
+            df[name] = pd.Categorical(df[name])
+    return df
+
+
 # Add shared functionality through a mixin
 class BaseMixin:
     @staticmethod
-    def get_df_from_sql(session: Session, query, params=None) -> pd.DataFrame:
+    def get_df_from_sql(session: Session, query, params=None) -> "pd.DataFrame":
         """
         Executes a SQL query using the provided SQLAlchemy session and
         returns the result as a Pandas DataFrame.
@@ -25,6 +48,8 @@ class BaseMixin:
             query = "SELECT * FROM my_table"
             df = BaseMixin.get_df_from_sql(session, query)
         """
+        import pandas as pd
+
         # Execute the query
         result = session.execute(query, params)
 
@@ -39,6 +64,111 @@ class BaseMixin:
 
         return df
 
+    @staticmethod
+    def iter_columns_from_sql(
+        session: Session, query, params=None, chunk_size: int = 50_000, dtypes=None
+    ):
+        """
+        Executes a SQL query on a server-side cursor and yields the result in
+        chunks of at most `chunk_size` rows, each as a dict of NumPy columns.
+
+        Args:
+            session (Session): An active SQLAlchemy session connected to the database.
+            query: The SQL query to execute.
+            params (dict, optional): Query parameters.
+            chunk_size (int): Number of rows fetched per round trip.
+            dtypes (dict, optional): NumPy dtype per column name, e.g.
+                {"date": "datetime64[D]", "price": "float64"}.
+
+        Yields:
+            dict[str, np.ndarray]: One array per result column.
+        """
+        dtypes = dtypes or {}
+        result = session.execute(
+            query,
+            params,
+            execution_options={"stream_results": True, "yield_per": chunk_size},
+        )
+        columns = list(result.keys())
+        for partition in result.partitions():
+            yield {
+                name: _to_array(values, dtypes.get(name))
+                for name, values in zip(columns, zip(*partition))
+            }
+
+    @staticmethod
+    def iter_df_from_sql(
+        session: Session, query, params=None, chunk_size: int = 50_000, dtypes=None
+    ):
+        """
+        Streaming variant of get_df_from_sql: yields DataFrames of at most
+        `chunk_size` rows, so memory stays constant for any result size.
+
+        Args:
+            session (Session): An active SQLAlchemy session connected to the database.
+            query: The SQL query to execute.
+            params (dict, optional): Query parameters.
+            chunk_size (int): Number of rows per DataFrame.
+            dtypes (dict, optional): dtype per column name; "category" builds a
+                pandas Categorical.
+
+        Yields:
+            pd.DataFrame: The next chunk of the result.
+
+        Example:
+            for chunk in StockData.iter_df_from_sql(session, query, dtypes=StockData.DTYPES):
+                totals += chunk.groupby("ticker", observed=True)["price"].sum()
+        """
+        dtypes = dtypes or {}
+        for columns in BaseMixin.iter_columns_from_sql(
+            session, query, params, chunk_size, dtypes
+        ):
+            yield _columns_to_df(columns, dtypes)
+
+    @staticmethod
+    def get_typed_df_from_sql(
+        session: Session, query, params=None, dtypes=None, chunk_size: int = 50_000
+    ) -> "pd.DataFrame":
+        """
+        Fast path for get_df_from_sql: reads tuples straight from the DB-API
+        cursor in chunks and builds typed columns, without creating SQLAlchemy
+        Row objects or an intermediate list of all rows.
+
+        Args:
+            session (Session): An active SQLAlchemy session connected to the database.
+            query: The SQL query to execute.
+            params (dict, optional): Query parameters.
+            dtypes (dict, optional): dtype per column name; "category" builds a
+                pandas Categorical.
+            chunk_size (int): Number of rows taken from the cursor at a time.
+
+        Returns:
+            pd.DataFrame: A DataFrame containing the query results.
+        """
+        dtypes = dtypes or {}
+        result = session.execute(query, params)
+        columns = list(result.keys())
+        cursor = result.cursor
+
+        chunks = {name: [] for name in columns}
+        try:
+            while True:
+                rows = cursor.fetchmany(chunk_size)
+                if not rows:
+                    break
+                for name, values in zip(columns, zip(*rows)):
+                    chunks[name].append(_to_array(values, dtypes.get(name)))
+        finally:
+            result.close()
+
+        data = {
+            name: (
+                np.concatenate(arrays) if arrays else _to_array([], dtypes.get(name))
+            )
+            for name, arrays in chunks.items()
+        }
+        return _columns_to_df(data, dtypes)
+
 
 # Combine the declarative base with the mixin
 class ModelBase(BaseMixin, Base):
@@ -1,6 +1,58 @@
-from sqlalchemy import Column, Integer, String, Text
+import numpy as np
+from sqlalchemy import (
+    BigInteger,
+    Column,
+    Float,
+    ForeignKey,
+    Index,
+    Integer,
+    SmallInteger,
+    String,
+    Text,
+    select,
+)
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import text
 
+from ..sector_index import LEVELS, SectorIndex
+from ..universe import MARKET_CAP_BUCKETS, Universe
 from .base import ModelBase
+from .sector import Sector, SectorIndustry
+
+# Breakdown of the ticker_return_summary view by sector or industry. A symbol
+# listed more than once counts once, and beating the average/median refers to
+# all tickers in the view.
+RETURN_BREAKDOWN_SQL = """
+    WITH universe AS (
+        SELECT
+            avg(cum_return) AS avg_return,
+            percentile_cont(0.5) WITHIN GROUP (ORDER BY cum_return) AS median_return
+        FROM ticker_return_summary
+    ),
+    returns AS (
+        SELECT DISTINCT ON (r.ticker) r.ticker, r.cum_return, d.sector_id, d.industry_id
+        FROM ticker_return_summary r
+        JOIN industry_data d ON d.symbol = r.ticker
+        WHERE r.cum_return IS NOT NULL
+        ORDER BY r.ticker, d.id
+    )
+    SELECT
+        {columns},
+        count(*) AS count,
+        avg(r.cum_return) AS mean_return,
+        percentile_cont(0.5) WITHIN GROUP (ORDER BY r.cum_return) AS median_return,
+        count(*) FILTER (WHERE r.cum_return > u.avg_return) AS above_avg,
+        count(*) FILTER (WHERE r.cum_return > u.avg_return)::float8 / count(*)
+            AS share_above_avg,
+        count(*) FILTER (WHERE r.cum_return > u.median_return) AS above_median,
+        count(*) FILTER (WHERE r.cum_return > u.median_return)::float8 / count(*)
+            AS share_above_median
+    FROM returns r
+    CROSS JOIN universe u
+    {joins}
+    GROUP BY {group_by}
+    ORDER BY count DESC
+"""
 
 
 class Industry(ModelBase):
@@ -11,12 +63,43 @@ class Industry(ModelBase):
     )  # Unique ID for each record
     symbol = Column(String(10), nullable=False, index=True)  # Stock ticker symbol
     name = Column(String(255), nullable=False)  # Company name
-    last_sale = Column(String(10), nullable=True)  # Last sale price
-    market_cap = Column(String(10), nullable=True)  # Market capitalization
-    ipo_year = Column(String(10), nullable=True)  # IPO year
+    last_sale = Column(Float, nullable=True)  # Last sale price
+    market_cap = Column(
+        BigInteger, nullable=True, index=True
+    )  # Market capitalization in dollars
+    ipo_year = Column(SmallInteger, nullable=True, index=True)  # IPO year
     sector = Column(String(100), nullable=True)  # Sector
     industry = Column(String(150), nullable=True)  # Industry
     summary_quote = Column(Text, nullable=True)  # Summary quote or URL
+    sector_id = Column(
+        SmallInteger, ForeignKey("sectors.id"), nullable=True, index=True
+    )  # Key of `sector` in the sectors table
+    industry_id = Column(
+        SmallInteger, ForeignKey("sector_industries.id"), nullable=True, index=True
+    )  # Key of `industry` in the sector_industries table
+
+    # Sector plus market-cap range filters are one index range scan
+    __table_args__ = (
+        Index("ix_industry_data_sector_id_market_cap", "sector_id", "market_cap"),
+    )
+
+    RETURN_BREAKDOWN_SQL = {
+        "sector": text(
+            RETURN_BREAKDOWN_SQL.format(
+                columns="s.name AS sector",
+                joins="JOIN sectors s ON s.id = r.sector_id",
+                group_by="s.id",
+            )
+        ),
+        "industry": text(
+            RETURN_BREAKDOWN_SQL.format(
+                columns="s.name AS sector, i.name AS industry",
+                joins="JOIN sector_industries i ON i.id = r.industry_id "
+                "JOIN sectors s ON s.id = i.sector_id",
+                group_by="s.id, i.id",
+            )
+        ),
+    }
 
     def __repr__(self):
         return (
@@ -24,3 +107,140 @@ class Industry(ModelBase):
             f"market_cap={self.market_cap}, ipo_year={self.ipo_year}, sector={self.sector}, "
             f"industry={self.industry}, summary_quote={self.summary_quote})>"
         )
+
+    @staticmethod
+    def get_sector_index(session: Session) -> SectorIndex:
+        """
+        Loads the symbol -> sector/industry keys and the dimension names once,
+        for aggregating returns in memory (see SectorIndex.breakdown).
+
+        Args:
+            session (Session): The SQLAlchemy session to use for the queries.
+
+        Returns:
+            SectorIndex: The index, keeping the first row of duplicated symbols.
+        """
+        rows = session.execute(
+            text(
+                "SELECT symbol, sector_id, industry_id FROM industry_data "
+                "ORDER BY symbol, id"
+            )
+        ).all()
+        symbols, first = np.unique(
+            np.array([row[0] for row in rows], dtype=str), return_index=True
+        )
+        sector_ids = np.array([-1 if row[1] is None else row[1] for row in rows])
+        industry_ids = np.array([-1 if row[2] is None else row[2] for row in rows])
+
+        sectors = session.execute(text("SELECT id, name FROM sectors")).all()
+        industries = session.execute(
+            text("SELECT id, sector_id, name FROM sector_industries")
+        ).all()
+        sector_names = np.full(max((key for key, _ in sectors), default=-1) + 1, None)
+        for key, name in sectors:
+            sector_names[key] = name
+        n_industries = max((key for key, _, _ in industries), default=-1) + 1
+        industry_names = np.full(n_industries, None)
+        industry_sector_ids = np.full(n_industries, -1)
+        for key, sector_id, name in industries:
+            industry_names[key] = name
+            industry_sector_ids[key] = sector_id
+
+        return SectorIndex(
+            symbols,
+            sector_ids[first],
+            industry_ids[first],
+            sector_names,
+            industry_names,
+            industry_sector_ids,
+        )
+
+    @staticmethod
+    def get_return_breakdown(session: Session, level: str = "sector"):
+        """
+        Server-side counterpart of SectorIndex.breakdown: joins the
+        ticker_return_summary view to industry_data on the integer sector keys
+        and aggregates in Postgres.
+
+        Args:
+            session (Session): The SQLAlchemy session to use for the query.
+            level (str): "sector" or "industry".
+
+        Returns:
+            pd.DataFrame: Same columns as SectorIndex.breakdown.
+        """
+        if level not in LEVELS:
+            raise ValueError(f"Unknown level: {level}")
+        return Industry.get_df_from_sql(session, Industry.RETURN_BREAKDOWN_SQL[level])
+
+    @staticmethod
+    def get_universe(
+        session: Session,
+        sector: str = None,
+        industry: str = None,
+        size: str = None,
+        min_market_cap: int = None,
+        max_market_cap: int = None,
+        min_ipo_year: int = None,
+        max_ipo_year: int = None,
+        min_last_sale: float = None,
+        max_last_sale: float = None,
+    ) -> Universe:
+        """
+        Selects the tickers matching fundamental filters in the database, e.g.
+        mid caps in Technology that IPO'd in 2011 or later:
+        get_universe(session, sector="Technology", size="mid", min_ipo_year=2011).
+        Filters left as None do not apply; ranges are inclusive except the
+        upper bound of `size`.
+
+        Args:
+            session (Session): The SQLAlchemy session to use for the query.
+            sector (str, optional): Sector name.
+            industry (str, optional): Industry name.
+            size (str, optional): A MARKET_CAP_BUCKETS key.
+            min_market_cap (int, optional): Lowest market cap in dollars.
+            max_market_cap (int, optional): Highest market cap in dollars.
+            min_ipo_year (int, optional): Earliest IPO year.
+            max_ipo_year (int, optional): Latest IPO year.
+            min_last_sale (float, optional): Lowest last sale price.
+            max_last_sale (float, optional): Highest last sale price.
+
+        Returns:
+            Universe: The matching symbols and their market caps, keeping the
+            first row of duplicated symbols.
+        """
+        query = select(Industry.symbol, Industry.market_cap)
+        if sector is not None:
+            query = query.join(Sector, Sector.id == Industry.sector_id).where(
+                Sector.name == sector
+            )
+        if industry is not None:
+            query = query.join(
+                SectorIndustry, SectorIndustry.id == Industry.industry_id
+            ).where(SectorIndustry.name == industry)
+        if size is not None:
+            if size not in MARKET_CAP_BUCKETS:
+                raise ValueError(f"Unknown size: {size}")
+            low, high = MARKET_CAP_BUCKETS[size]
+            if low is not None:
+                query = query.where(Industry.market_cap >= low)
+            if high is not None:
+                query = query.where(Industry.market_cap < high)
+        for column, low, high in (
+            (Industry.market_cap, min_market_cap, max_market_cap),
+            (Industry.ipo_year, min_ipo_year, max_ipo_year),
+            (Industry.last_sale, min_last_sale, max_last_sale),
+        ):
+            if low is not None:
+                query = query.where(column >= low)
+            if high is not None:
+                query = query.where(column <= high)
+
+        rows = session.execute(query.order_by(Industry.symbol, Industry.id)).all()
+        symbols, first = np.unique(
+            np.array([row[0] for row in rows], dtype=str), return_index=True
+        )
+        market_caps = np.array(
+            [np.nan if row[1] is None else row[1] for row in rows], dtype=np.float64
+        )
+        return Universe(symbols, market_caps[first])
@@ -0,0 +1,102 @@
+from sqlalchemy import (
+    Column,
+    ForeignKey,
+    Integer,
+    SmallInteger,
+    String,
+    UniqueConstraint,
+)
+from sqlalchemy.engine import Connection
+from sqlalchemy.sql import text
+
+from .base import ModelBase
+
+# SQLite only auto-increments INTEGER PRIMARY KEY columns
+SmallId = SmallInteger().with_variant(Integer, "sqlite")
+
+
+class Sector(ModelBase):
+    """
+    SQLAlchemy model for the sector dimension of industry_data, so group-bys
+    run on small integer keys instead of repeated strings.
+    """
+
+    __tablename__ = "sectors"
+
+    id = Column(SmallId, primary_key=True, autoincrement=True)  # Sector key
+    name = Column(String(100), nullable=False, unique=True)  # Sector name
+
+    # Set-based sync of the dimensions with the free-text industry_data columns
+    SYNC_SQL = (
+        text(
+            """
+            INSERT INTO sectors (name)
+            SELECT DISTINCT sector FROM industry_data
+            WHERE sector IS NOT NULL
+              AND sector NOT IN (SELECT name FROM sectors)
+            """
+        ),
+        text(
+            """
+            INSERT INTO sector_industries (sector_id, name)
+            SELECT DISTINCT s.id, d.industry
+            FROM industry_data d
+            JOIN sectors s ON s.name = d.sector
+            WHERE d.industry IS NOT NULL
+              AND NOT EXISTS (
+                SELECT 1 FROM sector_industries i
+                WHERE i.sector_id = s.id AND i.name = d.industry
+              )
+            """
+        ),
+        text(
+            """
+            UPDATE industry_data SET
+                sector_id = (
+                    SELECT s.id FROM sectors s WHERE s.name = industry_data.sector
+                ),
+                industry_id = (
+                    SELECT i.id FROM sector_industries i
+                    JOIN sectors s ON s.id = i.sector_id
+                    WHERE s.name = industry_data.sector
+                      AND i.name = industry_data.industry
+                )
+            """
+        ),
+    )
+
+    def __repr__(self):
+        return f"<Sector(id={self.id}, name={self.name})>"
+
+    @staticmethod
+    def sync_from_industry_data(connection: Connection) -> None:
+        """
+        Adds the sectors and industries of industry_data that are missing from
+        the dimension tables and sets the sector_id/industry_id keys of every
+        industry_data row. Run it after loading industry_data.
+
+        Args:
+            connection (Connection): A connection inside an open transaction.
+        """
+        for statement in Sector.SYNC_SQL:
+            connection.execute(statement)
+
+
+class SectorIndustry(ModelBase):
+    """
+    SQLAlchemy model for the industry dimension; the same industry name can
+    appear under several sectors.
+    """
+
+    __tablename__ = "sector_industries"
+
+    id = Column(SmallId, primary_key=True, autoincrement=True)  # Industry key
+    sector_id = Column(
+        SmallInteger, ForeignKey("sectors.id"), nullable=False
+    )  # Sector the industry belongs to
+    name = Column(String(150), nullable=False)  # Industry name
+
+    __table_args__ = (UniqueConstraint("sector_id", "name", name="uq_sector_industry"),)
+
+    def __repr__(self):
+        return f"<SectorIndustry(id={self.id}, sector_id={self.sector_id}, name={self.name})>"
@@ -1,10 +1,14 @@
-from functools import cache
-
-from sqlalchemy import Column, Date, Float, Integer, String, UniqueConstraint
+import numpy as np
+from sqlalchemy import Column, Date, Float, Index, Integer, Sequence, String, select
 from sqlalchemy.orm import Session
+from sqlalchemy.sql import text
 from sqlalchemy.sql.expression import func
 
+from ..price_matrix import PriceMatrix
+from ..ticker_sampler import TickerSampler
 from .base import ModelBase
+from .industry_data import Industry
+from .stock_data_change import StockDataChange
 
 
 class StockData(ModelBase):
@@ -16,15 +20,114 @@ class StockData(ModelBase):
 
     # Fields of the table
     id = Column(
-        Integer, primary_key=True, autoincrement=True, index=True
-    )  # Unique ID for each record
-    date = Column(Date, index=True)  # Date of the record
+        Integer, Sequence("stock_data_id_seq"), primary_key=True
+    )  # Unique ID for each record, keyed together with date for partitioning
+    date = Column(
+        Date, primary_key=True, index=True
+    )  # Date of the record, also the partition key
     price = Column(Float)  # Stock price
-    ticker = Column(String(10), index=True)  # Ticker symbol of the stock
+    ticker = Column(String(10))  # Ticker symbol of the stock
     daily_pct_change = Column(Float)  # Daily percentage change in stock price
 
-    # Define unique constraint on ticker and date
-    __table_args__ = (UniqueConstraint("ticker", "date", name="uq_ticker_date"),)
+    # Column dtypes for the typed and streaming readers in BaseMixin
+    DTYPES = {
+        "date": "datetime64[D]",
+        "price": "float64",
+        "ticker": "category",
+        "daily_pct_change": "float64",
+    }
+
+    # Distinct tickers read live from stock_data: one (ticker, date) index probe
+    # per ticker, each jumping to the next larger symbol
+    UNIQUE_TICKERS_SQL = text(
+        """
+        WITH RECURSIVE tickers AS (
+            SELECT min(ticker) AS ticker FROM stock_data
+            UNION ALL
+            SELECT (SELECT min(ticker) FROM stock_data s WHERE s.ticker > t.ticker)
+            FROM tickers t
+            WHERE t.ticker IS NOT NULL
+        )
+        SELECT ticker FROM tickers WHERE ticker IS NOT NULL
+        """
+    )
+
+    # One index probe per (ticker, target_date) pair, in input order
+    PRICES_ON_OR_AFTER_SQL = text(
+        """
+        SELECT t.position, p.price
+        FROM unnest(CAST(:tickers AS text[]), CAST(:target_dates AS date[]))
+            WITH ORDINALITY AS t(ticker, target_date, position)
+        LEFT JOIN LATERAL (
+            SELECT price FROM stock_data s
+            WHERE s.ticker = t.ticker AND s.date >= t.target_date
+            ORDER BY s.date
+            LIMIT 1
+        ) p ON true
+        """
+    )
+
+    # Prices of the given tickers on every trading day of a window, forward
+    # filled at query time from each ticker's last price on or before the day
+    ALIGNED_PRICES_SQL = text(
+        """
+        SELECT c.date, t.ticker, p.price
+        FROM trading_calendar c
+        CROSS JOIN unnest(CAST(:tickers AS text[])) AS t(ticker)
+        LEFT JOIN LATERAL (
+            SELECT price FROM stock_data s
+            WHERE s.ticker = t.ticker AND s.date <= c.date
+            ORDER BY s.date DESC
+            LIMIT 1
+        ) p ON true
+        WHERE c.date BETWEEN :start_date AND :end_date
+        """
+    )
+
+    # Per-ticker summary computed by Postgres: daily returns come from a lag()
+    # window over the ticker's prices and compound as exp(sum(ln(1 + r))).
+    RETURN_SUMMARY_SQL = text(
+        """
+        WITH returns AS (
+            SELECT
+                ticker,
+                date,
+                price,
+                price / NULLIF(lag(price) OVER w, 0) - 1 AS daily_return,
+                first_value(price) OVER w AS first_price,
+                row_number() OVER (PARTITION BY ticker ORDER BY date DESC) AS rank_desc
+            FROM stock_data
+            WINDOW w AS (PARTITION BY ticker ORDER BY date)
+        )
+        SELECT
+            ticker,
+            min(date) AS first_date,
+            max(date) AS last_date,
+            max(first_price) AS first_price,
+            max(price) FILTER (WHERE rank_desc = 1) AS last_price,
+            avg(daily_return) AS mean_return,
+            exp(sum(ln(NULLIF(1 + daily_return, 0)))) - 1 AS cum_return
+        FROM returns
+        GROUP BY ticker
+        ORDER BY ticker
+        """
+    )
+
+    # Unique (ticker, date) index that also covers price, so per-ticker price
+    # reads are served by index-only scans and imports maintain one btree for
+    # both. In Postgres it is the uq_ticker_date constraint, declared as an index
+    # here because UniqueConstraint takes no INCLUDE columns. The table is range
+    # partitioned by year on date (see db.partitions).
+    __table_args__ = (
+        Index(
+            "uq_ticker_date",
+            "ticker",
+            "date",
+            unique=True,
+            postgresql_include=["price"],
+        ),
+        {"postgresql_partition_by": "RANGE (date)"},
+    )
 
     def __repr__(self):
         return f"<StockData(id={self.id}, date={self.date}, ticker={self.ticker}, price={self.price}, daily_pct_change={self.daily_pct_change})>"  # noqa: E501
@@ -40,30 +143,48 @@ class StockData(ModelBase):
         Returns:
             list[str]: A list of unique ticker symbols.
         """
-        unique_tickers = session.query(StockData.ticker).distinct().all()
+        unique_tickers = session.execute(StockData.UNIQUE_TICKERS_SQL)
         return [ticker[0] for ticker in unique_tickers]
 
     @staticmethod
-    @cache
-    def select_random_tickers(session: Session, n: int = 1):
+    def get_ticker_sampler(
+        session: Session, level: str = None, seed=None
+    ) -> TickerSampler:
+        """
+        Loads the ticker universe from stock_data once, so samples
+        are drawn in memory instead of sorting stock_data by random().
+
+        Args:
+            session (Session): The SQLAlchemy session to use for the queries.
+            level (str, optional): "sector" or "industry" to stratify by the
+                industry_data keys of each ticker.
+            seed: Entropy for the sampler's NumPy Generator.
+
+        Returns:
+            TickerSampler: The sampler.
+        """
+        tickers = StockData.get_all_unique_tickers(session)
+        if level is None:
+            return TickerSampler(tickers, seed=seed)
+        return TickerSampler.from_sector_index(
+            tickers, Industry.get_sector_index(session), level, seed
+        )
+
+    @staticmethod
+    def select_random_tickers(session: Session, n: int = 1, seed=None):
         """
         Selects n non-repeating random tickers from the StockData table.
 
         Args:
             session (Session): The SQLAlchemy session to use for the query.
             n (int): The number of random tickers to select.
+            seed: Entropy for the draw, a fresh sample on every call if omitted.
 
         Returns:
             list[str]: A list of n random ticker symbols, or fewer if not enough exist.
         """
-        random_tickers = (
-            session.query(StockData.ticker)
-            .group_by(StockData.ticker)
-            .order_by(func.random())
-            .limit(n)
-            .all()
-        )
-        return [ticker[0] for ticker in random_tickers]
+        sampler = StockData.get_ticker_sampler(session, seed=seed)
+        return sampler.sample(min(n, len(sampler))).tolist()
 
     @staticmethod
     def get_ordered_dates_and_prices(session: Session, ticker: str):
@@ -85,6 +206,63 @@ class StockData(ModelBase):
         )
         return results
 
+    @staticmethod
+    def get_price_matrix(session: Session, chunk_size: int = 50_000) -> PriceMatrix:
+        """
+        Loads the (date, ticker, price) rows of every ticker in a single streamed
+        query and pivots them into a wide date x ticker matrix.
+
+        Args:
+            session (Session): The SQLAlchemy session to use for the query.
+            chunk_size (int): Number of rows fetched per round trip.
+
+        Returns:
+            PriceMatrix: The price matrix of all tickers.
+        """
+        return StockData._get_wide_matrix(session, StockData.price, chunk_size)
+
+    @staticmethod
+    def get_pct_change_matrix(
+        session: Session, chunk_size: int = 50_000
+    ) -> PriceMatrix:
+        """
+        Same as get_price_matrix for the stored daily_pct_change column: each
+        value is the change since the ticker's previous trading day, as a
+        fraction.
+
+        Args:
+            session (Session): The SQLAlchemy session to use for the query.
+            chunk_size (int): Number of rows fetched per round trip.
+
+        Returns:
+            PriceMatrix: Daily changes of all tickers, NaN where a ticker has no row.
+        """
+        return StockData._get_wide_matrix(
+            session, StockData.daily_pct_change, chunk_size
+        )
+
+    @staticmethod
+    def _get_wide_matrix(session: Session, column, chunk_size: int) -> PriceMatrix:
+        dates, tickers, values = [], [], []
+        for columns in StockData.iter_columns_from_sql(
+            session,
+            select(StockData.date, StockData.ticker, column),
+            chunk_size=chunk_size,
+            dtypes=StockData.DTYPES,
+        ):
+            dates.append(columns["date"])
+            tickers.append(columns["ticker"])
+            values.append(columns[column.key])
+
+        if not dates:
+            return PriceMatrix(
+                np.empty(0, "datetime64[D]"), np.empty(0, object), np.empty((0, 0))
+            )
+
+        return PriceMatrix.from_columns(
+            np.concatenate(dates), np.concatenate(tickers), np.concatenate(values)
+        )
+
     @staticmethod
     def get_price_on_or_after(session: Session, ticker: str, target_date: Date):
         """
@@ -106,6 +284,69 @@ class StockData(ModelBase):
         )
         return result[0] if result else None
 
+    @staticmethod
+    def get_prices_on_or_after(session: Session, tickers, target_dates) -> np.ndarray:
+        """
+        Batched version of get_price_on_or_after: answers every (ticker, target_date)
+        pair in a single LATERAL join query served by the (ticker, date) index.
+        For repeated lookups against a loaded universe, PriceMatrix.prices_on_or_after
+        avoids the database entirely.
+
+        Args:
+            session (Session): The SQLAlchemy session to use for the query.
+            tickers: Sequence of ticker symbols.
+            target_dates: Sequence of dates, aligned with `tickers`.
+
+        Returns:
+            np.ndarray: float64 prices aligned with the input, NaN where no price
+            is available on or after the date.
+        """
+        tickers = [str(ticker) for ticker in tickers]
+        target_dates = np.asarray(target_dates, dtype="datetime64[D]").tolist()
+        prices = np.full(len(tickers), np.nan)
+        if not tickers:
+            return prices
+
+        result = session.execute(
+            StockData.PRICES_ON_OR_AFTER_SQL,
+            {"tickers": tickers, "target_dates": target_dates},
+        )
+        for position, price in result:
+            if price is not None:
+                prices[position - 1] = price
+        return prices
+
+    @staticmethod
+    def get_aligned_price_matrix(
+        session: Session, tickers, start_date: Date, end_date: Date
+    ) -> PriceMatrix:
+        """
+        Returns the prices of `tickers` on every trading day between two dates,
+        forward filled in the database from each ticker's last known price.
+        Days before a ticker's first price stay missing (NaN).
+
+        Args:
+            session (Session): The SQLAlchemy session to use for the query.
+            tickers: Sequence of ticker symbols.
+            start_date (Date): First trading day of the window.
+            end_date (Date): Last trading day of the window.
+
+        Returns:
+            PriceMatrix: The aligned date x ticker matrix.
+        """
+        rows = session.execute(
+            StockData.ALIGNED_PRICES_SQL,
+            {
+                "tickers": [str(ticker) for ticker in tickers],
+                "start_date": start_date,
+                "end_date": end_date,
+            },
+        ).all()
+        dates, symbols, prices = zip(*rows) if rows else ((), (), ())
+        return PriceMatrix.from_columns(
+            dates, symbols, np.array(prices, dtype=np.float64)
+        )
+
     @staticmethod
     def get_date_range(session: Session):
         """
@@ -121,3 +362,74 @@ class StockData(ModelBase):
             func.min(StockData.date), func.max(StockData.date)
         ).first()
         return result
+
+    @staticmethod
+    def get_fingerprint(session: Session):
+        """
+        Returns a cheap fingerprint of the table contents, used to decide if a
+        locally cached copy is stale. Every write to stock_data is logged in
+        stock_data_changes, so the last change id covers in-place corrections;
+        the date range, read from the date index, covers rows written before the
+        change log existed.
+
+        Args:
+            session (Session): The SQLAlchemy session to use for the query.
+
+        Returns:
+            tuple[int, Date, Date]: Last change id, lowest date and highest date.
+        """
+        change_id, _ = StockDataChange.get_changes_after(session)
+        first_date, last_date = StockData.get_date_range(session)
+        return change_id, first_date, last_date
+
+    @staticmethod
+    def get_rows_after(session: Session, after_date: Date = None):
+        """
+        Returns the (ticker, date, price) columns of all rows after a date.
+
+        Args:
+            session (Session): The SQLAlchemy session to use for the query.
+            after_date (Date, optional): Exclusive lower bound, None for all rows.
+
+        Returns:
+            tuple[np.ndarray, np.ndarray, np.ndarray]: Tickers, datetime64[D] dates
+            and float64 prices, in no particular order.
+        """
+        query = session.query(StockData.ticker, StockData.date, StockData.price)
+        if after_date is not None:
+            query = query.filter(StockData.date > after_date)
+        rows = query.all()
+        if not rows:
+            return (
+                np.empty(0, object),
+                np.empty(0, "datetime64[D]"),
+                np.empty(0, np.float64),
+            )
+        tickers, dates, prices = zip(*rows)
+        return (
+            np.array(tickers, dtype=object),
+            np.array(dates, dtype="datetime64[D]"),
+            np.array(prices, dtype=np.float64),
+        )
+
+    @staticmethod
+    def get_return_summary(session: Session, live: bool = False):
+        """
+        Returns one row per ticker with its first/last date and price, mean daily
+        return and cumulative return, aggregated in the database so only the
+        summary crosses the wire.
+
+        Args:
+            session (Session): The SQLAlchemy session to use for the query.
+            live (bool): Aggregate stock_data now instead of reading the
+                ticker_return_summary materialized view.
+
+        Returns:
+            pd.DataFrame: Columns ticker, first_date, last_date, first_price,
+            last_price, mean_return and cum_return.
+        """
+        if live:
+            return StockData.get_df_from_sql(session, StockData.RETURN_SUMMARY_SQL)
+        return StockData.get_df_from_sql(
+            session, text("SELECT * FROM ticker_return_summary ORDER BY ticker")
+        )
@@ -0,0 +1,68 @@
+from sqlalchemy import Column, Date, DateTime, Integer, insert
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+from sqlalchemy.sql.expression import func
+
+from .base import ModelBase
+
+
+class StockDataChange(ModelBase):
+    """
+    SQLAlchemy model for the change log of stock_data: one row per import or
+    cleanup that wrote rows, with the dates it touched. Readers that keep
+    derived state remember the last change id they applied and rebuild only
+    when a later change reaches into dates they already processed.
+    """
+
+    __tablename__ = "stock_data_changes"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)  # Change order
+    first_date = Column(Date, nullable=False)  # Earliest date written
+    last_date = Column(Date, nullable=False)  # Latest date written
+    row_count = Column(Integer, nullable=False)  # Rows inserted, updated or deleted
+    changed_at = Column(DateTime, nullable=False, server_default=func.now())
+
+    def __repr__(self):
+        return (
+            f"<StockDataChange(id={self.id}, first_date={self.first_date}, "
+            f"last_date={self.last_date}, row_count={self.row_count})>"
+        )
+
+    @staticmethod
+    def record(
+        connection: Connection, first_date: Date, last_date: Date, row_count: int
+    ) -> None:
+        """
+        Logs a write to stock_data, in the writer's transaction so readers see
+        the rows and the log entry together. Writes of no rows are not logged.
+        """
+        if row_count:
+            connection.execute(
+                insert(StockDataChange).values(
+                    first_date=first_date, last_date=last_date, row_count=row_count
+                )
+            )
+
+    @staticmethod
+    def get_changes_after(session: Session, change_id: int = 0):
+        """
+        Returns the changes logged after a change id, read through the primary
+        key so the cost depends on the number of new changes only.
+
+        Args:
+            session (Session): The SQLAlchemy session to use for the query.
+            change_id (int): Last change id already applied, 0 for none.
+
+        Returns:
+            tuple[int, Date]: The last change id (`change_id` if there is no new
+            change) and the earliest date written by the new changes, None if
+            there is no new change.
+        """
+        last_id, first_date = (
+            session.query(
+                func.max(StockDataChange.id), func.min(StockDataChange.first_date)
+            )
+            .filter(StockDataChange.id > change_id)
+            .first()
+        )
+        return (change_id if last_id is None else last_id), first_date
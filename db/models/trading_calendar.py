@@ -0,0 +1,39 @@
+from sqlalchemy import Column, Date
+from sqlalchemy.orm import Session
+
+from .base import ModelBase
+
+
+class TradingCalendar(ModelBase):
+    """
+    SQLAlchemy model for the trading days present in stock_data.
+    """
+
+    __tablename__ = "trading_calendar"
+
+    date = Column(Date, primary_key=True)  # A day with at least one price
+
+    def __repr__(self):
+        return f"<TradingCalendar(date={self.date})>"
+
+    @staticmethod
+    def get_trading_days(
+        session: Session, start_date: Date = None, end_date: Date = None
+    ):
+        """
+        Returns the ordered trading days, optionally restricted to a date window.
+
+        Args:
+            session (Session): The SQLAlchemy session to use for the query.
+            start_date (Date, optional): First day to include.
+            end_date (Date, optional): Last day to include.
+
+        Returns:
+            list[Date]: The trading days in ascending order.
+        """
+        query = session.query(TradingCalendar.date)
+        if start_date is not None:
+            query = query.filter(TradingCalendar.date >= start_date)
+        if end_date is not None:
+            query = query.filter(TradingCalendar.date <= end_date)
+        return [row[0] for row in query.order_by(TradingCalendar.date)]
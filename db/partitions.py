@@ -0,0 +1,129 @@
+import argparse
+from datetime import date
+
+from sqlalchemy import create_engine
+from sqlalchemy.engine import Connection
+from sqlalchemy.sql import text
+
+from .config import DATABASE_URL
+
+PARENT_TABLE = "stock_data"
+DEFAULT_PARTITION = "stock_data_default"
+
+IS_PARTITIONED_SQL = text(
+    """
+    SELECT EXISTS (
+        SELECT 1 FROM pg_partitioned_table
+        WHERE partrelid = to_regclass(:table_name)
+    )
+    """
+)
+
+LIST_PARTITIONS_SQL = text(
+    """
+    SELECT child.relname, pg_get_expr(child.relpartbound, child.oid)
+    FROM pg_inherits
+    JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+    WHERE pg_inherits.inhparent = to_regclass(:table_name)
+    ORDER BY child.relname
+    """
+)
+
+
+def partition_name(year: int) -> str:
+    return f"{PARENT_TABLE}_y{year}"
+
+
+def is_partitioned(connection: Connection) -> bool:
+    """
+    Returns True if stock_data is a partitioned table.
+    """
+    if connection.dialect.name != "postgresql":
+        return False
+    return connection.execute(IS_PARTITIONED_SQL, {"table_name": PARENT_TABLE}).scalar()
+
+
+def list_partitions(connection: Connection) -> list:
+    """
+    Returns (partition name, bound expression) pairs of stock_data.
+    """
+    return connection.execute(LIST_PARTITIONS_SQL, {"table_name": PARENT_TABLE}).all()
+
+
+def ensure_year_partitions(
+    connection: Connection, first_year: int, last_year: int
+) -> list:
+    """
+    Creates the yearly partitions of stock_data between two years that do not
+    exist yet. Each partition gets the partitioned indexes of the parent.
+
+    Args:
+        connection (Connection): A connection inside an open transaction.
+        first_year (int): First year to cover.
+        last_year (int): Last year to cover, inclusive.
+
+    Returns:
+        list[str]: Names of the partitions that were created.
+    """
+    existing = {name for name, _ in list_partitions(connection)}
+    created = []
+    for year in range(first_year, last_year + 1):
+        name = partition_name(year)
+        if name in existing:
+            continue
+        connection.execute(
+            text(
+                f"CREATE TABLE {name} PARTITION OF {PARENT_TABLE} "
+                f"FOR VALUES FROM ('{date(year, 1, 1)}') TO ('{date(year + 1, 1, 1)}')"
+            )
+        )
+        created.append(name)
+    return created
+
+
+def ensure_partitions_for_table(connection: Connection, table_name: str) -> list:
+    """
+    Creates the yearly partitions needed for the dates in `table_name`, e.g. a
+    staging table about to be inserted into stock_data. Rows would otherwise end
+    up in the default partition, which blocks creating their year later on.
+
+    Returns:
+        list[str]: Names of the partitions that were created.
+    """
+    first_year, last_year = connection.execute(
+        text(
+            "SELECT extract(year FROM min(date))::int, extract(year FROM max(date))::int "
+            f"FROM {table_name}"
+        )
+    ).first()
+    if first_year is None:
+        return []
+    return ensure_year_partitions(connection, first_year, last_year)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Create upcoming yearly partitions of stock_data and list them."
+    )
+    parser.add_argument(
+        "--through-year",
+        type=int,
+        default=date.today().year + 1,
+        help="Create missing partitions from the current year up to this year.",
+    )
+    args = parser.parse_args()
+
+    engine = create_engine(DATABASE_URL)
+    with engine.begin() as connection:
+        if not is_partitioned(connection):
+            raise SystemExit(f"{PARENT_TABLE} is not partitioned")
+        for name in ensure_year_partitions(
+            connection, date.today().year, args.through_year
+        ):
+            print(f"Created {name}")
+        for name, bound in list_partitions(connection):
+            print(f"{name}: {bound}")
+
+
+if __name__ == "__main__":
+    main()
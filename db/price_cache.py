@@ -0,0 +1,113 @@
+import json
+import os
+import shutil
+import tempfile
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from .models.stock_data import StockData
+from .price_matrix import PriceMatrix
+
+CACHE_ROOT = os.environ.get(
+    "MONTE_CARLO_CACHE_DIR", os.path.join(os.path.dirname(__file__), "../.cache")
+)
+DEFAULT_CACHE_DIR = os.path.join(CACHE_ROOT, "prices")
+# Bumped when the fingerprint changes meaning, so older caches are rebuilt
+CACHE_VERSION = 2
+
+
+class PriceCache:
+    """
+    On-disk copy of the stock_data table as a PriceMatrix.
+
+    The matrix is stored as prices.npy (read back memory-mapped) plus dates.npy
+    and tickers.npy as its index. A meta.json file holds the fingerprint of the
+    table at the time it was written; a cache whose fingerprint no longer
+    matches StockData.get_fingerprint is rebuilt.
+    """
+
+    def __init__(self, cache_dir: str = DEFAULT_CACHE_DIR):
+        self.cache_dir = os.path.abspath(cache_dir)
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.cache_dir, name)
+
+    @staticmethod
+    def _encode_fingerprint(fingerprint) -> list:
+        return [str(value) for value in fingerprint]
+
+    def cached_fingerprint(self):
+        try:
+            with open(self._path("meta.json"), "r") as meta_file:
+                meta = json.load(meta_file)
+        except (OSError, ValueError):
+            return None
+        if meta.get("version") != CACHE_VERSION:
+            return None
+        return meta.get("fingerprint")
+
+    def read(self) -> PriceMatrix:
+        """
+        Reads the cached matrix without touching the database. The price array
+        is memory-mapped read-only, so no data is copied on load.
+        """
+        return PriceMatrix(
+            np.load(self._path("dates.npy")),
+            np.load(self._path("tickers.npy")),
+            np.load(self._path("prices.npy"), mmap_mode="r"),
+        )
+
+    def write(self, matrix: PriceMatrix, fingerprint) -> None:
+        """
+        Atomically replaces the cache with `matrix`.
+        """
+        parent = os.path.dirname(self.cache_dir)
+        os.makedirs(parent, exist_ok=True)
+        tmp_dir = tempfile.mkdtemp(dir=parent, prefix=".prices-")
+        try:
+            np.save(os.path.join(tmp_dir, "dates.npy"), matrix.dates)
+            np.save(os.path.join(tmp_dir, "tickers.npy"), matrix.tickers.astype(str))
+            np.save(
+                os.path.join(tmp_dir, "prices.npy"),
+                np.ascontiguousarray(matrix.prices),
+            )
+            with open(os.path.join(tmp_dir, "meta.json"), "w") as meta_file:
+                json.dump(
+                    {
+                        "version": CACHE_VERSION,
+                        "fingerprint": self._encode_fingerprint(fingerprint),
+                    },
+                    meta_file,
+                )
+
+            old_dir = None
+            if os.path.exists(self.cache_dir):
+                old_dir = tempfile.mkdtemp(dir=parent, prefix=".prices-old-")
+                os.rename(self.cache_dir, os.path.join(old_dir, "prices"))
+            os.rename(tmp_dir, self.cache_dir)
+            if old_dir:
+                shutil.rmtree(old_dir, ignore_errors=True)
+        except BaseException:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            raise
+
+    def load(self, session: Session) -> PriceMatrix:
+        """
+        Returns the price matrix, from the cache if it matches the table
+        fingerprint and otherwise from the database (refreshing the cache).
+
+        Args:
+            session (Session): The SQLAlchemy session used for the fingerprint
+                check and, on a miss, the full load.
+
+        Returns:
+            PriceMatrix: The price matrix of all tickers.
+        """
+        fingerprint = StockData.get_fingerprint(session)
+        if self.cached_fingerprint() == self._encode_fingerprint(fingerprint):
+            return self.read()
+
+        matrix = StockData.get_price_matrix(session)
+        self.write(matrix, fingerprint)
+        return self.read()
@@ -0,0 +1,229 @@
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+
+class PriceMatrix:
+    """
+    Wide date x ticker price matrix.
+
+    Rows are the sorted unique dates, columns are the sorted unique tickers and
+    missing (date, ticker) pairs are NaN. Column access returns views on the
+    underlying array, so per-ticker series can be handed out without copying.
+    """
+
+    def __init__(self, dates: np.ndarray, tickers: np.ndarray, prices: np.ndarray):
+        """
+        Args:
+            dates (np.ndarray): Sorted datetime64[D] array of length n_dates.
+            tickers (np.ndarray): Sorted array of ticker symbols of length n_tickers.
+            prices (np.ndarray): float64 array of shape (n_dates, n_tickers).
+        """
+        self.dates = np.asarray(dates, dtype="datetime64[D]")
+        self.tickers = np.asarray(tickers, dtype=object)
+        self.prices = np.asarray(prices, dtype=np.float64)
+        self._ticker_index = {ticker: i for i, ticker in enumerate(self.tickers)}
+        self._sorted_tickers = self.tickers.astype(str)
+        self._backfilled = None
+        self._forward_filled = None
+
+    @classmethod
+    def from_columns(cls, dates, tickers, prices) -> "PriceMatrix":
+        """
+        Pivots long (date, ticker, price) columns into a wide matrix.
+
+        Args:
+            dates: Array-like of dates, one per row.
+            tickers: Array-like of ticker symbols, one per row.
+            prices: Array-like of prices, one per row.
+
+        Returns:
+            PriceMatrix: The pivoted matrix.
+        """
+        unique_dates, date_idx = np.unique(
+            np.asarray(dates, dtype="datetime64[D]"), return_inverse=True
+        )
+        unique_tickers, ticker_idx = np.unique(
+            np.asarray(tickers, dtype=object), return_inverse=True
+        )
+        matrix = np.full((len(unique_dates), len(unique_tickers)), np.nan)
+        matrix[date_idx, ticker_idx] = np.asarray(prices, dtype=np.float64)
+        return cls(unique_dates, unique_tickers, matrix)
+
+    def merged(self, dates, tickers, prices) -> "PriceMatrix":
+        """
+        Returns a new matrix with long (date, ticker, price) rows added, e.g.
+        rows loaded since the last date of this one. New dates and tickers add
+        rows and columns; rows for existing (date, ticker) pairs replace them.
+
+        Args:
+            dates: Array-like of dates, one per row.
+            tickers: Array-like of ticker symbols, one per row.
+            prices: Array-like of prices, one per row.
+
+        Returns:
+            PriceMatrix: The merged matrix, this one is left unchanged.
+        """
+        dates = np.asarray(dates, dtype="datetime64[D]")
+        tickers = np.asarray(tickers, dtype=object)
+        all_dates = np.union1d(self.dates, dates)
+        all_tickers = np.union1d(self._sorted_tickers, tickers.astype(str))
+
+        matrix = np.full((len(all_dates), len(all_tickers)), np.nan)
+        matrix[
+            np.searchsorted(all_dates, self.dates)[:, None],
+            np.searchsorted(all_tickers, self._sorted_tickers),
+        ] = self.prices
+        matrix[
+            np.searchsorted(all_dates, dates),
+            np.searchsorted(all_tickers, tickers.astype(str)),
+        ] = np.asarray(prices, dtype=np.float64)
+        return PriceMatrix(all_dates, all_tickers.astype(object), matrix)
+
+    @property
+    def shape(self):
+        return self.prices.shape
+
+    def ticker_index(self, ticker: str) -> int:
+        return self._ticker_index[ticker]
+
+    def column(self, ticker: str) -> np.ndarray:
+        """
+        Returns the price column for a ticker as a view on the matrix.
+        """
+        return self.prices[:, self._ticker_index[ticker]]
+
+    def series(self, ticker: str) -> "pd.Series":
+        """
+        Returns the non-missing prices for a ticker as a date-indexed Series.
+        """
+        import pandas as pd
+
+        column = self.column(ticker)
+        mask = ~np.isnan(column)
+        return pd.Series(
+            column[mask], index=pd.DatetimeIndex(self.dates[mask]), name=ticker
+        )
+
+    def _fill(self, backward: bool) -> np.ndarray:
+        n_dates = self.prices.shape[0]
+        rows = np.arange(n_dates)[:, None]
+        valid = ~np.isnan(self.prices)
+        if backward:
+            # Index of the next valid row at or after each row, n_dates if none
+            idx = np.where(valid, rows, n_dates)
+            idx = np.minimum.accumulate(idx[::-1], axis=0)[::-1]
+            missing = idx == n_dates
+        else:
+            # Index of the last valid row at or before each row, -1 if none
+            idx = np.where(valid, rows, -1)
+            idx = np.maximum.accumulate(idx, axis=0)
+            missing = idx == -1
+        filled = np.take_along_axis(self.prices, np.clip(idx, 0, n_dates - 1), axis=0)
+        filled[missing] = np.nan
+        return filled
+
+    def backfilled(self) -> np.ndarray:
+        """
+        Returns the prices with every gap filled by the next available price,
+        i.e. the price on or after each date. Computed once and cached.
+        """
+        if self._backfilled is None:
+            self._backfilled = self._fill(backward=True)
+        return self._backfilled
+
+    def forward_filled(self) -> np.ndarray:
+        """
+        Returns the prices with every gap filled by the last available price,
+        i.e. the price on or before each date. Computed once and cached.
+        """
+        if self._forward_filled is None:
+            self._forward_filled = self._fill(backward=False)
+        return self._forward_filled
+
+    def ticker_indices(self, tickers) -> np.ndarray:
+        """
+        Returns the column index of each ticker, -1 for unknown tickers.
+        """
+        tickers = np.asarray(tickers).astype(str)
+        if not len(self._sorted_tickers):
+            return np.full(len(tickers), -1)
+        idx = np.searchsorted(self._sorted_tickers, tickers)
+        idx = np.minimum(idx, len(self._sorted_tickers) - 1)
+        found = self._sorted_tickers[idx] == tickers
+        return np.where(found, idx, -1)
+
+    def prices_on_or_after(self, tickers, target_dates) -> np.ndarray:
+        """
+        Batched version of StockData.get_price_on_or_after: looks up the price of
+        each (ticker, target_date) pair on the target date or the next available
+        date, using a binary search over the sorted dates.
+
+        Args:
+            tickers: Array-like of ticker symbols.
+            target_dates: Array-like of dates, aligned with `tickers`.
+
+        Returns:
+            np.ndarray: float64 prices aligned with the input, NaN where the
+            ticker is unknown or has no price on or after the date.
+        """
+        columns = self.ticker_indices(tickers)
+        rows = np.searchsorted(
+            self.dates, np.asarray(target_dates, dtype="datetime64[D]"), side="left"
+        )
+        valid = (columns >= 0) & (rows < len(self.dates))
+
+        prices = np.full(len(columns), np.nan)
+        prices[valid] = self.backfilled()[rows[valid], columns[valid]]
+        return prices
+
+    def _first_valid_rows(self) -> np.ndarray:
+        if not len(self.dates):
+            return np.zeros(self.prices.shape[1], dtype=np.intp)
+        return np.argmax(~np.isnan(self.prices), axis=0)
+
+    def _last_valid_rows(self) -> np.ndarray:
+        n_dates = self.prices.shape[0]
+        if not n_dates:
+            return np.zeros(self.prices.shape[1], dtype=np.intp)
+        return n_dates - 1 - np.argmax(~np.isnan(self.prices[::-1]), axis=0)
+
+    def first_valid_prices(self) -> np.ndarray:
+        """
+        Returns the first non-missing price of every ticker.
+        """
+        return self.prices[self._first_valid_rows(), np.arange(self.prices.shape[1])]
+
+    def last_valid_prices(self) -> np.ndarray:
+        """
+        Returns the last non-missing price of every ticker.
+        """
+        return self.prices[self._last_valid_rows(), np.arange(self.prices.shape[1])]
+
+    def first_valid_dates(self) -> np.ndarray:
+        """
+        Returns the date of the first non-missing price of every ticker.
+        """
+        return self.dates[self._first_valid_rows()]
+
+    def last_valid_dates(self) -> np.ndarray:
+        """
+        Returns the date of the last non-missing price of every ticker.
+        """
+        return self.dates[self._last_valid_rows()]
+
+    def last_cum_returns(self) -> np.ndarray:
+        """
+        Returns the cumulative return of every ticker over its available history.
+        """
+        return self.last_valid_prices() / self.first_valid_prices() - 1
+
+    def to_df(self) -> "pd.DataFrame":
+        import pandas as pd
+
+        return pd.DataFrame(
+            self.prices, index=pd.DatetimeIndex(self.dates), columns=self.tickers
+        )
@@ -0,0 +1,192 @@
+import os
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from .models.stock_data import StockData
+from .models.stock_data_change import StockDataChange
+from .price_cache import CACHE_ROOT
+
+DEFAULT_STATE_PATH = os.path.join(CACHE_ROOT, "return_state.npz")
+
+
+class ReturnState:
+    """
+    Persisted per-ticker return state that can be advanced with new rows only.
+
+    For every ticker it keeps the first and last date, the last price, the
+    running cumulative growth (1 + cumulative return) and the running sum and
+    count of daily returns.
+    A watermark date and the id of the last stock_data_changes entry applied
+    detect corrections to already processed history, in which case the state
+    is rebuilt from scratch. Neither check reads the processed rows again.
+    """
+
+    def __init__(self, path: str = DEFAULT_STATE_PATH):
+        self.path = os.path.abspath(path)
+        self.tickers = np.empty(0, dtype=object)
+        self.last_price = np.empty(0)
+        self.cum_growth = np.empty(0)
+        self.return_sum = np.empty(0)
+        self.return_count = np.empty(0, dtype=np.int64)
+        self.first_dates = np.empty(0, dtype="datetime64[D]")
+        self.last_dates = np.empty(0, dtype="datetime64[D]")
+        self.first_date = None
+        self.watermark = None
+        self.change_id = 0
+
+    @property
+    def date_range(self):
+        return self.first_date, self.watermark
+
+    def last_cum_returns(self) -> np.ndarray:
+        return self.cum_growth - 1
+
+    def avg_returns(self) -> np.ndarray:
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return self.return_sum / self.return_count
+
+    def load(self) -> bool:
+        """
+        Loads the state file. Returns False if there is none.
+        """
+        if not os.path.exists(self.path):
+            return False
+        with np.load(self.path) as state:
+            if "change_id" not in state.files or "first_dates" not in state.files:
+                # Written before the change log or the per-ticker dates, rebuild
+                return False
+            self.tickers = state["tickers"].astype(object)
+            self.last_price = state["last_price"]
+            self.cum_growth = state["cum_growth"]
+            self.return_sum = state["return_sum"]
+            self.return_count = state["return_count"]
+            self.first_dates = state["first_dates"]
+            self.last_dates = state["last_dates"]
+            self.first_date = state["first_date"].item()
+            self.watermark = state["watermark"].item()
+            self.change_id = int(state["change_id"])
+        return True
+
+    def save(self) -> None:
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = f"{self.path}.tmp.npz"
+        np.savez(
+            tmp_path,
+            tickers=self.tickers.astype(str),
+            last_price=self.last_price,
+            cum_growth=self.cum_growth,
+            return_sum=self.return_sum,
+            return_count=self.return_count,
+            first_dates=self.first_dates,
+            last_dates=self.last_dates,
+            first_date=np.datetime64(self.first_date, "D"),
+            watermark=np.datetime64(self.watermark, "D"),
+            change_id=self.change_id,
+        )
+        os.replace(tmp_path, self.path)
+
+    def reset(self) -> None:
+        self.__init__(self.path)
+
+    def apply(self, tickers: np.ndarray, dates: np.ndarray, prices: np.ndarray):
+        """
+        Advances the state with rows that are all later than the watermark.
+
+        Args:
+            tickers (np.ndarray): Ticker of each new row.
+            dates (np.ndarray): datetime64[D] date of each new row.
+            prices (np.ndarray): Price of each new row.
+        """
+        if not len(prices):
+            return
+
+        tickers = tickers.astype(str)
+        order = np.lexsort((dates, tickers))
+        tickers, dates, prices = tickers[order], dates[order], prices[order]
+        group_tickers, starts = np.unique(tickers, return_index=True)
+        ends = np.append(starts[1:], len(prices))
+
+        # Merge newly seen tickers into the state arrays
+        all_tickers = np.union1d(self.tickers.astype(str), group_tickers)
+        old_idx = np.searchsorted(all_tickers, self.tickers.astype(str))
+        last_price = np.full(len(all_tickers), np.nan)
+        cum_growth = np.ones(len(all_tickers))
+        return_sum = np.zeros(len(all_tickers))
+        return_count = np.zeros(len(all_tickers), dtype=np.int64)
+        first_dates = np.full(len(all_tickers), np.datetime64("NaT"), "datetime64[D]")
+        last_dates = first_dates.copy()
+        last_price[old_idx] = self.last_price
+        cum_growth[old_idx] = self.cum_growth
+        return_sum[old_idx] = self.return_sum
+        return_count[old_idx] = self.return_count
+        first_dates[old_idx] = self.first_dates
+        last_dates[old_idx] = self.last_dates
+
+        idx = np.searchsorted(all_tickers, group_tickers)
+
+        # Daily returns of the new rows, chained to each ticker's last known price
+        previous = np.empty_like(prices)
+        previous[1:] = prices[:-1]
+        previous[starts] = last_price[idx]
+        returns = prices / previous - 1
+        valid = ~np.isnan(returns)
+        return_sum[idx] += np.add.reduceat(np.where(valid, returns, 0.0), starts)
+        return_count[idx] += np.add.reduceat(valid.astype(np.int64), starts)
+
+        # Growth telescopes to last / base, where the base is the previous last
+        # price, or the first new price for tickers without history
+        base = np.where(np.isnan(last_price[idx]), prices[starts], last_price[idx])
+        cum_growth[idx] *= prices[ends - 1] / base
+        last_price[idx] = prices[ends - 1]
+        first_dates[idx] = np.where(
+            np.isnat(first_dates[idx]), dates[starts], first_dates[idx]
+        )
+        last_dates[idx] = dates[ends - 1]
+
+        self.tickers = all_tickers.astype(object)
+        self.last_price = last_price
+        self.cum_growth = cum_growth
+        self.return_sum = return_sum
+        self.return_count = return_count
+        self.first_dates = first_dates
+        self.last_dates = last_dates
+
+        first_date, last_date = dates.min().item(), dates.max().item()
+        self.first_date = min(filter(None, (self.first_date, first_date)))
+        self.watermark = max(filter(None, (self.watermark, last_date)))
+
+    def refresh(self, session: Session) -> "ReturnState":
+        """
+        Brings the state up to date with stock_data, reading only rows newer
+        than the watermark unless older history changed.
+
+        Args:
+            session (Session): The SQLAlchemy session to use for the queries.
+
+        Returns:
+            ReturnState: self, for chaining.
+        """
+        loaded = self.load()
+        change_id, first_changed = StockDataChange.get_changes_after(
+            session, self.change_id
+        )
+        if loaded and first_changed is not None and first_changed <= self.watermark:
+            # Processed history was corrected, recompute from scratch
+            self.reset()
+            loaded = False
+
+        previous_watermark, previous_change_id = self.watermark, self.change_id
+        self.apply(*StockData.get_rows_after(session, self.watermark))
+        if self.watermark is None:
+            # Empty table, nothing to persist
+            return self
+
+        self.change_id = change_id
+        if (
+            not loaded
+            or self.watermark != previous_watermark
+            or self.change_id != previous_change_id
+        ):
+            self.save()
+        return self
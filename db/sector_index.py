@@ -0,0 +1,130 @@
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+LEVELS = ("sector", "industry")
+
+
+class SectorIndex:
+    """
+    In-memory symbol -> sector/industry lookup over the integer keys of the
+    sector dimension tables.
+
+    Symbols are sorted so tickers are mapped with one binary search, and the
+    breakdowns are computed with bincount over the small integer codes instead
+    of grouping strings.
+    """
+
+    def __init__(
+        self,
+        symbols: np.ndarray,
+        sector_ids: np.ndarray,
+        industry_ids: np.ndarray,
+        sector_names: np.ndarray,
+        industry_names: np.ndarray,
+        industry_sector_ids: np.ndarray,
+    ):
+        """
+        Args:
+            symbols (np.ndarray): Sorted unique ticker symbols.
+            sector_ids (np.ndarray): Sector key of each symbol, -1 if unknown.
+            industry_ids (np.ndarray): Industry key of each symbol, -1 if unknown.
+            sector_names (np.ndarray): Sector name at the position of its key.
+            industry_names (np.ndarray): Industry name at the position of its key.
+            industry_sector_ids (np.ndarray): Sector key of each industry key.
+        """
+        self.symbols = np.asarray(symbols).astype(str)
+        self.sector_ids = np.asarray(sector_ids, dtype=np.int32)
+        self.industry_ids = np.asarray(industry_ids, dtype=np.int32)
+        self.sector_names = np.asarray(sector_names, dtype=object)
+        self.industry_names = np.asarray(industry_names, dtype=object)
+        self.industry_sector_ids = np.asarray(industry_sector_ids, dtype=np.int32)
+
+    def codes(self, tickers, level: str = "sector") -> np.ndarray:
+        """
+        Returns the sector or industry key of each ticker, -1 for tickers
+        without industry data.
+        """
+        if level not in LEVELS:
+            raise ValueError(f"Unknown level: {level}")
+        keys = self.sector_ids if level == "sector" else self.industry_ids
+        tickers = np.asarray(tickers).astype(str)
+        if not len(self.symbols):
+            return np.full(len(tickers), -1, dtype=np.int32)
+        idx = np.searchsorted(self.symbols, tickers)
+        idx = np.minimum(idx, len(self.symbols) - 1)
+        found = self.symbols[idx] == tickers
+        return np.where(found, keys[idx], -1)
+
+    def breakdown(
+        self, tickers, returns, level: str = "sector", threshold: float = None
+    ) -> "pd.DataFrame":
+        """
+        Aggregates per-ticker returns by sector or industry in one pass.
+
+        Args:
+            tickers: Array-like of ticker symbols.
+            returns: Array-like of returns aligned with `tickers`; NaN returns
+                are skipped.
+            level (str): "sector" or "industry".
+            threshold (float, optional): Return to beat, defaults to the average
+                over all given tickers.
+
+        Returns:
+            pd.DataFrame: One row per group, largest first, with the group name
+            (plus the sector for industries), count, mean_return, median_return,
+            above_avg, share_above_avg, above_median and share_above_median,
+            where the median is the one over all given tickers.
+        """
+        import pandas as pd
+
+        returns = np.asarray(returns, dtype=np.float64)
+        codes = self.codes(tickers, level)
+        present = ~np.isnan(returns)
+        if threshold is None:
+            threshold = np.nanmean(returns) if present.any() else np.nan
+        median = np.nanmedian(returns) if present.any() else np.nan
+
+        valid = present & (codes >= 0)
+        codes, returns = codes[valid], returns[valid]
+        n_groups = len(self.sector_names if level == "sector" else self.industry_names)
+
+        counts = np.bincount(codes, minlength=n_groups)
+        sums = np.bincount(codes, weights=returns, minlength=n_groups)
+        above_avg = np.bincount(codes, weights=returns > threshold, minlength=n_groups)
+        above_median = np.bincount(codes, weights=returns > median, minlength=n_groups)
+
+        # Group medians from the middle elements of each group, sorted by
+        # (code, return)
+        order = np.lexsort((returns, codes))
+        sorted_returns = returns[order]
+        starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+        groups = np.flatnonzero(counts)
+        lower = starts[groups] + (counts[groups] - 1) // 2
+        upper = starts[groups] + counts[groups] // 2
+        medians = (sorted_returns[lower] + sorted_returns[upper]) / 2
+
+        group_counts = counts[groups]
+        data = {}
+        if level == "industry":
+            data["sector"] = self.sector_names[self.industry_sector_ids[groups]]
+            data["industry"] = self.industry_names[groups]
+        else:
+            data["sector"] = self.sector_names[groups]
+        data.update(
+            count=group_counts,
+            mean_return=sums[groups] / group_counts,
+            median_return=medians,
+            above_avg=above_avg[groups].astype(np.int64),
+            share_above_avg=above_avg[groups] / group_counts,
+            above_median=above_median[groups].astype(np.int64),
+            share_above_median=above_median[groups] / group_counts,
+        )
+        return (
+            pd.DataFrame(data)
+            .sort_values("count", ascending=False, kind="stable")
+            .reset_index(drop=True)
+        )
@@ -0,0 +1,29 @@
+from functools import cache
+
+from sqlalchemy import create_engine
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session, sessionmaker
+
+from .config import DATABASE_URL
+
+
+@cache
+def get_engine(url: str = DATABASE_URL) -> Engine:
+    """
+    Returns the engine for `url`, created on first use so that importing a
+    module does not connect anywhere.
+    """
+    return create_engine(url)
+
+
+@cache
+def get_session_factory(url: str = DATABASE_URL) -> sessionmaker:
+    return sessionmaker(autocommit=False, autoflush=False, bind=get_engine(url))
+
+
+@cache
+def get_session(url: str = DATABASE_URL) -> Session:
+    """
+    Returns a session shared by the callers of this process, opened on first use.
+    """
+    return get_session_factory(url)()
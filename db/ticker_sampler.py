@@ -0,0 +1,178 @@
+import numpy as np
+
+from .sector_index import SectorIndex
+
+# Rows of random keys per block when a sample without replacement takes a
+# large share of the population
+KEY_BLOCK_SIZE = 2**24
+
+
+def draw_distinct(
+    rng: np.random.Generator, n_items: int, n: int, size: int
+) -> np.ndarray:
+    """
+    Draws `size` rows of `n` distinct positions below `n_items`. Each row is a
+    uniformly random set, in no random order; shuffle it if the order matters.
+
+    Args:
+        rng (np.random.Generator): Source of randomness.
+        n_items (int): Size of the population.
+        n (int): Positions per row.
+        size (int): Number of rows.
+
+    Returns:
+        np.ndarray: (size, n) int64 positions.
+    """
+    if n > n_items:
+        raise ValueError(f"Cannot draw {n} items without replacement from {n_items}")
+    if 4 * n > n_items:
+        # Smallest n of a row of random keys, in blocks to bound memory
+        block = max(1, KEY_BLOCK_SIZE // n_items)
+        return np.concatenate(
+            [
+                np.argpartition(
+                    rng.random((min(block, size - start), n_items)), n - 1, axis=1
+                )[:, :n]
+                for start in range(0, size, block)
+            ]
+        ).reshape(size, n)
+
+    # Floyd's algorithm, one column at a time across all rows: draw below
+    # j + 1 and take j itself when the draw is already in the row
+    positions = np.empty((size, n), dtype=np.int64)
+    for i, j in enumerate(range(n_items - n, n_items)):
+        draws = rng.integers(0, j + 1, size=size)
+        taken = (positions[:, :i] == draws[:, None]).any(axis=1)
+        positions[:, i] = np.where(taken, j, draws)
+    return positions
+
+
+class TickerSampler:
+    """
+    Draws random ticker samples from an in-memory ticker universe.
+
+    Samples are positions into the sorted `tickers` array drawn with a NumPy
+    Generator, so the cost depends on the number and size of the samples only.
+    Many samples are drawn at once as a (size, n) array. Every call advances
+    the sampler's generator, so a seeded sampler gives a reproducible sequence
+    of different samples.
+    """
+
+    def __init__(self, tickers, strata=None, seed=None):
+        """
+        Args:
+            tickers: Array-like of unique ticker symbols.
+            strata: Array-like of integer stratum codes aligned with `tickers`,
+                e.g. sector keys with -1 for unknown, optional.
+            seed: Entropy for np.random.default_rng.
+        """
+        tickers = np.asarray(tickers).astype(str)
+        order = np.argsort(tickers, kind="stable")
+        self.tickers = tickers[order].astype(object)
+        self.strata = None if strata is None else np.asarray(strata)[order]
+        self.rng = np.random.default_rng(seed)
+
+    @classmethod
+    def from_sector_index(
+        cls, tickers, sector_index: SectorIndex, level: str = "sector", seed=None
+    ) -> "TickerSampler":
+        """
+        Builds a sampler stratified by the sector or industry of each ticker,
+        tickers without industry data forming one more stratum.
+        """
+        return cls(tickers, sector_index.codes(tickers, level), seed)
+
+    def __len__(self) -> int:
+        return len(self.tickers)
+
+    def _draw(self, n_items: int, n: int, size: int, replace: bool) -> np.ndarray:
+        # (size, n) positions below n_items, distinct within a row unless
+        # replace; rows drawn without replacement are sets in no random order
+        if replace:
+            return self.rng.integers(0, n_items, size=(size, n))
+        return draw_distinct(self.rng, n_items, n, size)
+
+    def sample_indices(
+        self, n: int, size: int = None, replace: bool = False
+    ) -> np.ndarray:
+        """
+        Draws positions into `tickers`.
+
+        Args:
+            n (int): Tickers per sample.
+            size (int, optional): Number of samples, one sample if omitted.
+            replace (bool): Whether a ticker can appear more than once in a sample.
+
+        Returns:
+            np.ndarray: (n,) positions, or (size, n) with `size`.
+        """
+        positions = self._draw(
+            len(self.tickers), n, 1 if size is None else size, replace
+        )
+        if not replace:
+            positions = self.rng.permuted(positions, axis=1)
+        return positions[0] if size is None else positions
+
+    def sample(self, n: int, size: int = None, replace: bool = False) -> np.ndarray:
+        """
+        Same as sample_indices, returning the ticker symbols.
+        """
+        return self.tickers[self.sample_indices(n, size, replace)]
+
+    def allocation(self, n: int) -> tuple:
+        """
+        Splits `n` over the strata in proportion to their sizes, handing the
+        remainder to the largest fractional shares.
+
+        Returns:
+            tuple[np.ndarray, np.ndarray]: The stratum codes and the number of
+            tickers drawn from each.
+        """
+        if self.strata is None:
+            raise ValueError("The sampler has no strata")
+        codes, sizes = np.unique(self.strata, return_counts=True)
+        shares = n * sizes / sizes.sum()
+        quotas = np.floor(shares).astype(np.int64)
+        remainder = np.argsort(quotas - shares, kind="stable")[: n - quotas.sum()]
+        quotas[remainder] += 1
+        return codes, quotas
+
+    def stratified_indices(
+        self, n: int, size: int = None, replace: bool = False
+    ) -> np.ndarray:
+        """
+        Draws samples with each stratum represented in proportion to its size
+        (see allocation), in random order within a sample.
+
+        Args:
+            n (int): Tickers per sample.
+            size (int, optional): Number of samples, one sample if omitted.
+            replace (bool): Whether a ticker can appear more than once in a sample.
+
+        Returns:
+            np.ndarray: (n,) positions into `tickers`, or (size, n) with `size`.
+        """
+        n_samples = 1 if size is None else size
+        codes, quotas = self.allocation(n)
+        # Members of every stratum, contiguous in code order
+        members = np.argsort(self.strata, kind="stable")
+        starts = np.searchsorted(self.strata[members], codes)
+        sizes = np.diff(np.append(starts, len(members)))
+
+        positions = np.concatenate(
+            [
+                members[start + self._draw(count, quota, n_samples, replace)]
+                for start, count, quota in zip(starts, sizes, quotas)
+            ],
+            axis=1,
+        )
+        positions = self.rng.permuted(positions, axis=1)
+        return positions[0] if size is None else positions
+
+    def stratified_sample(
+        self, n: int, size: int = None, replace: bool = False
+    ) -> np.ndarray:
+        """
+        Same as stratified_indices, returning the ticker symbols.
+        """
+        return self.tickers[self.stratified_indices(n, size, replace)]
@@ -0,0 +1,75 @@
+from typing import NamedTuple
+
+import numpy as np
+
+# Market-cap buckets in dollars, lower bound inclusive and upper bound exclusive
+MARKET_CAP_BUCKETS = {
+    "nano": (None, 50 * 10**6),
+    "micro": (50 * 10**6, 300 * 10**6),
+    "small": (300 * 10**6, 2 * 10**9),
+    "mid": (2 * 10**9, 10 * 10**9),
+    "large": (10 * 10**9, 200 * 10**9),
+    "mega": (200 * 10**9, None),
+}
+
+
+class Universe(NamedTuple):
+    """
+    Tickers selected by their industry_data fundamentals (see
+    Industry.get_universe), with the market caps used for weighting.
+
+    Attributes:
+        symbols (np.ndarray): Sorted unique ticker symbols.
+        market_caps (np.ndarray): Market cap of each symbol in dollars, NaN if
+            unknown.
+    """
+
+    symbols: np.ndarray
+    market_caps: np.ndarray
+
+    def positions(self, tickers) -> np.ndarray:
+        """
+        Returns the position of each ticker in `symbols`, -1 if not in the
+        universe.
+        """
+        tickers = np.asarray(tickers).astype(str)
+        if not len(self.symbols):
+            return np.full(len(tickers), -1)
+        idx = np.minimum(np.searchsorted(self.symbols, tickers), len(self.symbols) - 1)
+        return np.where(self.symbols[idx] == tickers, idx, -1)
+
+    def contains(self, tickers) -> np.ndarray:
+        return self.positions(tickers) >= 0
+
+    def weights(self, tickers, returns=None) -> np.ndarray:
+        """
+        Market-cap weights of the tickers, summing to 1 over the tickers in the
+        universe with a known market cap (and a return, if given); 0 for the
+        others.
+
+        Args:
+            tickers: Array-like of ticker symbols.
+            returns: Array-like of returns aligned with `tickers`, optional.
+
+        Returns:
+            np.ndarray: float64 weights aligned with `tickers`, all 0 if no ticker
+            has a market cap.
+        """
+        positions = self.positions(tickers)
+        caps = np.where(positions >= 0, self.market_caps[positions], np.nan)
+        if returns is not None:
+            caps[np.isnan(np.asarray(returns, dtype=np.float64))] = np.nan
+        caps = np.nan_to_num(caps, nan=0.0)
+        total = caps.sum()
+        return caps / total if total > 0 else caps
+
+    def weighted_return(self, tickers, returns) -> float:
+        """
+        Market-cap weighted average of the returns, NaN if no ticker with a
+        return has a market cap.
+        """
+        returns = np.asarray(returns, dtype=np.float64)
+        weights = self.weights(tickers, returns)
+        if not weights.any():
+            return np.nan
+        return float(np.dot(weights, np.nan_to_num(returns)))
@@ -0,0 +1,250 @@
+import json
+import os
+import resource
+import sys
+import time
+from contextlib import contextmanager, nullcontext
+from datetime import datetime, timezone
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# Comma separated, e.g. "1", "cpu", "cpu,memory" or "memory,report.json"
+PROFILE_ENV = "MONTE_CARLO_PROFILE"
+
+
+def reset_peak_rss() -> bool:
+    # Linux resets VmHWM when "5" is written to clear_refs
+    try:
+        with open("/proc/self/clear_refs", "w") as clear_refs:
+            clear_refs.write("5")
+        return True
+    except OSError:
+        return False
+
+
+def peak_rss_mb() -> float:
+    try:
+        with open("/proc/self/status", "r") as status:
+            for line in status:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    # ru_maxrss is the peak of the whole process, in KiB on Linux and bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+class QueryCounter:
+    """
+    Counts statements executed on an engine, the rows the cursor reported and
+    the time spent in them. Listening on the Engine class covers every engine,
+    including the sync engines behind async ones.
+    """
+
+    def __init__(self, engine=Engine):
+        self.engine = engine
+        self.queries = 0
+        self.rows = 0
+        self.db_time = 0.0
+        event.listen(engine, "before_cursor_execute", self._before)
+        event.listen(engine, "after_cursor_execute", self._after)
+
+    def _before(self, conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    def _after(self, conn, cursor, statement, parameters, context, executemany):
+        self.queries += 1
+        self.db_time += time.perf_counter() - conn.info["query_start"].pop()
+        # -1 when the driver does not know, e.g. for SQLite selects
+        if cursor.rowcount > 0:
+            self.rows += cursor.rowcount
+
+    def close(self):
+        event.remove(self.engine, "before_cursor_execute", self._before)
+        event.remove(self.engine, "after_cursor_execute", self._after)
+
+
+class Profiler:
+    """
+    Per-stage wall/CPU time, query counts and DB time of a run, with optional
+    cProfile and tracemalloc capture, reported as JSON at the end.
+
+    A disabled profiler registers no event hooks and its stages are no-ops.
+    """
+
+    def __init__(
+        self,
+        enabled: bool = True,
+        cpu: bool = False,
+        memory: bool = False,
+        output: str = None,
+        top: int = 30,
+    ):
+        """
+        Args:
+            enabled (bool): Collect stage timings and query counts.
+            cpu (bool): Also run cProfile and report the top functions.
+            memory (bool): Also trace allocations with tracemalloc and report
+                the peak per stage and the top allocation sites.
+            output (str, optional): Path of the JSON report, stderr if omitted.
+            top (int): Number of cProfile functions and allocation sites to keep.
+        """
+        self.enabled = enabled
+        self.cpu = enabled and cpu
+        self.memory = enabled and memory
+        self.output = output
+        self.top = top
+        self.stages = []
+        self._counter = None
+        self._cprofile = None
+        self._started_at = None
+        self._start = None
+        self._cpu_start = None
+
+    @classmethod
+    def from_env(cls, value: str = None) -> "Profiler":
+        """
+        Builds a profiler from a MONTE_CARLO_PROFILE style value: "1" enables
+        it, "cpu" and "memory" add cProfile and tracemalloc, and a token with a
+        ".json" suffix is the report path. Empty or unset disables it.
+        """
+        if value is None:
+            value = os.environ.get(PROFILE_ENV, "")
+        tokens = {token.strip() for token in value.split(",") if token.strip()}
+        if not tokens or tokens <= {"0", "false"}:
+            return cls(enabled=False)
+        output = next((token for token in tokens if token.endswith(".json")), None)
+        return cls(cpu="cpu" in tokens, memory="memory" in tokens, output=output)
+
+    def start(self) -> "Profiler":
+        if not self.enabled:
+            return self
+        self._started_at = datetime.now(timezone.utc).isoformat()
+        self._counter = QueryCounter()
+        if self.memory:
+            import tracemalloc
+
+            tracemalloc.start()
+        if self.cpu:
+            import cProfile
+
+            self._cprofile = cProfile.Profile()
+            self._cprofile.enable()
+        reset_peak_rss()
+        self._cpu_start = time.process_time()
+        self._start = time.perf_counter()
+        return self
+
+    def stage(self, name: str):
+        """
+        Context manager measuring the enclosed block. The yielded dict can be
+        given extra entries, e.g. "rows", which end up in the report.
+        """
+        if not self.enabled:
+            return nullcontext({})
+        return self._stage(name)
+
+    @contextmanager
+    def _stage(self, name: str):
+        info = {}
+        if self.memory:
+            import tracemalloc
+
+            tracemalloc.reset_peak()
+        queries, rows, db_time = (
+            self._counter.queries,
+            self._counter.rows,
+            self._counter.db_time,
+        )
+        cpu_start = time.process_time()
+        start = time.perf_counter()
+        try:
+            yield info
+        finally:
+            stage = {
+                "name": name,
+                "wall_time_s": time.perf_counter() - start,
+                "cpu_time_s": time.process_time() - cpu_start,
+                "db_time_s": self._counter.db_time - db_time,
+                "queries": self._counter.queries - queries,
+                "rows": self._counter.rows - rows,
+            }
+            if self.memory:
+                stage["traced_peak_mb"] = tracemalloc.get_traced_memory()[1] / 2**20
+            stage.update(info)
+            self.stages.append(stage)
+
+    def _cprofile_report(self) -> list:
+        import pstats
+
+        stats = pstats.Stats(self._cprofile)
+        # Ordered by cumulative time
+        functions = sorted(
+            stats.stats.items(), key=lambda item: item[1][3], reverse=True
+        )[: self.top]
+        return [
+            {
+                "function": f"{filename}:{line}({name})",
+                "calls": calls,
+                "total_time_s": total_time,
+                "cumulative_time_s": cumulative_time,
+            }
+            for (filename, line, name), (_, calls, total_time, cumulative_time, _) in (
+                functions
+            )
+        ]
+
+    def _tracemalloc_report(self) -> list:
+        import tracemalloc
+
+        statistics = tracemalloc.take_snapshot().statistics("lineno")
+        return [
+            {
+                "location": str(stat.traceback),
+                "size_mb": stat.size / 2**20,
+                "count": stat.count,
+            }
+            for stat in statistics[: self.top]
+        ]
+
+    def report(self) -> dict:
+        """
+        Stops the profiler and returns the collected report.
+        """
+        if not self.enabled:
+            return {}
+        report = {
+            "started_at": self._started_at,
+            "wall_time_s": time.perf_counter() - self._start,
+            "cpu_time_s": time.process_time() - self._cpu_start,
+            "db_time_s": self._counter.db_time,
+            "queries": self._counter.queries,
+            "rows": self._counter.rows,
+            "peak_rss_mb": peak_rss_mb(),
+            "stages": self.stages,
+        }
+        self._counter.close()
+        if self.cpu:
+            self._cprofile.disable()
+            report["cprofile"] = self._cprofile_report()
+        if self.memory:
+            import tracemalloc
+
+            report["tracemalloc"] = self._tracemalloc_report()
+            tracemalloc.stop()
+        return report
+
+    def write_report(self):
+        """
+        Stops the profiler and writes the JSON report to `output` or stderr.
+        """
+        if not self.enabled:
+            return
+        report = json.dumps(self.report(), indent=2, default=str)
+        if self.output:
+            with open(self.output, "w") as output:
+                output.write(report + "\n")
+        else:
+            print(report, file=sys.stderr)
@@ -0,0 +1,508 @@
+import argparse
+import json
+import os
+import socketserver
+import threading
+import time
+import traceback
+from collections import OrderedDict
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import NamedTuple
+from urllib.parse import parse_qs, urlsplit
+
+import numpy as np
+from sqlalchemy.sql.expression import func
+
+from analysis.series import TickerSeries
+from analysis.windows import WindowReturns, WindowStats
+from db import (
+    Industry,
+    PriceCache,
+    PriceMatrix,
+    SectorIndex,
+    StockData,
+    StockDataChange,
+)
+from db.sector_index import LEVELS
+from db.session import get_session_factory
+
+# Responses kept per snapshot, least recently used first out
+DEFAULT_RESPONSE_CACHE_SIZE = 256
+
+
+def _float(value):
+    # JSON has no NaN
+    value = float(value)
+    return None if np.isnan(value) else value
+
+
+def _floats(values) -> list:
+    values = np.asarray(values, dtype=np.float64)
+    return np.where(np.isnan(values), None, values).tolist()
+
+
+class UnknownTickerError(LookupError):
+    """
+    Raised for a ticker symbol that has no prices in the snapshot.
+    """
+
+
+class ResponseCache:
+    """
+    Bounded least-recently-used cache of the responses of one snapshot.
+    """
+
+    def __init__(self, max_size: int = DEFAULT_RESPONSE_CACHE_SIZE):
+        self.max_size = max_size
+        self._responses = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._responses)
+
+    def get(self, key, compute):
+        """
+        Returns the response for `key`, computing it with `compute()` on a
+        miss. Concurrent misses only compute a response twice.
+        """
+        with self._lock:
+            if key in self._responses:
+                self._responses.move_to_end(key)
+                return self._responses[key]
+        response = compute()
+        with self._lock:
+            self._responses[key] = response
+            self._responses.move_to_end(key)
+            while len(self._responses) > self.max_size:
+                self._responses.popitem(last=False)
+        return response
+
+
+class Snapshot(NamedTuple):
+    """
+    Immutable in-memory copy of the data the service answers from. A refresh
+    builds a new snapshot and swaps it in, so a request keeps reading the one it
+    started with.
+
+    Attributes:
+        matrix (PriceMatrix): Prices of all tickers.
+        windows (WindowReturns): Window lookups over `matrix`.
+        sector_index (SectorIndex): Ticker -> sector/industry keys.
+        change_id (int): Last stock_data_changes entry included in the prices.
+        industry_fingerprint (tuple): Row count and highest id of industry_data.
+        loaded_at (float): Unix time the snapshot was built.
+        responses (ResponseCache): Responses computed for this snapshot, keyed
+            by endpoint and the resolved window rows.
+    """
+
+    matrix: PriceMatrix
+    windows: WindowReturns
+    sector_index: SectorIndex
+    change_id: int
+    industry_fingerprint: tuple
+    loaded_at: float
+    responses: ResponseCache
+
+
+class AnalysisService:
+    """
+    Keeps the price matrix and the sector index in memory and answers the
+    run.py summaries, ticker series and sector breakdowns from them.
+
+    refresh() only reads rows newer than the last loaded date, unless older
+    history changed (detected from stock_data_changes like ReturnState does) or
+    a full reload is asked for. Queries never touch the database.
+    """
+
+    def __init__(self, session_factory=None, cache: PriceCache = None):
+        """
+        Args:
+            session_factory: Creates the sessions used for loading, defaults to
+                db.session.get_session_factory().
+            cache (PriceCache, optional): Cache used for the initial load.
+        """
+        self.session_factory = session_factory or get_session_factory()
+        self.cache = cache or PriceCache()
+        self.snapshot = None
+        self.refreshes = 0
+        self._refresh_lock = threading.Lock()
+
+    @staticmethod
+    def _industry_fingerprint(session) -> tuple:
+        return tuple(session.query(func.count(), func.max(Industry.id)).first())
+
+    def _build(self, session, matrix, change_id, sector_index=None) -> Snapshot:
+        return Snapshot(
+            matrix=matrix,
+            windows=WindowReturns(matrix),
+            sector_index=sector_index or Industry.get_sector_index(session),
+            change_id=change_id,
+            industry_fingerprint=self._industry_fingerprint(session),
+            loaded_at=time.time(),
+            responses=ResponseCache(),
+        )
+
+    def load(self) -> "AnalysisService":
+        """
+        Loads everything, the prices through the price cache. The cache is
+        keyed on the last stock_data_changes id, so it never holds prices older
+        than the change id stored with the snapshot.
+        """
+        with self._refresh_lock, self.session_factory() as session:
+            # Read before the prices, so a concurrent import is seen again by
+            # the next refresh
+            change_id, _ = StockDataChange.get_changes_after(session)
+            self.snapshot = self._build(session, self.cache.load(session), change_id)
+        return self
+
+    def refresh(self, full: bool = False) -> bool:
+        """
+        Brings the snapshot up to date with the database.
+
+        Args:
+            full (bool): Reload everything instead of reading new rows only.
+
+        Returns:
+            bool: Whether a new snapshot was swapped in.
+        """
+        with self._refresh_lock, self.session_factory() as session:
+            current = self.snapshot
+            change_id, first_changed = StockDataChange.get_changes_after(
+                session, current.change_id
+            )
+            prices_changed = change_id != current.change_id
+            industry_changed = (
+                self._industry_fingerprint(session) != current.industry_fingerprint
+            )
+            if not full and not prices_changed and not industry_changed:
+                return False
+
+            if not full and not prices_changed:
+                # Only industry_data changed, the prices and lookups stay
+                self.snapshot = current._replace(
+                    sector_index=Industry.get_sector_index(session),
+                    industry_fingerprint=self._industry_fingerprint(session),
+                    loaded_at=time.time(),
+                    responses=ResponseCache(),
+                )
+            else:
+                matrix = current.matrix
+                watermark = matrix.dates[-1].item() if len(matrix.dates) else None
+                if full or watermark is None or first_changed <= watermark:
+                    matrix = StockData.get_price_matrix(session)
+                else:
+                    tickers, dates, prices = StockData.get_rows_after(
+                        session, watermark
+                    )
+                    matrix = matrix.merged(dates, tickers, prices)
+                sector_index = (
+                    None if full or industry_changed else current.sector_index
+                )
+                self.snapshot = self._build(session, matrix, change_id, sector_index)
+            self.refreshes += 1
+            return True
+
+    @staticmethod
+    def _window_rows(snapshot: Snapshot, start=None, end=None):
+        dates = snapshot.matrix.dates
+        if not len(dates):
+            raise ValueError("No prices loaded")
+        start_rows, end_rows = snapshot.windows.rows(
+            [start or dates[0]], [end or dates[-1]]
+        )
+        if start_rows[0] >= len(dates) or end_rows[0] < start_rows[0]:
+            raise ValueError(f"No trading days between {start} and {end}")
+        return start_rows, end_rows
+
+    @staticmethod
+    def _window_key(start_rows, end_rows) -> tuple:
+        # Dates resolving to the same trading days share a response
+        return int(start_rows[0]), int(end_rows[0])
+
+    def health(self) -> dict:
+        snapshot = self.snapshot
+        dates = snapshot.matrix.dates
+        return {
+            "status": "ok",
+            "tickers": len(snapshot.matrix.tickers),
+            "dates": len(dates),
+            "date_range": [str(dates[0]), str(dates[-1])] if len(dates) else None,
+            "loaded_at": snapshot.loaded_at,
+            "refreshes": self.refreshes,
+        }
+
+    def summary(self, start=None, end=None) -> dict:
+        """
+        Ticker count, average and median return and the share of tickers above
+        the average, over the full history or the window between two dates.
+        """
+        snapshot = self.snapshot
+        start_rows, end_rows = self._window_rows(snapshot, start, end)
+
+        def compute():
+            stats = WindowStats.from_returns(
+                snapshot.matrix.dates[start_rows],
+                snapshot.matrix.dates[end_rows],
+                snapshot.windows.returns_between_rows(start_rows, end_rows),
+            )
+            return {
+                "date_range": [str(stats.start[0]), str(stats.end[0])],
+                "count": int(stats.count[0]),
+                "avg_return": _float(stats.avg_return[0]),
+                "median_return": _float(stats.median_return[0]),
+                "above_avg": int(stats.above_avg[0]),
+                "share_above_avg": _float(stats.share_above_avg[0]),
+            }
+
+        return snapshot.responses.get(
+            ("summary", *self._window_key(start_rows, end_rows)), compute
+        )
+
+    def returns(self, start=None, end=None) -> dict:
+        """
+        Return of every ticker over the full history or a window.
+        """
+        snapshot = self.snapshot
+        start_rows, end_rows = self._window_rows(snapshot, start, end)
+
+        def compute():
+            returns = snapshot.windows.returns_between_rows(start_rows, end_rows)[0]
+            return {
+                "tickers": snapshot.matrix.tickers.tolist(),
+                "returns": _floats(returns),
+            }
+
+        return snapshot.responses.get(
+            ("returns", *self._window_key(start_rows, end_rows)), compute
+        )
+
+    def ticker(self, symbol: str, start=None, end=None) -> dict:
+        """
+        Price history of one ticker with its daily and cumulative returns, like
+        run.Ticker.df, optionally limited to a date range.
+        """
+        matrix = self.snapshot.matrix
+        if matrix.ticker_indices([symbol])[0] < 0:
+            raise UnknownTickerError(symbol)
+        series = TickerSeries.from_matrix(matrix, symbol)
+        if start or end:
+            dates = series.dates
+            mask = (dates >= np.datetime64(start or dates[0], "D")) & (
+                dates <= np.datetime64(end or dates[-1], "D")
+            )
+            series = TickerSeries(symbol, series.days[mask], series.prices[mask])
+        if not len(series):
+            raise ValueError(f"{symbol} has no prices between {start} and {end}")
+        return {
+            "ticker": symbol,
+            "dates": series.dates.astype(str).tolist(),
+            "prices": _floats(series.prices),
+            "returns": _floats(series.returns),
+            "cum_returns": _floats(series.cum_returns),
+            "avg_return": _float(series.avg_return),
+            "last_cum_return": _float(series.last_cum_return),
+        }
+
+    def sectors(self, level: str = "sector", start=None, end=None) -> list:
+        """
+        SectorIndex.breakdown of the ticker returns over the full history or a
+        window, one record per sector or industry.
+        """
+        if level not in LEVELS:
+            raise ValueError(f"Unknown level: {level}")
+        snapshot = self.snapshot
+        start_rows, end_rows = self._window_rows(snapshot, start, end)
+
+        def compute():
+            returns = snapshot.windows.returns_between_rows(start_rows, end_rows)[0]
+            breakdown = snapshot.sector_index.breakdown(
+                snapshot.matrix.tickers, returns, level
+            )
+            # Through JSON so NaNs and NumPy scalars come out as plain values
+            return json.loads(breakdown.to_json(orient="records", double_precision=15))
+
+        return snapshot.responses.get(
+            ("sectors", level, *self._window_key(start_rows, end_rows)), compute
+        )
+
+
+class RequestHandler(BaseHTTPRequestHandler):
+    """
+    JSON API of an AnalysisService:
+
+        GET  /health
+        GET  /summary?start=YYYY-MM-DD&end=YYYY-MM-DD
+        GET  /returns?start=...&end=...
+        GET  /tickers/<symbol>?start=...&end=...
+        GET  /sectors/<sector|industry>?start=...&end=...
+        POST /refresh?full=1
+
+    start and end are optional everywhere.
+    """
+
+    protocol_version = "HTTP/1.1"
+
+    def address_string(self) -> str:
+        # Unix socket clients have no address
+        return self.client_address[0] if self.client_address else "unix"
+
+    def log_message(self, format, *args):
+        if not self.server.quiet:
+            super().log_message(format, *args)
+
+    def _send(self, status: HTTPStatus, payload):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _route(self, method: str):
+        url = urlsplit(self.path)
+        parts = [part for part in url.path.split("/") if part]
+        query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        window = {"start": query.get("start"), "end": query.get("end")}
+        service = self.server.service
+
+        if method == "POST" and parts == ["refresh"]:
+            full = query.get("full", "") not in ("", "0")
+            return {"refreshed": service.refresh(full), **service.health()}
+        if method != "GET":
+            return None
+        if parts == ["health"]:
+            return service.health()
+        if parts == ["summary"]:
+            return service.summary(**window)
+        if parts == ["returns"]:
+            return service.returns(**window)
+        if len(parts) == 2 and parts[0] == "tickers":
+            return service.ticker(parts[1], **window)
+        if len(parts) == 2 and parts[0] == "sectors":
+            return service.sectors(parts[1], **window)
+        return None
+
+    def _handle(self, method: str):
+        try:
+            payload = self._route(method)
+        except UnknownTickerError as e:
+            self._send(HTTPStatus.NOT_FOUND, {"error": f"Unknown ticker: {e.args[0]}"})
+        except ValueError as e:
+            self._send(HTTPStatus.BAD_REQUEST, {"error": str(e)})
+        except Exception as e:
+            # E.g. a database error during POST /refresh, the snapshot is kept
+            traceback.print_exc()
+            self._send(
+                HTTPStatus.INTERNAL_SERVER_ERROR,
+                {"error": f"{type(e).__name__}: {e}"},
+            )
+        else:
+            if payload is None:
+                self._send(HTTPStatus.NOT_FOUND, {"error": f"No route: {self.path}"})
+            else:
+                self._send(HTTPStatus.OK, payload)
+
+    def do_GET(self):
+        self._handle("GET")
+
+    def do_POST(self):
+        self._handle("POST")
+
+
+class AnalysisHTTPServer(ThreadingHTTPServer):
+    """
+    Serves an AnalysisService over TCP, one thread per connection.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, address, service: AnalysisService, quiet: bool = False):
+        self.service = service
+        self.quiet = quiet
+        super().__init__(address, RequestHandler)
+
+
+class AnalysisUnixServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """
+    Serves an AnalysisService over a Unix socket, one thread per connection.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, path: str, service: AnalysisService, quiet: bool = False):
+        self.service = service
+        self.quiet = quiet
+        if os.path.exists(path):
+            os.unlink(path)
+        super().__init__(path, RequestHandler)
+
+
+def refresh_periodically(
+    service: AnalysisService, interval: float, stop: threading.Event
+):
+    """
+    Calls service.refresh() every `interval` seconds until `stop` is set.
+    Errors are printed and retried on the next tick.
+    """
+    while not stop.wait(interval):
+        try:
+            service.refresh()
+        except Exception as e:
+            # Keep serving the last snapshot
+            print(f"Refresh failed: {e!r}")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Serve return analyses from prices kept in memory."
+    )
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument(
+        "--socket", help="Listen on this Unix socket instead of host:port."
+    )
+    parser.add_argument(
+        "--refresh-interval",
+        type=float,
+        default=60.0,
+        help="Seconds between checks for new rows, 0 to only refresh on POST /refresh.",
+    )
+    parser.add_argument("--quiet", action="store_true", help="Do not log requests.")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    service = AnalysisService().load()
+    health = service.health()
+    print(
+        f"Loaded {health['tickers']} tickers x {health['dates']} dates "
+        f"in {time.perf_counter() - start:.1f}s"
+    )
+
+    if args.socket:
+        server = AnalysisUnixServer(args.socket, service, args.quiet)
+        print(f"Serving on unix://{args.socket}")
+    else:
+        server = AnalysisHTTPServer((args.host, args.port), service, args.quiet)
+        print(f"Serving on http://{args.host}:{server.server_address[1]}")
+
+    stop = threading.Event()
+    if args.refresh_interval > 0:
+        threading.Thread(
+            target=refresh_periodically,
+            args=(service, args.refresh_interval, stop),
+            daemon=True,
+        ).start()
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stop.set()
+        server.server_close()
+        if args.socket and os.path.exists(args.socket):
+            os.unlink(args.socket)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,24 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+
+@pytest.fixture
+def long_prices() -> pd.DataFrame:
+    """
+    Long (date, ticker, price) rows of a random walk over 120 business days,
+    with every ticker missing about a fifth of its days and some tickers
+    starting late or ending early.
+    """
+    rng = np.random.default_rng(7)
+    dates = pd.bdate_range("2021-11-01", periods=120)
+    tickers = [f"T{i}" for i in range(12)]
+    prices = 50 * np.exp(np.cumsum(rng.normal(0, 0.02, (len(dates), len(tickers))), 0))
+    wide = pd.DataFrame(prices, index=dates, columns=tickers)
+    wide = wide.mask(rng.random(wide.shape) < 0.2)
+    wide.iloc[:30, 3] = np.nan
+    wide.iloc[-25:, 7] = np.nan
+    long = wide.stack().rename("price").reset_index()
+    long.columns = ["date", "ticker", "price"]
+    # Shuffled like rows streamed from the database
+    return long.sample(frac=1, random_state=1).reset_index(drop=True)
@@ -0,0 +1,62 @@
+import numpy as np
+import pytest
+
+from analysis.parallel import ReturnStats, run_parallel
+from analysis.simulation import Simulation
+from db import PriceMatrix
+
+N_PATHS = 30_000
+BATCH_SIZE = 4_000
+
+
+@pytest.fixture
+def simulation(long_prices) -> Simulation:
+    matrix = PriceMatrix.from_columns(
+        long_prices["date"], long_prices["ticker"], long_prices["price"]
+    )
+    return Simulation(matrix, 4, holding_period=20, weighting="random")
+
+
+def _assert_stats_identical(stats: ReturnStats, expected: ReturnStats):
+    assert stats.count == expected.count
+    assert stats.nan_count == expected.nan_count
+    assert stats.total == expected.total
+    assert stats.total_sq == expected.total_sq
+    assert (stats.min, stats.max) == (expected.min, expected.max)
+    np.testing.assert_array_equal(stats.histogram, expected.histogram)
+
+
+def test_worker_count_does_not_change_result(simulation):
+    one = run_parallel(
+        simulation, N_PATHS, seed=5, batch_size=BATCH_SIZE, max_workers=1
+    )
+    three = run_parallel(
+        simulation, N_PATHS, seed=5, batch_size=BATCH_SIZE, max_workers=3
+    )
+
+    _assert_stats_identical(three, one)
+
+
+def test_matches_simulation_run(simulation):
+    stats = run_parallel(simulation, N_PATHS, seed=5, batch_size=BATCH_SIZE)
+    returns = simulation.run(N_PATHS, seed=5, batch_size=BATCH_SIZE).returns
+
+    # The same batches reduced in the same order
+    expected = ReturnStats()
+    for batch in np.split(returns, np.arange(BATCH_SIZE, N_PATHS, BATCH_SIZE)):
+        expected.merge(ReturnStats.from_returns(batch))
+    _assert_stats_identical(stats, expected)
+
+    assert stats.count == N_PATHS
+    assert stats.mean == pytest.approx(returns.mean(), rel=1e-12)
+    assert stats.std == pytest.approx(returns.std(), rel=1e-9)
+
+
+def test_empty_stats_are_nan():
+    stats = ReturnStats.from_returns(np.array([np.nan, np.nan]))
+    stats.merge(ReturnStats())
+
+    assert stats.count == 0 and stats.nan_count == 2
+    assert np.isnan(stats.mean)
+    assert np.isnan(stats.std)
+    assert np.isnan(stats.quantile(0.5))
@@ -0,0 +1,50 @@
+import numpy as np
+from sqlalchemy import create_engine, update
+from sqlalchemy.orm import sessionmaker
+
+from benchmarks.synthetic import load_synthetic_data
+from db import PriceCache, StockData, StockDataChange
+
+
+def test_in_place_correction_invalidates_cache(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'cache.db'}")
+    load_synthetic_data(engine, n_tickers=5, years=1)
+    Session = sessionmaker(bind=engine)
+    cache = PriceCache(str(tmp_path / "prices"))
+
+    with Session() as session:
+        matrix = cache.load(session)
+    date = matrix.dates[10].item()
+    ticker = str(matrix.tickers[2])
+
+    # Same row count and date range, only the price differs
+    with engine.begin() as connection:
+        connection.execute(
+            update(StockData)
+            .where(StockData.ticker == ticker, StockData.date == date)
+            .values(price=1234.5)
+        )
+        StockDataChange.record(connection, date, date, 1)
+
+    with Session() as session:
+        reloaded = cache.load(session)
+    assert reloaded.prices[10, 2] == 1234.5
+    expected = matrix.prices.copy()
+    expected[10, 2] = 1234.5
+    np.testing.assert_array_equal(reloaded.prices, expected)
+
+
+def test_cache_hit_while_nothing_changed(tmp_path, monkeypatch):
+    engine = create_engine(f"sqlite:///{tmp_path / 'cache.db'}")
+    load_synthetic_data(engine, n_tickers=5, years=1)
+    Session = sessionmaker(bind=engine)
+    cache = PriceCache(str(tmp_path / "prices"))
+    with Session() as session:
+        matrix = cache.load(session)
+
+    def fail(*args, **kwargs):
+        raise AssertionError("cache miss")
+
+    monkeypatch.setattr(StockData, "get_price_matrix", fail)
+    with Session() as session:
+        np.testing.assert_array_equal(cache.load(session).prices, matrix.prices)
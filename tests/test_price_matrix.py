@@ -0,0 +1,90 @@
+import numpy as np
+import pandas as pd
+
+from db import PriceMatrix
+
+
+def _pivot(long: pd.DataFrame) -> pd.DataFrame:
+    return long.pivot(index="date", columns="ticker", values="price").sort_index()
+
+
+def _assert_matrix_equal(matrix: PriceMatrix, expected: pd.DataFrame):
+    # PriceMatrix dates are datetime64[D], pandas stores them as [ns]
+    pd.testing.assert_frame_equal(
+        matrix.to_df(),
+        expected,
+        check_names=False,
+        check_freq=False,
+        check_index_type=False,
+    )
+
+
+def test_from_columns_matches_pivot(long_prices):
+    matrix = PriceMatrix.from_columns(
+        long_prices["date"], long_prices["ticker"], long_prices["price"]
+    )
+    expected = _pivot(long_prices)
+
+    _assert_matrix_equal(matrix, expected)
+    assert list(matrix.tickers) == sorted(long_prices["ticker"].unique())
+
+
+def test_merged_adds_rows_and_overrides_existing(long_prices):
+    old = long_prices[long_prices["date"] < "2022-03-01"]
+    new = long_prices[long_prices["date"] >= "2022-03-01"].copy()
+    # A correction of an already loaded price and a ticker that is new
+    corrected = old.iloc[[0]].assign(price=1.0)
+    listed = pd.DataFrame(
+        {"date": [pd.Timestamp("2022-03-01")], "ticker": ["NEW"], "price": [9.0]}
+    )
+    new = pd.concat([new, corrected, listed])
+
+    matrix = PriceMatrix.from_columns(old["date"], old["ticker"], old["price"])
+    merged = matrix.merged(new["date"], new["ticker"], new["price"])
+
+    expected = _pivot(
+        pd.concat([old, new]).drop_duplicates(["date", "ticker"], keep="last")
+    )
+    _assert_matrix_equal(merged, expected)
+    # The original matrix is left unchanged
+    _assert_matrix_equal(matrix, _pivot(old))
+
+
+def test_prices_on_or_after_matches_pandas(long_prices):
+    matrix = PriceMatrix.from_columns(
+        long_prices["date"], long_prices["ticker"], long_prices["price"]
+    )
+    wide = _pivot(long_prices)
+    rng = np.random.default_rng(3)
+    tickers = rng.choice([*wide.columns, "MISSING"], size=200)
+    target_dates = pd.Timestamp("2021-10-25") + pd.to_timedelta(
+        rng.integers(0, 200, size=200), unit="D"
+    )
+
+    expected = []
+    for ticker, target_date in zip(tickers, target_dates):
+        if ticker not in wide:
+            expected.append(np.nan)
+            continue
+        prices = wide[ticker].dropna()
+        later = prices[prices.index >= target_date]
+        expected.append(later.iloc[0] if len(later) else np.nan)
+
+    np.testing.assert_array_equal(
+        matrix.prices_on_or_after(tickers, target_dates.to_numpy()), expected
+    )
+
+
+def test_fills_match_pandas(long_prices):
+    # Tickers are stored on their own trading days and aligned at query time
+    matrix = PriceMatrix.from_columns(
+        long_prices["date"], long_prices["ticker"], long_prices["price"]
+    )
+    wide = _pivot(long_prices)
+
+    np.testing.assert_array_equal(matrix.forward_filled(), wide.ffill().to_numpy())
+    np.testing.assert_array_equal(matrix.backfilled(), wide.bfill().to_numpy())
+    np.testing.assert_array_equal(
+        matrix.last_cum_returns(),
+        (wide.ffill().iloc[-1] / wide.bfill().iloc[0] - 1).to_numpy(),
+    )
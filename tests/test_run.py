@@ -0,0 +1,59 @@
+import datetime
+
+import numpy as np
+
+from db import PriceMatrix, ReturnState, Universe
+from run import AllTickers
+
+
+def _matrix(long_prices) -> PriceMatrix:
+    return PriceMatrix.from_columns(
+        long_prices["date"], long_prices["ticker"], long_prices["price"]
+    )
+
+
+def test_date_range_of_empty_table():
+    matrix = PriceMatrix(
+        np.empty(0, "datetime64[D]"), np.empty(0, object), np.empty((0, 0))
+    )
+    all_tickers = AllTickers(matrix=matrix)
+
+    assert all_tickers.date_range == (None, None)
+    assert len(all_tickers.tickers) == 0
+
+
+def test_date_range_of_universe(long_prices):
+    # T3 lists 30 days after the other tickers, NEW has no prices
+    universe = Universe(np.array(["NEW", "T3"]), np.array([1e9, np.nan]))
+    all_tickers = AllTickers(matrix=_matrix(long_prices), universe=universe)
+
+    selected = long_prices[long_prices["ticker"].isin(["T3"])]
+    assert all_tickers.tickers.tolist() == ["T3"]
+    assert all_tickers.date_range == (
+        selected["date"].min().date(),
+        selected["date"].max().date(),
+    )
+    assert all_tickers.date_range != AllTickers(matrix=_matrix(long_prices)).date_range
+
+
+def test_return_state_keeps_ticker_dates(long_prices, tmp_path):
+    state = ReturnState(str(tmp_path / "state.npz"))
+    split = datetime.date(2022, 2, 1)
+    for rows in (
+        long_prices[long_prices["date"].dt.date <= split],
+        long_prices[long_prices["date"].dt.date > split],
+    ):
+        state.apply(
+            rows["ticker"].to_numpy(),
+            rows["date"].to_numpy().astype("datetime64[D]"),
+            rows["price"].to_numpy(),
+        )
+
+    spans = long_prices.groupby("ticker")["date"].agg(["min", "max"])
+    assert state.tickers.tolist() == spans.index.tolist()
+    np.testing.assert_array_equal(
+        state.first_dates, spans["min"].to_numpy().astype("datetime64[D]")
+    )
+    np.testing.assert_array_equal(
+        state.last_dates, spans["max"].to_numpy().astype("datetime64[D]")
+    )
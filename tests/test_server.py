@@ -0,0 +1,129 @@
+import datetime
+
+import numpy as np
+import pytest
+from sqlalchemy import create_engine, func, insert, select, update
+from sqlalchemy.orm import sessionmaker
+
+from benchmarks.synthetic import load_synthetic_data
+from db import PriceCache, StockData, StockDataChange
+from server import AnalysisService, UnknownTickerError
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'server.db'}")
+    load_synthetic_data(engine, n_tickers=20, years=1)
+    return engine
+
+
+@pytest.fixture
+def service(engine, tmp_path, monkeypatch):
+    service = AnalysisService(
+        sessionmaker(bind=engine), PriceCache(str(tmp_path / "cache"))
+    ).load()
+    # Count the full reloads of refresh()
+    service.full_reloads = 0
+    get_price_matrix = StockData.get_price_matrix
+
+    def counting_get_price_matrix(*args, **kwargs):
+        service.full_reloads += 1
+        return get_price_matrix(*args, **kwargs)
+
+    monkeypatch.setattr(StockData, "get_price_matrix", counting_get_price_matrix)
+    return service
+
+
+def _write(engine, rows):
+    # An import: the rows and their stock_data_changes entry in one transaction
+    with engine.begin() as connection:
+        next_id = connection.execute(select(func.max(StockData.id))).scalar() + 1
+        connection.execute(
+            insert(StockData),
+            [
+                dict(id=next_id + i, ticker=t, date=d, price=p, daily_pct_change=0.0)
+                for i, (t, d, p) in enumerate(rows)
+            ],
+        )
+        dates = [row[1] for row in rows]
+        StockDataChange.record(connection, min(dates), max(dates), len(rows))
+
+
+def _assert_same_as_fresh_load(service, engine):
+    with sessionmaker(bind=engine)() as session:
+        fresh = StockData._get_wide_matrix(session, StockData.price, 50_000)
+    matrix = service.snapshot.matrix
+    np.testing.assert_array_equal(matrix.dates, fresh.dates)
+    assert matrix.tickers.tolist() == fresh.tickers.tolist()
+    np.testing.assert_array_equal(matrix.prices, fresh.prices)
+
+
+def test_refresh_without_changes_keeps_snapshot(service):
+    snapshot = service.snapshot
+    assert service.refresh() is False
+    assert service.snapshot is snapshot
+
+
+def test_incremental_refresh_matches_full_load(service, engine):
+    last_date = service.snapshot.matrix.dates[-1].item()
+    new_dates = [last_date + datetime.timedelta(days=days) for days in (3, 4)]
+    _write(
+        engine,
+        [("S00001", new_dates[0], 11.0), ("S00001", new_dates[1], 12.0)]
+        + [("NEW", new_dates[1], 5.0)],
+    )
+
+    assert service.refresh() is True
+    assert service.full_reloads == 0
+    _assert_same_as_fresh_load(service, engine)
+    assert service.ticker("NEW")["prices"] == [5.0]
+
+
+def test_history_correction_triggers_full_reload(service, engine):
+    first_date = service.snapshot.matrix.dates[0].item()
+    with engine.begin() as connection:
+        connection.execute(
+            update(StockData)
+            .where(StockData.ticker == "S00002", StockData.date == first_date)
+            .values(price=1.0)
+        )
+        StockDataChange.record(connection, first_date, first_date, 1)
+
+    assert service.refresh() is True
+    assert service.full_reloads == 1
+    _assert_same_as_fresh_load(service, engine)
+
+
+def test_load_after_in_place_correction(service, engine, tmp_path):
+    date = service.snapshot.matrix.dates[5].item()
+    column = service.snapshot.matrix.tickers.tolist().index("S00003")
+    with engine.begin() as connection:
+        connection.execute(
+            update(StockData)
+            .where(StockData.ticker == "S00003", StockData.date == date)
+            .values(price=1234.5)
+        )
+        StockDataChange.record(connection, date, date, 1)
+
+    # A restart through the same price cache sees the corrected price
+    restarted = AnalysisService(
+        sessionmaker(bind=engine), PriceCache(str(tmp_path / "cache"))
+    ).load()
+    assert restarted.snapshot.matrix.prices[5, column] == 1234.5
+    _assert_same_as_fresh_load(restarted, engine)
+    assert restarted.refresh() is False
+
+    # The running service picks it up on refresh
+    assert service.refresh() is True
+    assert service.snapshot.matrix.prices[5, column] == 1234.5
+    _assert_same_as_fresh_load(service, engine)
+
+
+def test_responses_are_keyed_by_window_rows(service):
+    dates = service.snapshot.matrix.dates
+    # A Saturday start resolves to the same first trading day as the Monday
+    saturday = dates[0] - np.timedelta64(2, "D")
+    assert service.summary(str(saturday)) == service.summary(str(dates[0]))
+    assert len(service.snapshot.responses) == 1
+    with pytest.raises(UnknownTickerError):
+        service.ticker("MISSING")
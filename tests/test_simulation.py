@@ -0,0 +1,69 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from analysis.simulation import Simulation
+from db import PriceMatrix
+
+
+@pytest.fixture
+def matrix(long_prices) -> PriceMatrix:
+    return PriceMatrix.from_columns(
+        long_prices["date"], long_prices["ticker"], long_prices["price"]
+    )
+
+
+@pytest.mark.parametrize("portfolio_size", [1, 3, 11])
+def test_paths_only_hold_tickers_priced_at_entry_and_exit(matrix, portfolio_size):
+    # T3 lists on row 30 and T7 delists 25 rows before the end
+    simulation = Simulation(matrix, portfolio_size, holding_period=20)
+    result = simulation.run(20_000, seed=1, batch_size=7_000)
+
+    assert np.isfinite(result.returns).all()
+    exit_idx = result.entry_idx + 20
+    assert not np.isnan(
+        simulation.entry_prices[result.entry_idx[:, None], result.ticker_idx]
+    ).any()
+    assert not np.isnan(
+        simulation.exit_prices[exit_idx[:, None], result.ticker_idx]
+    ).any()
+    assert (np.diff(np.sort(result.ticker_idx, axis=1), axis=1) > 0).all()
+
+
+def test_returns_match_pandas(matrix):
+    result = Simulation(matrix, 4, holding_period=15, weighting="random").run(
+        500, seed=2
+    )
+    wide = matrix.to_df()
+    entry = wide.bfill().to_numpy()[result.entry_idx[:, None], result.ticker_idx]
+    exit_ = wide.ffill().to_numpy()[result.entry_idx[:, None] + 15, result.ticker_idx]
+    expected = (result.weights * exit_ / entry).sum(axis=1) - 1
+
+    np.testing.assert_allclose(result.returns, expected, rtol=1e-12, atol=1e-14)
+
+
+def test_late_listing_ticker_is_drawn_once_priced(matrix):
+    t3 = matrix.tickers.tolist().index("T3")
+    first_row = int(np.argmax(~np.isnan(matrix.prices[:, t3])))
+    simulation = Simulation(matrix, matrix.prices.shape[1] - 2, holding_period=10)
+    result = simulation.run(5_000, seed=3)
+
+    holds_t3 = (result.ticker_idx == t3).any(axis=1)
+    assert holds_t3.any()
+    # An entry before the listing is back filled to the first price, the exit
+    # needs a price on or before it
+    assert (result.entry_idx[holds_t3] + 10 >= first_row).all()
+
+
+def test_no_entry_date_with_enough_priced_tickers():
+    dates = pd.bdate_range("2022-01-03", periods=10)
+    prices = np.full((10, 2), np.nan)
+    # A delists before B lists, further apart than the holding period
+    prices[:3, 0] = 1.0
+    prices[8:, 1] = 2.0
+    matrix = PriceMatrix(
+        dates.values.astype("datetime64[D]"), np.array(["A", "B"]), prices
+    )
+
+    with pytest.raises(ValueError, match="No entry date"):
+        Simulation(matrix, 2, holding_period=4)
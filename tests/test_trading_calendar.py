@@ -0,0 +1,20 @@
+import datetime
+
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import Session
+
+from db import Base, TradingCalendar
+
+
+def test_get_trading_days_orders_and_filters(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'calendar.db'}")
+    Base.metadata.create_all(engine)
+    days = [datetime.date(2024, 1, day) for day in (9, 2, 5, 3, 4, 8)]
+    with engine.begin() as connection:
+        connection.execute(insert(TradingCalendar), [{"date": day} for day in days])
+
+    with Session(engine) as session:
+        assert TradingCalendar.get_trading_days(session) == sorted(days)
+        assert TradingCalendar.get_trading_days(
+            session, datetime.date(2024, 1, 3), datetime.date(2024, 1, 8)
+        ) == [datetime.date(2024, 1, day) for day in (3, 4, 5, 8)]
@@ -0,0 +1,112 @@
+import numpy as np
+import pandas as pd
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from benchmarks.synthetic import generate_industry_rows
+from db import MARKET_CAP_BUCKETS, Base, Industry, Sector, Universe
+from db.ingest import parse_ipo_year, parse_last_sale, parse_market_cap
+
+
+@pytest.mark.parametrize(
+    "value, expected",
+    [
+        ("$268.67M", 268_670_000),
+        ("$20.12B", 20_120_000_000),
+        ("$676904.42", 676_904),
+        ("$1.5B", 1_500_000_000),
+        ("n/a", None),
+        ("", None),
+        (None, None),
+    ],
+)
+def test_parse_market_cap(value, expected):
+    assert parse_market_cap(value) == expected
+
+
+def test_parse_last_sale_and_ipo_year():
+    assert parse_last_sale("10.68") == 10.68
+    assert parse_last_sale("n/a") is None
+    assert parse_ipo_year("2021") == 2021
+    assert parse_ipo_year("n/a") is None
+    assert parse_ipo_year("") is None
+
+
+def test_weights_match_pandas():
+    universe = Universe(
+        np.array(["A", "B", "C", "D"]), np.array([4e9, 1e9, np.nan, 5e9])
+    )
+    tickers = np.array(["D", "A", "B", "C", "X"])
+    returns = np.array([0.1, 0.2, np.nan, 0.4, 0.5])
+
+    caps = pd.Series(universe.market_caps, index=universe.symbols)
+    frame = pd.DataFrame({"cap": caps.reindex(tickers).to_numpy(), "ret": returns})
+    usable = frame.dropna()
+    expected = (usable["cap"] / usable["cap"].sum()).reindex(frame.index).fillna(0)
+
+    np.testing.assert_allclose(universe.weights(tickers, returns), expected)
+    assert universe.weighted_return(tickers, returns) == pytest.approx(
+        (usable["cap"] * usable["ret"]).sum() / usable["cap"].sum()
+    )
+    np.testing.assert_allclose(universe.weights(tickers).sum(), 1.0)
+    assert np.isnan(universe.weighted_return(["C", "X"], [0.1, 0.2]))
+
+
+@pytest.fixture
+def industry_session(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'industry.db'}")
+    Base.metadata.create_all(engine)
+    rows = generate_industry_rows(400, seed=3)
+    # A duplicated symbol keeps its first row
+    rows.append({**rows[0], "market_cap": 1})
+    with engine.begin() as connection:
+        connection.execute(Industry.__table__.insert(), rows)
+        Sector.sync_from_industry_data(connection)
+    with Session(engine) as session:
+        yield session, pd.DataFrame(rows[:-1])
+
+
+@pytest.mark.parametrize(
+    "filters",
+    [
+        {},
+        {"sector": "Technology", "size": "mid"},
+        {"sector": "Finance", "min_ipo_year": 2011},
+        {"industry": "Energy 0", "max_last_sale": 100.0},
+        {"size": "small", "min_market_cap": 10**9, "max_ipo_year": 2000},
+    ],
+)
+def test_get_universe_matches_pandas(industry_session, filters):
+    session, rows = industry_session
+    keep = pd.Series(True, index=rows.index)
+    if "sector" in filters:
+        keep &= rows["sector"] == filters["sector"]
+    if "industry" in filters:
+        keep &= rows["industry"] == filters["industry"]
+    if "size" in filters:
+        low, high = MARKET_CAP_BUCKETS[filters["size"]]
+        keep &= rows["market_cap"] >= (low or 0)
+        if high is not None:
+            keep &= rows["market_cap"] < high
+    if "min_market_cap" in filters:
+        keep &= rows["market_cap"] >= filters["min_market_cap"]
+    if "min_ipo_year" in filters:
+        keep &= rows["ipo_year"] >= filters["min_ipo_year"]
+    if "max_ipo_year" in filters:
+        keep &= rows["ipo_year"] <= filters["max_ipo_year"]
+    if "max_last_sale" in filters:
+        keep &= rows["last_sale"] <= filters["max_last_sale"]
+    expected = rows[keep].sort_values("symbol")
+
+    universe = Industry.get_universe(session, **filters)
+
+    assert len(expected) > 0
+    assert universe.symbols.tolist() == expected["symbol"].tolist()
+    np.testing.assert_array_equal(universe.market_caps, expected["market_cap"])
+
+
+def test_get_universe_rejects_unknown_size(industry_session):
+    session, _ = industry_session
+    with pytest.raises(ValueError):
+        Industry.get_universe(session, size="giant")
@@ -0,0 +1,102 @@
+import numpy as np
+import pandas as pd
+
+from analysis.windows import WindowReturns, WindowStats
+from db import PriceMatrix
+
+# Exp of log-price differences leaves ~1e-16 where pandas divides to exactly 0
+TOLERANCE = {"rtol": 1e-12, "atol": 1e-14}
+
+
+def _window_returns_reference(wide: pd.DataFrame, start, end) -> pd.Series:
+    # Price on or after the start to the price on or before the end, NaN for
+    # tickers without a price inside the window
+    window = wide.loc[start:end]
+    entry = window.bfill().iloc[0] if len(window) else np.nan
+    exit_ = window.ffill().iloc[-1] if len(window) else np.nan
+    return exit_ / entry - 1
+
+
+def test_returns_between_rows_matches_pandas(long_prices):
+    matrix = PriceMatrix.from_columns(
+        long_prices["date"], long_prices["ticker"], long_prices["price"]
+    )
+    wide = matrix.to_df()
+    windows = WindowReturns(matrix)
+    rng = np.random.default_rng(11)
+    start_rows = rng.integers(0, len(wide), size=300)
+    end_rows = rng.integers(0, len(wide), size=300)
+
+    returns = windows.returns_between_rows(start_rows, end_rows)
+
+    for i, (start_row, end_row) in enumerate(zip(start_rows, end_rows)):
+        if start_row > end_row:
+            assert np.isnan(returns[i]).all()
+            continue
+        expected = _window_returns_reference(
+            wide, wide.index[start_row], wide.index[end_row]
+        )
+        np.testing.assert_allclose(returns[i], expected.to_numpy(), **TOLERANCE)
+
+
+def test_returns_by_date_match_pandas(long_prices):
+    matrix = PriceMatrix.from_columns(
+        long_prices["date"], long_prices["ticker"], long_prices["price"]
+    )
+    wide = matrix.to_df()
+    # Weekend bounds resolve to the next and the previous trading day
+    starts = pd.to_datetime(["2021-11-06", "2021-12-01", "2022-02-12"])
+    ends = pd.to_datetime(["2021-12-05", "2022-01-15", "2022-04-30"])
+
+    returns = WindowReturns(matrix).returns(starts.to_numpy(), ends.to_numpy())
+
+    for i, (start, end) in enumerate(zip(starts, ends)):
+        expected = _window_returns_reference(wide, start, end)
+        np.testing.assert_allclose(returns[i], expected.to_numpy(), **TOLERANCE)
+
+
+def test_month_grid_matches_brute_force(long_prices):
+    matrix = PriceMatrix.from_columns(
+        long_prices["date"], long_prices["ticker"], long_prices["price"]
+    )
+    windows = WindowReturns(matrix)
+    dates = pd.DatetimeIndex(matrix.dates)
+    months = dates.to_period("M")
+
+    start_rows, end_rows = windows.month_grid(2, 3)
+
+    expected = []
+    for start_month in months.unique():
+        for end_month in months.unique():
+            span = (end_month - start_month).n + 1
+            if 2 <= span <= 3:
+                expected.append(
+                    (
+                        np.flatnonzero(months == start_month)[0],
+                        np.flatnonzero(months == end_month)[-1],
+                    )
+                )
+    assert list(zip(start_rows, end_rows)) == expected
+
+
+def test_stats_match_pandas(long_prices):
+    matrix = PriceMatrix.from_columns(
+        long_prices["date"], long_prices["ticker"], long_prices["price"]
+    )
+    wide = matrix.to_df()
+    windows = WindowReturns(matrix)
+    start_rows, end_rows = windows.month_grid(1)
+
+    stats = windows.stats(start_rows, end_rows, chunk_size=3)
+
+    for i, (start_row, end_row) in enumerate(zip(start_rows, end_rows)):
+        returns = _window_returns_reference(
+            wide, wide.index[start_row], wide.index[end_row]
+        ).dropna()
+        assert stats.count[i] == len(returns)
+        np.testing.assert_allclose(stats.avg_return[i], returns.mean(), **TOLERANCE)
+        np.testing.assert_allclose(
+            stats.median_return[i], returns.median(), **TOLERANCE
+        )
+        assert stats.above_avg[i] == (returns > returns.mean()).sum()
+    assert isinstance(stats, WindowStats)